@@ -61,6 +61,7 @@ DJANGO_APPS = [
     'django.contrib.sites',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # 'django.contrib.humanize', # Handy template tags
 
 ]
@@ -195,6 +196,10 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 # http://docs.celeryproject.org/en/latest/userguide/configuration.html#std:setting-result_serializer
 CELERY_RESULT_SERIALIZER = 'json'
+# Txs queued by the API are sent by workers listening to the `relay` queue
+CELERY_ROUTES = {
+    'safe_relay_service.relay.tasks.process_multisig_tx_request_task': {'queue': 'relay'},
+}
 
 # Django REST Framework
 # ------------------------------------------------------------------------------
@@ -289,8 +294,25 @@ REDIS_URL = env('REDIS_URL', default='redis://localhost:6379/0')
 ETH_HASH_PREFIX = env('ETH_HASH_PREFIX', default='GNO')
 ETHEREUM_NODE_URL = env('ETHEREUM_NODE_URL', default=None)
 ETHEREUM_TRACING_NODE_URL = env('ETHEREUM_TRACING_NODE_URL', default=ETHEREUM_NODE_URL)
+# Build services (and connect to the node) in background when a web or Celery worker starts, instead of on the
+# first request or task
+PROVIDERS_WARMUP = env.bool('PROVIDERS_WARMUP', default=True)
 
 GAS_STATION_NUMBER_BLOCKS = env('GAS_STATION_NUMBER_BLOCKS', default=300)
+# Blocks are retrieved using JSON-RPC batches of `GAS_STATION_BATCH_SIZE` blocks, sending up to
+# `GAS_STATION_MAX_CONCURRENT_REQUESTS` batches at the same time
+GAS_STATION_BATCH_SIZE = env.int('GAS_STATION_BATCH_SIZE', default=50)
+GAS_STATION_MAX_CONCURRENT_REQUESTS = env.int('GAS_STATION_MAX_CONCURRENT_REQUESTS', default=4)
+GAS_STATION_REQUEST_TIMEOUT = env.int('GAS_STATION_REQUEST_TIMEOUT', default=30)  # Seconds
+GAS_STATION_REQUEST_RETRIES = env.int('GAS_STATION_REQUEST_RETRIES', default=3)
+# Use a mergeable sketch per block to calculate percentiles (relative error < 0.5%) instead of sorting every gas price
+GAS_STATION_USE_SKETCH = env.bool('GAS_STATION_USE_SKETCH', default=False)
+# Seconds every worker keeps the `/gas-station/` response in memory before checking for new gas prices
+GAS_STATION_SNAPSHOT_TTL = env.float('GAS_STATION_SNAPSHOT_TTL', default=5.)
+# Gas prices are rolled up hourly and daily. Raw gas prices and hourly summaries are deleted after these days
+GAS_STATION_RAW_RETENTION_DAYS = env.int('GAS_STATION_RAW_RETENTION_DAYS', default=30)
+GAS_STATION_HOURLY_RETENTION_DAYS = env.int('GAS_STATION_HOURLY_RETENTION_DAYS', default=365)
+GAS_STATION_COMPACTION_BATCH_SIZE = env.int('GAS_STATION_COMPACTION_BATCH_SIZE', default=5000)
 
 # Safe
 # ------------------------------------------------------------------------------
@@ -307,16 +329,31 @@ SAFE_PROXY_FACTORY_ADDRESS = env('SAFE_PROXY_FACTORY_ADDRESS', default='0x' + '0
 # If FIXED_GAS_PRICE is None, GasStation will be used
 FIXED_GAS_PRICE = env.int('FIXED_GAS_PRICE', default=None)
 SAFE_TX_SENDER_PRIVATE_KEY = env('SAFE_TX_SENDER_PRIVATE_KEY', default=None)
+# More accounts to send txs in parallel. Account with less pending txs is used
+SAFE_TX_SENDER_ADDITIONAL_PRIVATE_KEYS = env.list('SAFE_TX_SENDER_ADDITIONAL_PRIVATE_KEYS', default=[])
 
 SAFE_CHECK_DEPLOYER_FUNDED_DELAY = env.int('SAFE_CHECK_DEPLOYER_FUNDED_DELAY', default=1 * 30)
 SAFE_CHECK_DEPLOYER_FUNDED_RETRIES = env.int('SAFE_CHECK_DEPLOYER_FUNDED_RETRIES', default=10)
 SAFE_FIXED_CREATION_COST = env.int('SAFE_FIXED_CREATION_COST', default=None)
 SAFE_ACCOUNTS_BALANCE_WARNING = env.int('SAFE_ACCOUNTS_BALANCE_WARNING', default=200000000000000000)  # 0.2 Eth
+# Seconds to cache Safe master copy, version, owners and threshold. It's invalidated when Safe emits events
+SAFE_METADATA_CACHE_TTL = env.int('SAFE_METADATA_CACHE_TTL', default=60 * 60)
+# Seconds for a relayed or deployment tx to be pending before sending it again with a higher gas price
+SAFE_TX_REPLACEMENT_TIMEOUT = env.int('SAFE_TX_REPLACEMENT_TIMEOUT', default=60 * 2)
+# Max gas price for replacements is the gas price refunded by the Safe multiplied by this factor. If > 1 relay
+# will pay part of the gas to get the tx mined
+SAFE_TX_REPLACEMENT_GAS_PRICE_FACTOR = env.float('SAFE_TX_REPLACEMENT_GAS_PRICE_FACTOR', default=1.0)
 
 NOTIFICATION_SERVICE_URI = env('NOTIFICATION_SERVICE_URI', default=None)
 NOTIFICATION_SERVICE_PASS = env('NOTIFICATION_SERVICE_PASS', default=None)
 
 TOKEN_LOGO_BASE_URI = env('TOKEN_LOGO_BASE_URI', default='https://gnosis-safe-token-logos.s3.amazonaws.com/')
 TOKEN_LOGO_EXTENSION = env('TOKEN_LOGO_EXTENSION', default='.png')
+# Token prices are requested to every price oracle concurrently. Oracles not answering before the deadline are ignored
+PRICE_ORACLES_REQUEST_TIMEOUT = env.float('PRICE_ORACLES_REQUEST_TIMEOUT', default=5.)  # Seconds
+PRICE_ORACLES_DEADLINE = env.float('PRICE_ORACLES_DEADLINE', default=8.)  # Seconds
+PRICE_ORACLES_MAX_WORKERS = env.int('PRICE_ORACLES_MAX_WORKERS', default=10)
+# Seconds a token price calculated in background can be used. If older, price oracles will be used on request
+TOKEN_PRICE_MAX_AGE = env.int('TOKEN_PRICE_MAX_AGE', default=60 * 10)
 
 INTERNAL_TXS_BLOCK_PROCESS_LIMIT = env('INTERNAL_TXS_BLOCK_PROCESS_LIMIT', default=100000)
@@ -31,6 +31,8 @@ sys.path.append(os.path.join(app_path, 'safe_relay_service'))
 # mod_wsgi daemon mode with each site in its own daemon process, or use
 # os.environ["DJANGO_SETTINGS_MODULE"] = "config.settings.production"
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+# Providers are built in background when the app is ready, only for the web workers (see `RelayConfig.ready`)
+os.environ.setdefault("DJANGO_WSGI_APPLICATION", "1")
 
 # This application object is used by any WSGI server configured to use this
 # file. This includes Django's development server, if the WSGI_APPLICATION
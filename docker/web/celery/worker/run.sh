@@ -2,4 +2,4 @@
 
 set -euo pipefail
 
-exec celery -A safe_relay_service.taskapp worker -l INFO
+exec celery -A safe_relay_service.taskapp worker -l INFO -Q ${CELERY_QUEUES:-celery,relay}
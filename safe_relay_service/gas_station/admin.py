@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import GasPrice
+from .models import GasPrice, GasPriceDaily, GasPriceHourly
 
 
 @admin.register(GasPrice)
@@ -8,3 +8,10 @@ class GasPriceAdmin(admin.ModelAdmin):
     date_hierarchy = 'created'
     list_display = ('created', 'lowest', 'safe_low', 'standard', 'fast', 'fastest')
     ordering = ['-created']
+
+
+@admin.register(GasPriceHourly, GasPriceDaily)
+class GasPriceAggregateAdmin(admin.ModelAdmin):
+    date_hierarchy = 'bucket'
+    list_display = ('bucket', 'number', 'lowest_min', 'safe_low_avg', 'standard_avg', 'fast_avg', 'fastest_max')
+    ordering = ['-bucket']
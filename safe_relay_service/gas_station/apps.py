@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class GasStationConfig(AppConfig):
     name = 'safe_relay_service.gas_station'
+
+    def ready(self):
+        # Register providers, so they can be warmed up
+        from . import gas_station  # noqa: F401
@@ -1,16 +1,24 @@
 import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db import close_old_connections
 
 import numpy as np
 import requests
+from hexbytes import HexBytes
+from requests.adapters import HTTPAdapter
 from web3 import HTTPProvider, Web3
 from web3.middleware import geth_poa_middleware
 
+from ..utils.providers import LazyProvider
 from .models import GasPrice
+from .sketch import GasPriceSketch
 
 logger = getLogger(__name__)
 
@@ -19,53 +27,160 @@ class NoBlocksFound(Exception):
     pass
 
 
-class GasStationProvider:
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            if settings.FIXED_GAS_PRICE is not None:
-                cls.instance = GasStationMock(gas_price=settings.FIXED_GAS_PRICE)
-            else:
-                cls.instance = GasStation(settings.ETHEREUM_NODE_URL, settings.GAS_STATION_NUMBER_BLOCKS)
-                w3 = cls.instance.w3
-                if w3.isConnected() and int(w3.net.version) > 314158:  # Ganache
-                    logger.warning('Using mock Gas Station because no `w3.net.version` was detected')
-                    cls.instance = GasStationMock()
-        return cls.instance
+class BlockGasPrices(NamedTuple):
+    block_hash: bytes
+    gas_prices: np.ndarray  # Non zero gas prices of the txs of the block as `uint64`
+    parent_hash: Optional[bytes] = None  # Not stored in cache, only available when block is retrieved from the node
+
+    def to_bytes(self) -> bytes:
+        """
+        :return: Compact representation for cache, block hash (32 bytes) followed by packed little endian uint64
+        gas prices
+        """
+        return self.block_hash + self.gas_prices.astype('<u8').tobytes()
+
+    @classmethod
+    def from_bytes(cls, value: bytes) -> 'BlockGasPrices':
+        return cls(value[:32], np.frombuffer(value, dtype='<u8', offset=32))
 
     @classmethod
-    def del_singleton(cls):
-        if hasattr(cls, "instance"):
-            del cls.instance
+    def from_block(cls, block: Dict[str, Any]) -> 'BlockGasPrices':
+        """
+        :param block: Block with full transactions as returned by `eth_getBlockByNumber`
+        """
+        gas_prices = np.array([int(transaction['gasPrice'], 16) for transaction in block['transactions']],
+                              dtype=np.uint64)
+        # Don't include miner transactions (0 gasPrice)
+        block_hash = bytes(HexBytes(block.get('hash') or b'')).rjust(32, b'\0')
+        parent_hash = bytes(HexBytes(block['parentHash'])) if block.get('parentHash') else None
+        return cls(block_hash, gas_prices[gas_prices > 0], parent_hash=parent_hash)
+
+
+class GasStationProvider(LazyProvider):
+    @classmethod
+    def build(cls) -> 'GasStation':
+        if settings.FIXED_GAS_PRICE is not None:
+            return GasStationMock(gas_price=settings.FIXED_GAS_PRICE)
+
+        gas_station = GasStation(settings.ETHEREUM_NODE_URL, settings.GAS_STATION_NUMBER_BLOCKS,
+                                 batch_size=settings.GAS_STATION_BATCH_SIZE,
+                                 max_concurrent_requests=settings.GAS_STATION_MAX_CONCURRENT_REQUESTS,
+                                 request_timeout=settings.GAS_STATION_REQUEST_TIMEOUT,
+                                 request_retries=settings.GAS_STATION_REQUEST_RETRIES,
+                                 use_sketch=settings.GAS_STATION_USE_SKETCH)
+        network_version = gas_station.get_network_version()
+        if network_version and network_version > 314158:  # Ganache
+            logger.warning('Using mock Gas Station because no `w3.net.version` was detected')
+            return GasStationMock()
+        return gas_station
 
 
 class GasStation:
+    network_version_cache_timeout = 60 * 60 * 24
+
     def __init__(self,
                  http_provider_uri='http://localhost:8545',
                  number_of_blocks: int = 200,
                  cache_timeout_seconds: int = 10 * 60,
-                 constant_gas_increment: int = 1):  # Increase a little for fastest mining for API Calls
+                 constant_gas_increment: int = 1,  # Increase a little for fastest mining for API Calls
+                 batch_size: int = 50,
+                 max_concurrent_requests: int = 4,
+                 request_timeout: int = 30,
+                 request_retries: int = 3,
+                 retry_backoff_seconds: float = 0.5,
+                 use_sketch: bool = False):
 
         self.http_provider_uri = http_provider_uri
-        self.http_session = requests.session()
+        self.http_session = self._build_http_session(max_concurrent_requests)
+        self.batch_size = batch_size
+        self.max_concurrent_requests = max_concurrent_requests
+        self.request_timeout = request_timeout
+        self.request_retries = request_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
         self.number_of_blocks = number_of_blocks
         self.cache_timeout = cache_timeout_seconds
         self.constant_gas_increment = constant_gas_increment
-        self.w3 = Web3(HTTPProvider(http_provider_uri))
-        try:
-            if self.w3.net.version != 1:
-                self.w3.middleware_stack.inject(geth_poa_middleware, layer=0)
-            # For tests using dummy connections (like IPC)
-        except (ConnectionError, FileNotFoundError):
-            self.w3.middleware_stack.inject(geth_poa_middleware, layer=0)
-
-    def _get_block_cache_key(self, block_number):
+        self._w3: Optional[Web3] = None
+        # Sliding window of `block_number -> BlockGasPrices`, sorted by block number. It's kept between
+        # calculations, so only new blocks need to be retrieved
+        self.blocks_gas_prices: Dict[int, BlockGasPrices] = OrderedDict()
+        # If `use_sketch`, percentiles are calculated merging a `GasPriceSketch` for every block of the window
+        # instead of sorting all the gas prices
+        self.use_sketch = use_sketch
+        self.blocks_sketches: Dict[int, GasPriceSketch] = {}
+
+    @property
+    def w3(self) -> Web3:
+        """
+        Web3 is configured the first time it's used, so building the Gas Station doesn't connect to the node
+        """
+        if self._w3 is None:
+            w3 = Web3(HTTPProvider(self.http_provider_uri))
+            # Inject POA middleware also if node cannot be reached, for tests using dummy connections (like IPC)
+            if self.get_network_version() != 1:
+                w3.middleware_stack.inject(geth_poa_middleware, layer=0)
+            self._w3 = w3
+        return self._w3
+
+    def _get_network_version_cache_key(self) -> str:
+        return 'network_version:%s' % self.http_provider_uri
+
+    def get_network_version(self) -> Optional[int]:
+        """
+        :return: Network version of the node, cached so every new worker doesn't need to ask the node again.
+        `None` if node cannot be reached
+        """
+        cache_key = self._get_network_version_cache_key()
+        network_version = cache.get(cache_key)
+        if network_version is None:
+            w3 = Web3(HTTPProvider(self.http_provider_uri, request_kwargs={'timeout': self.request_timeout}))
+            try:
+                network_version = int(w3.net.version)
+            except (IOError, ValueError):  # `requests.ConnectionError` and `FileNotFoundError` are `IOError`
+                logger.warning('Cannot get network version for node %s', self.http_provider_uri)
+                return None
+            cache.set(cache_key, network_version, self.network_version_cache_timeout)
+        return network_version
+
+    def _build_http_session(self, pool_size: int) -> requests.Session:
+        """
+        :param pool_size: Number of connections to keep alive, one for every concurrent request
+        :return: Session to be shared between the threads retrieving the blocks
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _get_legacy_block_cache_key(self, block_number: int) -> str:
+        """
+        Full blocks were stored in the past, now only gas prices are stored
+        """
         return 'block:%d' % block_number
 
-    def _get_block_from_cache(self, block_number):
-        return cache.get(self._get_block_cache_key(block_number))
+    def _get_block_cache_key(self, block_number: int) -> str:
+        return 'block-gas-prices:%d' % block_number
+
+    def _get_block_from_cache(self, block_number: int) -> Optional[BlockGasPrices]:
+        value = cache.get(self._get_block_cache_key(block_number))
+        if value:
+            return BlockGasPrices.from_bytes(value)
+
+        # Migrate legacy full block to the compact format
+        legacy_cache_key = self._get_legacy_block_cache_key(block_number)
+        block = cache.get(legacy_cache_key)
+        if block:
+            block_gas_prices = BlockGasPrices.from_block(block)
+            self._store_block_in_cache(block_number, block_gas_prices)
+            cache.delete(legacy_cache_key)
+            return block_gas_prices
 
-    def _store_block_in_cache(self, block_number, block):
-        return cache.set(self._get_block_cache_key(block_number), block, self.cache_timeout)
+    def _store_block_in_cache(self, block_number: int, block_gas_prices: BlockGasPrices):
+        return cache.set(self._get_block_cache_key(block_number), block_gas_prices.to_bytes(), self.cache_timeout)
+
+    def _delete_block_from_cache(self, block_number: int):
+        return cache.delete(self._get_block_cache_key(block_number))
 
     def _get_gas_price_cache_key(self):
         return 'gas_price'
@@ -76,6 +191,15 @@ class GasStation:
     def _store_gas_price_in_cache(self, gas_price):
         return cache.set(self._get_gas_price_cache_key(), gas_price)
 
+    def _get_last_block_number_cache_key(self):
+        return 'gas_price:last_block_number'
+
+    def _get_last_block_number_from_cache(self) -> Optional[int]:
+        return cache.get(self._get_last_block_number_cache_key())
+
+    def _store_last_block_number_in_cache(self, block_number: int):
+        return cache.set(self._get_last_block_number_cache_key(), block_number)
+
     def _build_block_request(self, block_number: int, full_transactions: bool=False) -> Dict[str, Any]:
         block_number_hex = '0x{:x}'.format(block_number)
         return {"jsonrpc": "2.0",
@@ -83,73 +207,258 @@ class GasStation:
                 "params": [block_number_hex, full_transactions],
                 "id": block_number}
 
-    def _do_request(self, rpc_request):
-        return self.http_session.post(self.http_provider_uri, json=rpc_request).json()
+    def _do_batch_request(self, rpc_request: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Sends a JSON-RPC batch request. Requests failing (connection problems or errors returned by the node)
+        are retried with exponential backoff
+        :param rpc_request: List of JSON-RPC requests
+        :return: List of JSON-RPC responses for the requests that succeeded, failed ones are not included
+        """
+        rpc_responses = []
+        pending_rpc_request = rpc_request
+        for retry in range(self.request_retries + 1):
+            if retry:
+                time.sleep(self.retry_backoff_seconds * 2 ** (retry - 1))
+            try:
+                response = self.http_session.post(self.http_provider_uri, json=pending_rpc_request,
+                                                  timeout=self.request_timeout)
+                response.raise_for_status()
+                batch_rpc_responses = response.json()
+                if not isinstance(batch_rpc_responses, list):  # Node returned an error for the whole batch
+                    raise ValueError(batch_rpc_responses)
+            except (IOError, ValueError):
+                logger.warning('Error retrieving %d blocks, retry=%d', len(pending_rpc_request), retry,
+                               exc_info=True)
+                continue
+
+            failed_ids = set()
+            for rpc_response in batch_rpc_responses:
+                if 'error' in rpc_response:
+                    failed_ids.add(rpc_response.get('id'))
+                else:
+                    rpc_responses.append(rpc_response)
+            pending_rpc_request = [request for request in pending_rpc_request if request['id'] in failed_ids]
+            if not pending_rpc_request:
+                break
+
+        if pending_rpc_request:
+            logger.warning('Cannot retrieve block-numbers=%s after %d retries',
+                           [request['id'] for request in pending_rpc_request], self.request_retries)
+        return rpc_responses
+
+    def _do_request(self, rpc_request: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Splits the JSON-RPC requests in batches of `batch_size` and sends `max_concurrent_requests` batches
+        at the same time. Small batches keep responses small and don't time out on hosted nodes
+        :param rpc_request: List of JSON-RPC requests
+        :return: List of JSON-RPC responses for the requests that succeeded
+        """
+        batches = [rpc_request[i:i + self.batch_size] for i in range(0, len(rpc_request), self.batch_size)]
+        if len(batches) <= 1:
+            return self._do_batch_request(rpc_request) if rpc_request else []
 
-    def get_tx_gas_prices(self, block_numbers: Iterable[int]) -> List[int]:
+        rpc_responses = []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_requests, len(batches))) as executor:
+            for batch_rpc_responses in executor.map(self._do_batch_request, batches):
+                rpc_responses.extend(batch_rpc_responses)
+        return rpc_responses
+
+    def _get_blocks_gas_prices(self, block_numbers: Iterable[int]) -> Dict[int, BlockGasPrices]:
         """
         :param block_numbers: Block numbers to retrieve
-        :return: Return a list with `gas_price` for every block provided
+        :return: Dictionary of `block_number -> BlockGasPrices` with the non zero `gas_price` of every tx in the block.
+        Blocks not found (reorg or not mined yet) are not included
         """
-        cached_blocks = []
+        blocks_gas_prices = {}
         not_cached_block_numbers = []
 
         for block_number in block_numbers:
-            block = self._get_block_from_cache(block_number)
-            if block:
-                cached_blocks.append(block)
+            block_gas_prices = self._get_block_from_cache(block_number)
+            if block_gas_prices:
+                blocks_gas_prices[block_number] = block_gas_prices
             else:
                 not_cached_block_numbers.append(block_number)
 
-        rpc_request = [self._build_block_request(block_number, full_transactions=True)
-                       for block_number in not_cached_block_numbers]
+        if not_cached_block_numbers:
+            rpc_request = [self._build_block_request(block_number, full_transactions=True)
+                           for block_number in not_cached_block_numbers]
 
-        requested_blocks = []
-        for rpc_response in self._do_request(rpc_request):
-            block = rpc_response['result']
-            if block:
-                requested_blocks.append(block)
-                block_number = int(block['number'], 16)
-                self._store_block_in_cache(block_number, block)
-            else:
-                block_number = rpc_response['id']
-                logger.warning('Cannot find block-number=%d, a reorg happened', block_number)
+            for rpc_response in self._do_request(rpc_request):
+                block = rpc_response.get('result')
+                if block:
+                    block_number = int(block['number'], 16)
+                    block_gas_prices = BlockGasPrices.from_block(block)
+                    blocks_gas_prices[block_number] = block_gas_prices
+                    self._store_block_in_cache(block_number, block_gas_prices)
+                else:
+                    block_number = rpc_response['id']
+                    logger.warning('Cannot find block-number=%d, a reorg happened', block_number)
 
-        gas_prices = []
-        for block in requested_blocks + cached_blocks:
-            for transaction in block['transactions']:
-                gas_price = int(transaction['gasPrice'], 16)
-                # Don't include miner transactions (0 gasPrice)
-                if gas_price:
-                    gas_prices.append(gas_price)
+        return blocks_gas_prices
 
+    def get_tx_gas_prices(self, block_numbers: Iterable[int]) -> List[int]:
+        """
+        :param block_numbers: Block numbers to retrieve
+        :return: Return a list with `gas_price` for every block provided
+        """
+        gas_prices = []
+        for block_gas_prices in self._get_blocks_gas_prices(block_numbers).values():
+            gas_prices.extend(block_gas_prices.gas_prices.tolist())
         return gas_prices
 
-    def calculate_gas_prices(self) -> GasPrice:
-        current_block_number = self.w3.eth.blockNumber
-        block_numbers = range(current_block_number - self.number_of_blocks, current_block_number)
-        gas_prices = self.get_tx_gas_prices(block_numbers)
+    def update_blocks_window(self, current_block_number: int):
+        """
+        Slides the window of blocks to `[current_block_number - number_of_blocks, current_block_number)`. Blocks
+        out of the window are evicted and only blocks not already processed are retrieved
+        :param current_block_number:
+        """
+        first_block_number = max(current_block_number - self.number_of_blocks, 0)
+        for block_number in list(self.blocks_gas_prices):
+            if not (first_block_number <= block_number < current_block_number):
+                self._evict_block(block_number)
+
+        missing_block_numbers = [block_number for block_number in range(first_block_number, current_block_number)
+                                 if block_number not in self.blocks_gas_prices]
+        if missing_block_numbers:
+            self.blocks_gas_prices.update(self._get_blocks_gas_prices(missing_block_numbers))
+            self.blocks_gas_prices = OrderedDict(sorted(self.blocks_gas_prices.items()))
+            logger.debug('Retrieved %d blocks for gas price calculation', len(missing_block_numbers))
+            self._evict_reorged_blocks(missing_block_numbers)
+
+        if self.use_sketch:
+            for block_number, block_gas_prices in self.blocks_gas_prices.items():
+                if block_number not in self.blocks_sketches:
+                    self.blocks_sketches[block_number] = GasPriceSketch().add(block_gas_prices.gas_prices)
+
+    def get_window_gas_prices(self) -> np.ndarray:
+        """
+        :return: np.array with all the gas prices inside the window
+        """
+        if not self.blocks_gas_prices:
+            return np.array([], dtype=np.uint64)
+        return np.concatenate([block_gas_prices.gas_prices for block_gas_prices in self.blocks_gas_prices.values()])
 
-        if not gas_prices:
-            raise NoBlocksFound
+    def get_window_sketch(self) -> GasPriceSketch:
+        """
+        :return: GasPriceSketch for all the gas prices inside the window
+        """
+        return GasPriceSketch.merge_all(self.blocks_sketches.values())
+
+    def _evict_block(self, block_number: int):
+        self.blocks_gas_prices.pop(block_number, None)
+        self.blocks_sketches.pop(block_number, None)
+
+    def _evict_reorged_blocks(self, block_numbers: Iterable[int]):
+        """
+        Checks `parent_hash` of the blocks just retrieved against the hash of the previous block stored. If they don't
+        match a reorg happened, so previous block is removed from the window and from the cache to be retrieved again
+        on next calculation
+        :param block_numbers: Block numbers just retrieved
+        """
+        for block_number in block_numbers:
+            block_gas_prices = self.blocks_gas_prices.get(block_number)
+            previous_block_gas_prices = self.blocks_gas_prices.get(block_number - 1)
+            if (block_gas_prices and block_gas_prices.parent_hash and previous_block_gas_prices
+                    and previous_block_gas_prices.block_hash != block_gas_prices.parent_hash):
+                logger.warning('Reorg detected on block-number=%d, evicting it', block_number - 1)
+                self._evict_block(block_number - 1)
+                self._delete_block_from_cache(block_number - 1)
+
+    def _calculate_window_percentiles(self) -> Tuple[int, int, int, int, int]:
+        """
+        :return: Tuple with `lowest`, `percentile 30`, `percentile 50`, `percentile 75` and `fastest` gas prices
+        in the window
+        :raises: NoBlocksFound
+        """
+        if self.use_sketch:
+            sketch = self.get_window_sketch()
+            if not len(sketch):
+                raise NoBlocksFound
+            return (sketch.min, math.ceil(sketch.percentile(30)), math.ceil(sketch.percentile(50)),
+                    math.ceil(sketch.percentile(75)), sketch.max)
         else:
-            np_gas_prices = np.array(gas_prices)
-            lowest = np_gas_prices.min() + self.constant_gas_increment
-            safe_low = math.ceil(np.percentile(np_gas_prices, 30)) + self.constant_gas_increment
-            standard = math.ceil(np.percentile(np_gas_prices, 50)) + self.constant_gas_increment
-            fast = math.ceil(np.percentile(np_gas_prices, 75)) + self.constant_gas_increment
-            fastest = np_gas_prices.max() + self.constant_gas_increment
-
-            gas_price = GasPrice.objects.create(lowest=lowest,
-                                                safe_low=safe_low,
-                                                standard=standard,
-                                                fast=fast,
-                                                fastest=fastest)
-
-            self._store_gas_price_in_cache(gas_price)
-            logger.info(f'Calculated gas price lowest={lowest} safe_low={safe_low} standard={standard} '
-                        f'fast={fast} fastest={fastest}')
-            return gas_price
+            np_gas_prices = self.get_window_gas_prices()
+            if not np_gas_prices.size:
+                raise NoBlocksFound
+            return (int(np_gas_prices.min()), math.ceil(np.percentile(np_gas_prices, 30)),
+                    math.ceil(np.percentile(np_gas_prices, 50)), math.ceil(np.percentile(np_gas_prices, 75)),
+                    int(np_gas_prices.max()))
+
+    def calculate_gas_prices(self, current_block_number: Optional[int] = None) -> GasPrice:
+        """
+        :param current_block_number: If not provided, it will be retrieved from the node
+        :return: GasPrice calculated and stored in database and cache
+        """
+        if current_block_number is None:
+            current_block_number = self.w3.eth.blockNumber
+        self.update_blocks_window(current_block_number)
+        lowest, safe_low, standard, fast, fastest = [gas_price + self.constant_gas_increment
+                                                     for gas_price in self._calculate_window_percentiles()]
+
+        gas_price = GasPrice.objects.create(lowest=lowest,
+                                            safe_low=safe_low,
+                                            standard=standard,
+                                            fast=fast,
+                                            fastest=fastest)
+
+        self._store_gas_price_in_cache(gas_price)
+        self._store_last_block_number_in_cache(current_block_number)
+        logger.info(f'Calculated gas price lowest={lowest} safe_low={safe_low} standard={standard} '
+                    f'fast={fast} fastest={fastest}')
+        return gas_price
+
+    def calculate_gas_prices_on_new_block(self) -> Optional[GasPrice]:
+        """
+        Recalculates gas prices only if the head of the chain changed since the last calculation, so it's cheap to
+        call it very often (just one `eth_blockNumber` call if no new block was mined)
+        :return: GasPrice if recalculated, `None` if no new block was found
+        """
+        current_block_number = self.w3.eth.blockNumber
+        if current_block_number == self._get_last_block_number_from_cache():
+            return None
+        return self.calculate_gas_prices(current_block_number=current_block_number)
+
+    def follow_head(self, poll_interval: float = 2., use_block_filter: bool = True,
+                    max_iterations: Optional[int] = None):
+        """
+        Recalculates gas prices every time the head of the chain changes. A block filter (`eth_newBlockFilter` and
+        `eth_getFilterChanges`) is used if supported by the node, if not `eth_blockNumber` is polled
+        :param poll_interval: Seconds to wait between checks for new blocks
+        :param use_block_filter: Use a block filter instead of polling `eth_blockNumber`
+        :param max_iterations: Stop after that number of checks. If `None` it will run forever
+        """
+        block_filter = None
+        if use_block_filter:
+            try:
+                block_filter = self.w3.eth.filter('latest')
+            except ValueError:
+                logger.warning('Node does not support block filters, polling `eth_blockNumber`', exc_info=True)
+
+        iteration = 0
+        while max_iterations is None or iteration < max_iterations:
+            iteration += 1
+            try:
+                if block_filter:
+                    try:
+                        new_blocks = block_filter.get_new_entries()
+                    except ValueError:  # Filter expired or node restarted
+                        logger.warning('Block filter not valid anymore, polling `eth_blockNumber`', exc_info=True)
+                        block_filter = None
+                        new_blocks = True
+                    if new_blocks:
+                        self.calculate_gas_prices_on_new_block()
+                else:
+                    self.calculate_gas_prices_on_new_block()
+            except NoBlocksFound:
+                logger.warning('No blocks found for gas price calculation')
+            except IOError:
+                logger.warning('Problem connecting to node, cannot calculate gas price', exc_info=True)
+            except Exception:  # Node errors (`ValueError`), database errors... must not stop the follower
+                logger.error('Cannot calculate gas price', exc_info=True)
+                close_old_connections()
+
+            if max_iterations is None or iteration < max_iterations:
+                time.sleep(poll_interval)
 
     def get_gas_prices(self) -> GasPrice:
         gas_price = self._get_gas_price_from_cache()
@@ -178,12 +487,15 @@ class GasStationMock(GasStation):
             self.fast = Web3.toWei(gas_price + 3, 'gwei')
             self.fastest = Web3.toWei(gas_price + 4, 'gwei')
 
-    def calculate_gas_prices(self) -> GasPrice:
+    def calculate_gas_prices(self, current_block_number: Optional[int] = None) -> GasPrice:
         return GasPrice(lowest=self.lowest,
                         safe_low=self.safe_low,
                         standard=self.standard,
                         fast=self.fast,
                         fastest=self.fastest)
 
+    def calculate_gas_prices_on_new_block(self) -> Optional[GasPrice]:
+        return self.calculate_gas_prices()
+
     def get_gas_prices(self) -> GasPrice:
         return self.calculate_gas_prices()
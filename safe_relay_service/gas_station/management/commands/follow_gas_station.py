@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from ...gas_station import GasStationMock, GasStationProvider
+
+
+class Command(BaseCommand):
+    help = 'Recalculate gas prices every time a new block is mined'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', help='Seconds between checks for new blocks', type=float, default=2.)
+        parser.add_argument('--no-filter', help='Poll `eth_blockNumber` instead of using a block filter',
+                            action='store_true', default=False)
+
+    def handle(self, *args, **options):
+        gas_station = GasStationProvider()
+        if isinstance(gas_station, GasStationMock):
+            self.stdout.write(self.style.WARNING('Gas Station mock is configured, nothing to follow'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Following new blocks to calculate gas prices'))
+        gas_station.follow_head(poll_interval=options['poll_interval'], use_block_filter=not options['no_filter'])
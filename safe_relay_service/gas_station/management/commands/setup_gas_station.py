@@ -6,15 +6,44 @@ from django_celery_beat.models import IntervalSchedule, PeriodicTask
 class Command(BaseCommand):
     help = 'Setup Gas Price calculation task'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--follow-head', help='Check every few seconds for new blocks and only recalculate gas '
+                                                  'prices when a new block is found', action='store_true',
+                            default=False)
+
     def handle(self, *args, **options):
-        task_name = 'safe_relay_service.gas_station.tasks.calculate_gas_prices'
-        if PeriodicTask.objects.filter(task=task_name).count():
-            self.stdout.write(self.style.SUCCESS('Task was already created'))
+        follow_head_task_name = 'safe_relay_service.gas_station.tasks.calculate_gas_prices_on_new_block'
+        periodic_task_name = 'safe_relay_service.gas_station.tasks.calculate_gas_prices'
+        if options['follow_head']:
+            task_name, unused_task_name = follow_head_task_name, periodic_task_name
+            description = 'Gas Price Calculation on New Block'
+            every, period = 5, IntervalSchedule.SECONDS
         else:
-            interval, _ = IntervalSchedule.objects.get_or_create(every=5, period='minutes')
-            PeriodicTask.objects.create(
-                name='Gas Price Calculation',
-                task=task_name,
-                interval=interval
-            )
-            self.stdout.write(self.style.SUCCESS('Created Periodic Task for Gas Price calculation every 5 minutes'))
+            task_name, unused_task_name = periodic_task_name, follow_head_task_name
+            description = 'Gas Price Calculation'
+            every, period = 5, IntervalSchedule.MINUTES
+
+        # Only one gas price calculation task must be running. Tasks are saved one by one, so beat is notified
+        for periodic_task in PeriodicTask.objects.filter(task__in=(task_name, unused_task_name)):
+            enabled = periodic_task.task == task_name
+            if periodic_task.enabled != enabled:
+                periodic_task.enabled = enabled
+                periodic_task.save()
+                action = 'Enabled' if enabled else 'Disabled'
+                self.stdout.write(self.style.SUCCESS('%s task %s' % (action, periodic_task.task)))
+
+        tasks = [(task_name, description, every, period),
+                 ('safe_relay_service.gas_station.tasks.compact_gas_prices_task', 'Gas Price Compaction',
+                  1, IntervalSchedule.HOURS)]
+        for task_name, description, every, period in tasks:
+            if PeriodicTask.objects.filter(task=task_name).count():
+                self.stdout.write(self.style.SUCCESS('Task %s was already created' % task_name))
+            else:
+                interval, _ = IntervalSchedule.objects.get_or_create(every=every, period=period)
+                PeriodicTask.objects.create(
+                    name=description,
+                    task=task_name,
+                    interval=interval
+                )
+                self.stdout.write(self.style.SUCCESS('Created Periodic Task for %s every %d %s' % (description,
+                                                                                                   every, period)))
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.6 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gas_station', '0002_auto_20180604_1627'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gasprice',
+            index=models.Index(fields=['created'], name='gas_station_created_27327a_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 2.2.6 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gas_station', '0003_gasprice_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GasPriceDaily',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(unique=True)),
+                ('number', models.PositiveIntegerField()),
+                ('lowest_min', models.BigIntegerField()),
+                ('lowest_avg', models.BigIntegerField()),
+                ('lowest_max', models.BigIntegerField()),
+                ('safe_low_min', models.BigIntegerField()),
+                ('safe_low_avg', models.BigIntegerField()),
+                ('safe_low_max', models.BigIntegerField()),
+                ('standard_min', models.BigIntegerField()),
+                ('standard_avg', models.BigIntegerField()),
+                ('standard_max', models.BigIntegerField()),
+                ('fast_min', models.BigIntegerField()),
+                ('fast_avg', models.BigIntegerField()),
+                ('fast_max', models.BigIntegerField()),
+                ('fastest_min', models.BigIntegerField()),
+                ('fastest_avg', models.BigIntegerField()),
+                ('fastest_max', models.BigIntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'Gas prices daily',
+                'abstract': False,
+                'get_latest_by': 'bucket',
+            },
+        ),
+        migrations.CreateModel(
+            name='GasPriceHourly',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(unique=True)),
+                ('number', models.PositiveIntegerField()),
+                ('lowest_min', models.BigIntegerField()),
+                ('lowest_avg', models.BigIntegerField()),
+                ('lowest_max', models.BigIntegerField()),
+                ('safe_low_min', models.BigIntegerField()),
+                ('safe_low_avg', models.BigIntegerField()),
+                ('safe_low_max', models.BigIntegerField()),
+                ('standard_min', models.BigIntegerField()),
+                ('standard_avg', models.BigIntegerField()),
+                ('standard_max', models.BigIntegerField()),
+                ('fast_min', models.BigIntegerField()),
+                ('fast_avg', models.BigIntegerField()),
+                ('fast_max', models.BigIntegerField()),
+                ('fastest_min', models.BigIntegerField()),
+                ('fastest_avg', models.BigIntegerField()),
+                ('fastest_max', models.BigIntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'Gas prices hourly',
+                'abstract': False,
+                'get_latest_by': 'bucket',
+            },
+        ),
+    ]
@@ -1,9 +1,57 @@
+import datetime
+from typing import Optional
+
 from django.db import models
+from django.db.models import Avg, Count, Func, Max, Min
+from django.db.models.functions import Cast
 
 from model_utils.models import TimeStampedModel
 
 
+class TruncSeconds(Func):
+    """
+    Truncates a datetime to buckets of `seconds` seconds (PostgreSQL)
+    """
+    template = "to_timestamp(floor(extract(epoch from %(expressions)s) / %(seconds)d) * %(seconds)d)"
+    output_field = models.DateTimeField()
+
+    def __init__(self, expression, seconds: int, **extra):
+        super().__init__(expression, seconds=seconds, **extra)
+
+
+class GasPriceQuerySet(models.QuerySet):
+    gas_price_fields = ('lowest', 'safe_low', 'standard', 'fast', 'fastest')
+
+    def bucketed(self, seconds: int):
+        """
+        :param seconds: Size of the buckets
+        :return: Queryset of dictionaries with `bucket` (start of the bucket), `number` of gas prices and `min`, `avg`
+        and `max` for every gas price field (e.g. `standard_min`, `standard_avg`, `standard_max`)
+        """
+        aggregates = {'number': Count('id')}
+        for field in self.gas_price_fields:
+            aggregates[field + '_min'] = Min(field)
+            aggregates[field + '_avg'] = Cast(Avg(field), models.BigIntegerField())
+            aggregates[field + '_max'] = Max(field)
+        return self.annotate(
+            bucket=TruncSeconds('created', seconds)
+        ).values('bucket').annotate(**aggregates).order_by('bucket')
+
+    def delete_older_than(self, date: datetime.datetime, batch_size: int = 5000) -> int:
+        """
+        Deletes gas prices using small batches, so tables are not locked for a long time
+        :return: Number of gas prices deleted
+        """
+        deleted = 0
+        while True:
+            ids = list(self.filter(created__lt=date).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += self.model.objects.filter(id__in=ids).delete()[0]
+
+
 class GasPrice(TimeStampedModel):
+    objects = GasPriceQuerySet.as_manager()
     lowest = models.BigIntegerField()
     safe_low = models.BigIntegerField()
     standard = models.BigIntegerField()
@@ -12,6 +60,9 @@ class GasPrice(TimeStampedModel):
 
     class Meta:
         get_latest_by = 'created'
+        indexes = [
+            models.Index(fields=['created']),
+        ]
 
     def __str__(self):
         return '%s lowest=%d safe_low=%d standard=%d fast=%d fastest=%d' % (self.created,
@@ -20,3 +71,77 @@ class GasPrice(TimeStampedModel):
                                                                             self.standard,
                                                                             self.fast,
                                                                             self.fastest)
+
+
+class GasPriceAggregateQuerySet(models.QuerySet):
+    def rolled_until(self) -> Optional[datetime.datetime]:
+        """
+        :return: End of the last bucket rolled up, `None` if nothing was rolled up
+        """
+        last_bucket = self.aggregate(last_bucket=Max('bucket'))['last_bucket']
+        if last_bucket:
+            return last_bucket + datetime.timedelta(seconds=self.model.bucket_seconds)
+
+    def delete_older_than(self, date: datetime.datetime) -> int:
+        return self.filter(bucket__lt=date).delete()[0]
+
+    def rollup(self, until: datetime.datetime) -> int:
+        """
+        Aggregates gas prices for the buckets completed until `until` not rolled up yet
+        :return: Number of buckets created
+        """
+        bucket_seconds = self.model.bucket_seconds
+        until = datetime.datetime.fromtimestamp(until.timestamp() // bucket_seconds * bucket_seconds,
+                                                datetime.timezone.utc)
+        gas_prices = GasPrice.objects.filter(created__lt=until)
+        rolled_until = self.rolled_until()
+        if rolled_until:
+            gas_prices = gas_prices.filter(created__gte=rolled_until)
+        return len(self.bulk_create([self.model(**values) for values in gas_prices.bucketed(bucket_seconds)],
+                                    ignore_conflicts=True))
+
+
+class GasPriceAggregate(models.Model):
+    """
+    Gas prices aggregated for a bucket of time, with the same fields as `GasPriceQuerySet.bucketed`
+    """
+    bucket_seconds: int = None
+    objects = GasPriceAggregateQuerySet.as_manager()
+    bucket = models.DateTimeField(unique=True)
+    number = models.PositiveIntegerField()
+    lowest_min = models.BigIntegerField()
+    lowest_avg = models.BigIntegerField()
+    lowest_max = models.BigIntegerField()
+    safe_low_min = models.BigIntegerField()
+    safe_low_avg = models.BigIntegerField()
+    safe_low_max = models.BigIntegerField()
+    standard_min = models.BigIntegerField()
+    standard_avg = models.BigIntegerField()
+    standard_max = models.BigIntegerField()
+    fast_min = models.BigIntegerField()
+    fast_avg = models.BigIntegerField()
+    fast_max = models.BigIntegerField()
+    fastest_min = models.BigIntegerField()
+    fastest_avg = models.BigIntegerField()
+    fastest_max = models.BigIntegerField()
+
+    class Meta:
+        abstract = True
+        get_latest_by = 'bucket'
+
+    def __str__(self):
+        return '%s number=%d standard_avg=%d' % (self.bucket, self.number, self.standard_avg)
+
+
+class GasPriceHourly(GasPriceAggregate):
+    bucket_seconds = 60 * 60
+
+    class Meta(GasPriceAggregate.Meta):
+        verbose_name_plural = 'Gas prices hourly'
+
+
+class GasPriceDaily(GasPriceAggregate):
+    bucket_seconds = 24 * 60 * 60
+
+    class Meta(GasPriceAggregate.Meta):
+        verbose_name_plural = 'Gas prices daily'
@@ -0,0 +1,79 @@
+import math
+from typing import Iterable
+
+import numpy as np
+
+
+class GasPriceSketch:
+    """
+    Mergeable quantile sketch for gas prices. Values are counted in logarithmic buckets, so every percentile is
+    returned with a relative error lower than `relative_accuracy`. Sketches with the same configuration can be merged
+    just by adding the counts of the buckets, so percentiles for a window of blocks can be calculated merging the
+    sketches of every block instead of sorting all the gas prices.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005, max_value: int = 10**14):
+        """
+        :param relative_accuracy: Max relative error for the percentiles returned
+        :param max_value: Max value that can be stored (in wei). Bigger values are stored in the last bucket.
+        Default is 100000 Gwei
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_value = max_value
+        self.number_buckets = int(self._bucket_index(np.array([max_value]))[0]) + 1
+        self.counts = np.zeros(self.number_buckets, dtype=np.uint32)
+        self.min = None
+        self.max = None
+
+    def __len__(self):
+        return int(self.counts.sum())
+
+    def _bucket_index(self, values: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(np.maximum(values, 1).astype(np.float64)) / self.log_gamma).astype(np.int64)
+
+    def _bucket_value(self, index: int) -> float:
+        """
+        :return: Value for the bucket, with a relative error lower than `relative_accuracy` for every value
+        stored in it
+        """
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, values: Iterable[int]) -> 'GasPriceSketch':
+        values = np.asarray(values, dtype=np.uint64)
+        if values.size:
+            indexes = np.minimum(self._bucket_index(values), self.number_buckets - 1)
+            self.counts += np.bincount(indexes, minlength=self.number_buckets).astype(np.uint32)
+            values_min, values_max = int(values.min()), int(values.max())
+            self.min = values_min if self.min is None else min(self.min, values_min)
+            self.max = values_max if self.max is None else max(self.max, values_max)
+        return self
+
+    def merge(self, other: 'GasPriceSketch') -> 'GasPriceSketch':
+        if self.number_buckets != other.number_buckets or self.gamma != other.gamma:
+            raise ValueError('Cannot merge sketches with different configuration')
+        self.counts += other.counts
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merge_all(cls, sketches: Iterable['GasPriceSketch'], **kwargs) -> 'GasPriceSketch':
+        merged_sketch = cls(**kwargs)
+        for sketch in sketches:
+            merged_sketch.merge(sketch)
+        return merged_sketch
+
+    def percentile(self, q: float) -> float:
+        """
+        :param q: Percentile to compute, between 0 and 100
+        :return: Approximated percentile, always inside `[min, max]`
+        """
+        total = len(self)
+        if not total:
+            raise ValueError('Cannot calculate percentile of an empty sketch')
+        rank = q / 100 * (total - 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank, side='right'))
+        return min(max(self._bucket_value(index), self.min), self.max)
@@ -1,9 +1,14 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
 from celery import app
 from celery.utils.log import get_task_logger
 from requests.exceptions import ConnectionError as RequestsConnectionError
 
 from .gas_station import GasStationProvider
-from .models import GasPrice
+from .models import GasPrice, GasPriceDaily, GasPriceHourly
 
 logger = get_task_logger(__name__)
 
@@ -16,3 +21,39 @@ def calculate_gas_prices() -> GasPrice:
         logger.info(gas_price)
     except RequestsConnectionError:
         logger.warning('Problem connecting to node, cannot calculate gas price', exc_info=True)
+
+
+@app.shared_task(soft_time_limit=60)
+def calculate_gas_prices_on_new_block() -> None:
+    """
+    Recalculate gas prices only if a new block was mined. Designed to be scheduled very often
+    """
+    try:
+        gas_price = GasStationProvider().calculate_gas_prices_on_new_block()
+        if gas_price:
+            logger.info(gas_price)
+    except RequestsConnectionError:
+        logger.warning('Problem connecting to node, cannot calculate gas price', exc_info=True)
+
+
+@app.shared_task(soft_time_limit=60 * 30)
+def compact_gas_prices_task() -> int:
+    """
+    Rolls up gas prices into hourly and daily summaries and deletes the raw gas prices and hourly summaries older
+    than the configured retention
+    :return: Number of raw gas prices deleted
+    """
+    now = timezone.now()
+    hourly_created = GasPriceHourly.objects.rollup(now)
+    daily_created = GasPriceDaily.objects.rollup(now)
+    logger.info('Rolled up %d hourly and %d daily gas prices', hourly_created, daily_created)
+
+    # Never delete raw gas prices not rolled up yet
+    rolled_until = min(GasPriceHourly.objects.rolled_until() or now, GasPriceDaily.objects.rolled_until() or now)
+    raw_horizon = min(now - datetime.timedelta(days=settings.GAS_STATION_RAW_RETENTION_DAYS), rolled_until)
+    deleted = GasPrice.objects.delete_older_than(raw_horizon, batch_size=settings.GAS_STATION_COMPACTION_BATCH_SIZE)
+    hourly_deleted = GasPriceHourly.objects.delete_older_than(
+        now - datetime.timedelta(days=settings.GAS_STATION_HOURLY_RETENTION_DAYS)
+    )
+    logger.info('Deleted %d gas prices older than %s and %d hourly gas prices', deleted, raw_horizon, hourly_deleted)
+    return deleted
@@ -0,0 +1,25 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from django_celery_beat.models import PeriodicTask
+
+
+class TestCommands(TestCase):
+    def test_setup_gas_station(self):
+        periodic_task_name = 'safe_relay_service.gas_station.tasks.calculate_gas_prices'
+        follow_head_task_name = 'safe_relay_service.gas_station.tasks.calculate_gas_prices_on_new_block'
+        buf = StringIO()
+        call_command('setup_gas_station', stdout=buf)
+        self.assertTrue(PeriodicTask.objects.get(task=periodic_task_name).enabled)
+        self.assertFalse(PeriodicTask.objects.filter(task=follow_head_task_name).exists())
+
+        # Only the task in use is enabled
+        call_command('setup_gas_station', '--follow-head', stdout=buf)
+        self.assertFalse(PeriodicTask.objects.get(task=periodic_task_name).enabled)
+        self.assertTrue(PeriodicTask.objects.get(task=follow_head_task_name).enabled)
+
+        call_command('setup_gas_station', stdout=buf)
+        self.assertTrue(PeriodicTask.objects.get(task=periodic_task_name).enabled)
+        self.assertFalse(PeriodicTask.objects.get(task=follow_head_task_name).enabled)
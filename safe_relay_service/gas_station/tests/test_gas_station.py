@@ -1,7 +1,12 @@
+from unittest import mock
+
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 
-from ..gas_station import GasStation, NoBlocksFound
+import numpy as np
+
+from ..gas_station import BlockGasPrices, GasStation, NoBlocksFound
 from .factories import GasPriceFactory
 
 
@@ -48,3 +53,154 @@ class TestGasStation(TestCase):
         gas_price_newest = GasPriceFactory()
         gas_station = GasStation(settings.ETHEREUM_NODE_URL, settings.GAS_STATION_NUMBER_BLOCKS)
         self.assertEqual(gas_station.get_gas_prices(), gas_price_newest)
+
+    def test_update_blocks_window(self):
+        gas_station = GasStation(http_provider_uri='http://localhost:8545', number_of_blocks=10)
+
+        def get_blocks_gas_prices(block_numbers):
+            return {block_number: BlockGasPrices(block_number.to_bytes(32, 'big'),
+                                                 np.array([block_number], dtype=np.uint64))
+                    for block_number in block_numbers}
+
+        with mock.patch.object(gas_station, '_get_blocks_gas_prices',
+                               side_effect=get_blocks_gas_prices) as get_blocks_gas_prices_mock:
+            gas_station.update_blocks_window(100)
+            get_blocks_gas_prices_mock.assert_called_once_with(list(range(90, 100)))
+            self.assertEqual(gas_station.get_window_gas_prices().tolist(), list(range(90, 100)))
+
+            # Only new blocks are retrieved, old ones are evicted
+            get_blocks_gas_prices_mock.reset_mock()
+            gas_station.update_blocks_window(102)
+            get_blocks_gas_prices_mock.assert_called_once_with([100, 101])
+            self.assertEqual(gas_station.get_window_gas_prices().tolist(), list(range(92, 102)))
+            self.assertEqual(list(gas_station.blocks_gas_prices), list(range(92, 102)))
+
+            # Nothing new, nothing is retrieved
+            get_blocks_gas_prices_mock.reset_mock()
+            gas_station.update_blocks_window(102)
+            get_blocks_gas_prices_mock.assert_not_called()
+
+    def test_block_gas_prices_cache(self):
+        gas_station = GasStation(http_provider_uri='http://localhost:8545', number_of_blocks=10)
+        block = {
+            'number': '0x10',
+            'hash': '0x' + 'ab' * 32,
+            'parentHash': '0x' + 'cd' * 32,
+            'transactions': [{'gasPrice': '0x0'}, {'gasPrice': '0x3b9aca00'}, {'gasPrice': '0x1'}],
+        }
+        block_gas_prices = BlockGasPrices.from_block(block)
+        self.assertEqual(block_gas_prices.gas_prices.tolist(), [1000000000, 1])
+        self.assertEqual(block_gas_prices.block_hash, b'\xab' * 32)
+        self.assertEqual(block_gas_prices.parent_hash, b'\xcd' * 32)
+
+        decoded_block_gas_prices = BlockGasPrices.from_bytes(block_gas_prices.to_bytes())
+        self.assertEqual(decoded_block_gas_prices.block_hash, block_gas_prices.block_hash)
+        self.assertEqual(decoded_block_gas_prices.gas_prices.tolist(), block_gas_prices.gas_prices.tolist())
+
+        # Legacy full blocks are migrated to the compact format when read
+        block_number = 16
+        legacy_cache_key = gas_station._get_legacy_block_cache_key(block_number)
+        cache.set(legacy_cache_key, block)
+        self.assertEqual(gas_station._get_block_from_cache(block_number).gas_prices.tolist(), [1000000000, 1])
+        self.assertIsNone(cache.get(legacy_cache_key))
+        self.assertEqual(cache.get(gas_station._get_block_cache_key(block_number)), block_gas_prices.to_bytes())
+
+    def test_do_request_batches(self):
+        gas_station = GasStation(http_provider_uri='http://localhost:8545', number_of_blocks=10, batch_size=3,
+                                 max_concurrent_requests=2, request_retries=2, retry_backoff_seconds=0)
+        failed_ids = set()
+
+        def post(url, json=None, timeout=None):
+            rpc_responses = []
+            for request in json:
+                if request['id'] == 4 and request['id'] not in failed_ids:  # Fail only the first time
+                    failed_ids.add(request['id'])
+                    rpc_responses.append({'jsonrpc': '2.0', 'id': request['id'],
+                                          'error': {'code': -32000, 'message': 'timeout'}})
+                else:
+                    rpc_responses.append({'jsonrpc': '2.0', 'id': request['id'], 'result': None})
+            response = mock.MagicMock()
+            response.json.return_value = rpc_responses
+            return response
+
+        rpc_request = [gas_station._build_block_request(block_number) for block_number in range(8)]
+        with mock.patch.object(gas_station.http_session, 'post', side_effect=post) as post_mock:
+            rpc_responses = gas_station._do_request(rpc_request)
+            # 3 batches + 1 retry for the failed block
+            self.assertEqual(post_mock.call_count, 4)
+        self.assertEqual(sorted(rpc_response['id'] for rpc_response in rpc_responses), list(range(8)))
+
+        # Batch failing all the retries is ignored, the rest of the batches are returned
+        def post_failing(url, json=None, timeout=None):
+            if json[0]['id'] == 0:
+                raise ConnectionError
+            return post(url, json=json, timeout=timeout)
+
+        with mock.patch.object(gas_station.http_session, 'post', side_effect=post_failing) as post_mock:
+            rpc_responses = gas_station._do_request(rpc_request)
+            self.assertEqual(post_mock.call_count, 2 + 3)
+        self.assertEqual(sorted(rpc_response['id'] for rpc_response in rpc_responses), list(range(3, 8)))
+
+    def test_calculate_gas_prices_on_new_block(self):
+        gas_station = GasStation(http_provider_uri='http://localhost:8545', number_of_blocks=10)
+        gas_price = GasPriceFactory()
+        with mock.patch.object(GasStation, 'calculate_gas_prices', return_value=gas_price) as calculate_mock:
+            current_block_number = gas_station.w3.eth.blockNumber
+            self.assertEqual(gas_station.calculate_gas_prices_on_new_block(), gas_price)
+            calculate_mock.assert_called_once_with(current_block_number=current_block_number)
+
+            # Head didn't change, nothing is calculated
+            calculate_mock.reset_mock()
+            gas_station._store_last_block_number_in_cache(current_block_number)
+            self.assertIsNone(gas_station.calculate_gas_prices_on_new_block())
+            calculate_mock.assert_not_called()
+
+    def test_follow_head(self):
+        gas_station = GasStation(http_provider_uri='http://localhost:8545', number_of_blocks=10)
+        block_filter = mock.MagicMock()
+        block_filter.get_new_entries.side_effect = [[], ['0x' + '12' * 32], ValueError('filter not found')]
+        with mock.patch.object(gas_station.w3.eth, 'filter', return_value=block_filter), \
+                mock.patch.object(GasStation, 'calculate_gas_prices_on_new_block') as calculate_mock:
+            gas_station.follow_head(poll_interval=0, max_iterations=2)
+            self.assertEqual(calculate_mock.call_count, 1)
+
+            # Filter is not valid anymore, fall back to polling
+            calculate_mock.reset_mock()
+            gas_station.follow_head(poll_interval=0, max_iterations=3)
+            self.assertEqual(calculate_mock.call_count, 3)
+
+            # Unexpected errors don't stop the follower
+            calculate_mock.reset_mock()
+            calculate_mock.side_effect = [ValueError('Node error'), None]
+            gas_station.follow_head(poll_interval=0, use_block_filter=False, max_iterations=2)
+            self.assertEqual(calculate_mock.call_count, 2)
+
+    def test_calculate_gas_prices_with_sketch(self):
+        gas_prices = {block_number: BlockGasPrices(block_number.to_bytes(32, 'big'),
+                                                   np.arange(1, 101, dtype=np.uint64) * block_number * 10**9)
+                      for block_number in range(90, 100)}
+        results = []
+        for use_sketch in (False, True):
+            gas_station = GasStation(http_provider_uri='http://localhost:8545', number_of_blocks=10,
+                                     use_sketch=use_sketch)
+            with mock.patch.object(gas_station, '_get_blocks_gas_prices', return_value=gas_prices):
+                results.append(gas_station.calculate_gas_prices(current_block_number=100))
+
+        exact_gas_price, sketch_gas_price = results
+        self.assertEqual(exact_gas_price.lowest, sketch_gas_price.lowest)
+        self.assertEqual(exact_gas_price.fastest, sketch_gas_price.fastest)
+        for field in ('safe_low', 'standard', 'fast'):
+            self.assertAlmostEqual(getattr(exact_gas_price, field), getattr(sketch_gas_price, field),
+                                   delta=getattr(exact_gas_price, field) * 0.01)
+
+    def test_get_network_version(self):
+        gas_station = GasStation(http_provider_uri='http://localhost:1', request_timeout=1)
+        self.assertIsNone(gas_station._w3)  # Node is not contacted when building the Gas Station
+        cache_key = gas_station._get_network_version_cache_key()
+        cache.delete(cache_key)
+        self.assertIsNone(gas_station.get_network_version())
+        self.assertIsNone(cache.get(cache_key))
+
+        cache.set(cache_key, 4)
+        self.assertEqual(gas_station.get_network_version(), 4)
+        cache.delete(cache_key)
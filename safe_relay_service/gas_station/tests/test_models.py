@@ -1,6 +1,10 @@
+import datetime
+
 from django.test import TestCase
+from django.utils import timezone
 
-from ..models import GasPrice
+from ..models import GasPrice, GasPriceDaily, GasPriceHourly
+from ..tasks import compact_gas_prices_task
 from .factories import GasPriceFactory
 
 
@@ -11,3 +15,47 @@ class TestModels(TestCase):
 
         self.assertEqual(gas_price_oldest, GasPrice.objects.earliest())
         self.assertEqual(gas_price_newest, GasPrice.objects.last())
+
+    def test_gas_price_delete_older_than(self):
+        now = timezone.now()
+        for days in range(5):
+            GasPriceFactory(created=now - datetime.timedelta(days=days))
+
+        self.assertEqual(GasPrice.objects.delete_older_than(now - datetime.timedelta(days=2), batch_size=1), 2)
+        self.assertEqual(GasPrice.objects.count(), 3)
+        self.assertEqual(GasPrice.objects.delete_older_than(now - datetime.timedelta(days=2)), 0)
+
+    def test_gas_price_rollup(self):
+        now = timezone.now().replace(minute=30)
+        one_hour_ago = now - datetime.timedelta(hours=1)
+        gas_prices = [GasPriceFactory(created=one_hour_ago) for _ in range(3)]
+        GasPriceFactory(created=now)  # Current bucket is not completed, it must not be rolled up
+
+        self.assertIsNone(GasPriceHourly.objects.rolled_until())
+        self.assertEqual(GasPriceHourly.objects.rollup(now), 1)
+        gas_price_hourly = GasPriceHourly.objects.get()
+        self.assertEqual(gas_price_hourly.bucket, one_hour_ago.replace(minute=0, second=0, microsecond=0))
+        self.assertEqual(gas_price_hourly.number, 3)
+        self.assertEqual(gas_price_hourly.standard_min, min(gas_price.standard for gas_price in gas_prices))
+        self.assertEqual(gas_price_hourly.standard_max, max(gas_price.standard for gas_price in gas_prices))
+        self.assertEqual(GasPriceHourly.objects.rolled_until(), now.replace(minute=0, second=0, microsecond=0))
+
+        # Rolled up buckets are not rolled up again
+        self.assertEqual(GasPriceHourly.objects.rollup(now), 0)
+        self.assertEqual(GasPriceHourly.objects.rollup(now + datetime.timedelta(hours=1)), 1)
+        self.assertEqual(GasPriceHourly.objects.count(), 2)
+
+    def test_compact_gas_prices_task(self):
+        now = timezone.now()
+        old_date = now - datetime.timedelta(days=400)
+        for _ in range(2):
+            GasPriceFactory(created=old_date)
+        GasPriceFactory(created=now)
+
+        with self.settings(GAS_STATION_RAW_RETENTION_DAYS=30, GAS_STATION_HOURLY_RETENTION_DAYS=365):
+            self.assertEqual(compact_gas_prices_task(), 2)
+
+        self.assertEqual(GasPrice.objects.count(), 1)
+        # Hourly summaries are deleted after the retention, daily summaries are kept forever
+        self.assertEqual(GasPriceHourly.objects.count(), 0)
+        self.assertEqual(GasPriceDaily.objects.get().number, 2)
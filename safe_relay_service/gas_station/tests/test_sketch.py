@@ -0,0 +1,35 @@
+from django.test import TestCase
+
+import numpy as np
+
+from ..sketch import GasPriceSketch
+
+
+class TestGasPriceSketch(TestCase):
+    def test_gas_price_sketch(self):
+        sketch = GasPriceSketch()
+        with self.assertRaises(ValueError):
+            sketch.percentile(50)
+
+        gas_prices = np.random.lognormal(mean=np.log(10**10), sigma=1., size=10000).astype(np.uint64)
+        sketch.add(gas_prices)
+        self.assertEqual(len(sketch), len(gas_prices))
+        self.assertEqual(sketch.min, gas_prices.min())
+        self.assertEqual(sketch.max, gas_prices.max())
+        self.assertGreaterEqual(sketch.percentile(0), gas_prices.min())
+        self.assertLessEqual(sketch.percentile(100), gas_prices.max())
+        for q in (30, 50, 75, 90):
+            exact = np.percentile(gas_prices, q)
+            self.assertAlmostEqual(sketch.percentile(q), exact, delta=exact * 0.01)
+
+    def test_merge(self):
+        gas_prices = np.random.randint(10**9, 10**11, size=(30, 200), dtype=np.uint64)
+        sketches = [GasPriceSketch().add(block_gas_prices) for block_gas_prices in gas_prices]
+        merged_sketch = GasPriceSketch.merge_all(sketches)
+        sketch = GasPriceSketch().add(gas_prices.flatten())
+        self.assertEqual(merged_sketch.counts.tolist(), sketch.counts.tolist())
+        self.assertEqual(merged_sketch.min, sketch.min)
+        self.assertEqual(merged_sketch.max, sketch.max)
+
+        with self.assertRaises(ValueError):
+            GasPriceSketch(relative_accuracy=0.1).merge(sketch)
@@ -1,18 +1,26 @@
 import datetime
+import hashlib
+import threading
+import time
+from typing import NamedTuple, Optional
 
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
 
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
 from rest_framework.pagination import LimitOffsetPagination
-from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .gas_station import GasStationProvider
-from .models import GasPrice
-from .serializers import GasPriceSerializer
+from .models import GasPrice, GasPriceDaily, GasPriceHourly
+from .serializers import GasPriceBucketSerializer, GasPriceSerializer
 
 
 class DefaultPagination(LimitOffsetPagination):
@@ -20,37 +28,136 @@ class DefaultPagination(LimitOffsetPagination):
     default_limit = 500
 
 
+class GasPriceSnapshot(NamedTuple):
+    gas_price_id: Optional[int]
+    content: bytes  # Serialized response
+    etag: str
+    expires: float  # `time.monotonic()` when snapshot must be refreshed
+
+
+class GasPriceSnapshotProvider:
+    """
+    Keeps the last `GasPrice` response serialized in memory for every worker, so most of the requests don't need to
+    use cache/database or serialize anything. Snapshot is refreshed after `ttl` seconds
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.snapshot: Optional[GasPriceSnapshot] = None
+        self.lock = threading.Lock()
+
+    def get_snapshot(self) -> GasPriceSnapshot:
+        snapshot = self.snapshot
+        if snapshot and snapshot.expires > time.monotonic():
+            return snapshot
+
+        with self.lock:
+            snapshot = self.snapshot
+            if snapshot and snapshot.expires > time.monotonic():  # Refreshed by other thread
+                return snapshot
+
+            gas_price = GasStationProvider().get_gas_prices()
+            expires = time.monotonic() + self.ttl
+            if snapshot and gas_price.id is not None and gas_price.id == snapshot.gas_price_id:
+                self.snapshot = snapshot._replace(expires=expires)
+            else:
+                content = CamelCaseJSONRenderer().render(GasPriceSerializer(gas_price).data)
+                etag = '"%s"' % hashlib.sha1(content).hexdigest()
+                self.snapshot = GasPriceSnapshot(gas_price.id, content, etag, expires)
+            return self.snapshot
+
+    def clear(self):
+        self.snapshot = None
+
+
+gas_price_snapshot_provider = GasPriceSnapshotProvider(settings.GAS_STATION_SNAPSHOT_TTL)
+
+
 class GasStationView(APIView):
-    @swagger_auto_schema(responses={200: GasPriceSerializer()})
+    @swagger_auto_schema(responses={200: GasPriceSerializer(), 304: 'Not modified'})
     def get(self, request, format=None):
         """
         Gets current gas prices for the ethereum network (using last 200 blocks)
         `Lowest` and `fastest` are the lower and the higher gas prices found in those blocks
         The rest are percentiles on all the gas prices in the last blocks.
         `safe_low=percentile 30`, `standard=percentile 50` and `fast=percentile 75`
+        Use `If-None-Match` header with the `ETag` returned to get `304 Not Modified` if gas prices didn't change
         """
-        gas_station = GasStationProvider()
-        gas_prices = gas_station.get_gas_prices()
-        serializer = GasPriceSerializer(gas_prices)
-        return Response(serializer.data)
+        snapshot = gas_price_snapshot_provider.get_snapshot()
+        if_none_match_etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if snapshot.etag in if_none_match_etags or '*' in if_none_match_etags:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(snapshot.content, content_type='application/json')
+        response['ETag'] = snapshot.etag
+        return response
 
 
 class GasStationHistoryView(ListAPIView):
-    serializer_class = GasPriceSerializer
     pagination_class = DefaultPagination
+    buckets = {
+        '5m': 5 * 60,
+        '1h': GasPriceHourly.bucket_seconds,
+        '1d': GasPriceDaily.bucket_seconds,
+    }
+    aggregate_models = {
+        GasPriceHourly.bucket_seconds: GasPriceHourly,
+        GasPriceDaily.bucket_seconds: GasPriceDaily,
+    }
+
+    def get_bucket_seconds(self) -> Optional[int]:
+        bucket = self.request.query_params.get('bucket') if self.request else None
+        if not bucket:
+            return None
+        elif bucket not in self.buckets:
+            raise ValidationError({'bucket': 'Valid values are %s' % ', '.join(self.buckets)})
+        return self.buckets[bucket]
+
+    def get_serializer_class(self):
+        if self.get_bucket_seconds():
+            return GasPriceBucketSerializer
+        return GasPriceSerializer
 
     def get_queryset(self):
+        now = timezone.now()
+        bucket_seconds = self.get_bucket_seconds()
+        # Use rolled up gas prices if available, raw gas prices are deleted after some days
+        aggregate_model = self.aggregate_models.get(bucket_seconds)
         from_date = self.request.query_params.get('fromDate')
         to_date = self.request.query_params.get('toDate')
-        from_date = parse_datetime(from_date) if from_date else timezone.now() - datetime.timedelta(days=30)
-        to_date = parse_datetime(to_date) if to_date else timezone.now()
-        return GasPrice.objects.filter(created__range=[from_date, to_date]).order_by('created')
+        from_date = parse_datetime(from_date) if from_date else now - datetime.timedelta(days=30)
+        to_date = parse_datetime(to_date) if to_date else now
+        if bucket_seconds and not aggregate_model:
+            # Buckets smaller than 1 hour are calculated using raw gas prices, they would be incomplete for dates
+            # older than the raw retention
+            raw_retention_from = now - datetime.timedelta(days=settings.GAS_STATION_RAW_RETENTION_DAYS)
+            if timezone.is_naive(from_date):
+                from_date = timezone.make_aware(from_date)
+            if 'fromDate' not in self.request.query_params:
+                from_date = max(from_date, raw_retention_from)
+            elif from_date < raw_retention_from:
+                raise ValidationError({'bucket': 'Buckets smaller than 1h are only available for the last %d days, '
+                                                 'use 1h or 1d' % settings.GAS_STATION_RAW_RETENTION_DAYS})
+
+        queryset = GasPrice.objects.filter(created__range=[from_date, to_date])
+        if not bucket_seconds:
+            return queryset.order_by('created')
+
+        rolled_until = aggregate_model.objects.rolled_until() if aggregate_model else None
+        if not rolled_until:
+            return queryset.bucketed(bucket_seconds)
+        return (list(aggregate_model.objects.filter(bucket__range=[from_date, to_date],
+                                                    bucket__lt=rolled_until).order_by('bucket'))
+                + list(queryset.filter(created__gte=rolled_until).bucketed(bucket_seconds)))
 
     @swagger_auto_schema(manual_parameters=[
         openapi.Parameter('fromDate', openapi.IN_QUERY, type=openapi.TYPE_STRING, format='date-time',
                           description="ISO 8601 date to filter stats from. If not set, 1 month before now"),
         openapi.Parameter('toDate', openapi.IN_QUERY, type=openapi.TYPE_STRING, format='date-time',
                           description="ISO 8601 date to filter stats to. If not set, now"),
+        openapi.Parameter('bucket', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['5m', '1h', '1d'],
+                          description="If set, return `min`, `avg` and `max` gas prices for every bucket of time "
+                                      "instead of every gas price stored. `5m` is only available for the last "
+                                      "`GAS_STATION_RAW_RETENTION_DAYS` days (30 by default)"),
     ])
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
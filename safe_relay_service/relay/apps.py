@@ -1,5 +1,18 @@
+import os
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class RelayConfig(AppConfig):
     name = 'safe_relay_service.relay'
+
+    def ready(self):
+        # Register providers, so they can be warmed up
+        from . import services  # noqa: F401
+
+        # Build services in background on web workers, so first request doesn't need to wait for the node.
+        # Celery workers build them after forking (see `taskapp.celery`)
+        if settings.PROVIDERS_WARMUP and os.environ.get('DJANGO_WSGI_APPLICATION') == '1':
+            from safe_relay_service.utils.providers import warmup_providers
+            warmup_providers()
@@ -32,6 +32,16 @@ class Command(BaseCommand):
                                      'Process Internal Txs for Safes', 2, IntervalSchedule.MINUTES),
              CeleryTaskConfiguration('safe_relay_service.relay.tasks.find_erc_20_721_transfers_task',
                                      'Process ERC20/721 transfers for Safes', 2, IntervalSchedule.MINUTES),
+             CeleryTaskConfiguration('safe_relay_service.relay.tasks.invalidate_safe_metadata_task',
+                                     'Invalidate metadata of modified Safes', 15, IntervalSchedule.SECONDS),
+             CeleryTaskConfiguration('safe_relay_service.relay.tasks.reconcile_nonces_task',
+                                     'Reconcile nonces of relay accounts', 1, IntervalSchedule.MINUTES),
+             CeleryTaskConfiguration('safe_relay_service.relay.tasks.replace_stuck_txs_task',
+                                     'Replace stuck relayed and deployment txs', 30, IntervalSchedule.SECONDS),
+             CeleryTaskConfiguration('safe_relay_service.relay.tasks.recover_multisig_tx_requests_task',
+                                     'Recover queued Safe Multisig Tx requests', 1, IntervalSchedule.MINUTES),
+             CeleryTaskConfiguration('safe_relay_service.tokens.tasks.refresh_token_prices_task',
+                                     'Refresh gas token prices', 1, IntervalSchedule.MINUTES),
              ]
 
     def handle(self, *args, **options):
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.6 on 2019-10-18 10:12
+
+import uuid
+
+import django.contrib.postgres.fields.jsonb
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+import model_utils.fields
+
+import gnosis.eth.django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relay', '0023_auto_20190612_1539'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SafeMultisigTxRequest',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.PositiveSmallIntegerField(choices=[(0, 'QUEUED'), (1, 'PROCESSING'), (2, 'SENT'), (3, 'FAILED')], db_index=True, default=0)),
+                ('error', models.TextField(default=None, null=True)),
+                ('to', gnosis.eth.django.models.EthereumAddressField(null=True)),
+                ('value', gnosis.eth.django.models.Uint256Field()),
+                ('data', models.BinaryField(null=True)),
+                ('operation', models.PositiveSmallIntegerField(choices=[(0, 'CALL'), (1, 'DELEGATE_CALL'), (2, 'CREATE')])),
+                ('safe_tx_gas', gnosis.eth.django.models.Uint256Field()),
+                ('data_gas', gnosis.eth.django.models.Uint256Field()),
+                ('gas_price', gnosis.eth.django.models.Uint256Field()),
+                ('gas_token', gnosis.eth.django.models.EthereumAddressField(null=True)),
+                ('refund_receiver', gnosis.eth.django.models.EthereumAddressField(null=True)),
+                ('signatures', django.contrib.postgres.fields.jsonb.JSONField()),
+                ('nonce', gnosis.eth.django.models.Uint256Field()),
+                ('multisig_tx', models.OneToOneField(default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request', to='relay.SafeMultisigTx')),
+                ('safe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='multisig_tx_requests', to='relay.SafeContract')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
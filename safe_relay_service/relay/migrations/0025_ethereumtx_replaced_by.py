@@ -0,0 +1,19 @@
+# Generated by Django 2.2.6 on 2019-10-21 09:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relay', '0024_safemultisigtxrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ethereumtx',
+            name='replaced_by',
+            field=models.OneToOneField(default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='replaces', to='relay.EthereumTx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.6 on 2019-10-22 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relay', '0025_ethereumtx_replaced_by'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='safemultisigtxrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(_negated=True, status=3), fields=('safe', 'nonce'), name='unique_not_failed_safe_nonce'),
+        ),
+    ]
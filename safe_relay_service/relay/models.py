@@ -1,4 +1,5 @@
 import datetime
+import uuid
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
@@ -8,6 +9,7 @@ from django.db.models import (Avg, Case, Count, DurationField, F, Q, Sum,
                               Value, When)
 from django.db.models.expressions import OuterRef, RawSQL, Subquery, Window
 from django.db.models.functions import Cast, Coalesce, TruncDate
+from django.utils import timezone
 
 from hexbytes import HexBytes
 from model_utils.models import TimeStampedModel
@@ -54,6 +56,13 @@ class EthereumTxCallType(Enum):
             return None
 
 
+class SafeMultisigTxRequestStatus(Enum):
+    QUEUED = 0
+    PROCESSING = 1
+    SENT = 2
+    FAILED = 3
+
+
 class SafeContractManager(SafeContractManagerRaw):
     def get_total_balance(self, from_date: datetime.datetime, to_date: datetime.datetime) -> int:
         return int(self.with_balance().filter(
@@ -318,6 +327,9 @@ class EthereumTx(TimeStampedModel):
     nonce = Uint256Field()
     to = EthereumAddressField(null=True, db_index=True)
     value = Uint256Field()
+    # If tx was stuck, tx sent with the same nonce and a higher gas price
+    replaced_by = models.OneToOneField('self', on_delete=models.SET_NULL, null=True, default=None,
+                                       related_name='replaces')
 
     def __str__(self):
         return '{} from={} to={}'.format(self.tx_hash, self._from, self.to)
@@ -422,6 +434,51 @@ class SafeMultisigTx(TimeStampedModel):
                                           self.safe.address)
 
 
+class SafeMultisigTxRequestQuerySet(models.QuerySet):
+    def not_failed(self):
+        return self.exclude(status=SafeMultisigTxRequestStatus.FAILED.value)
+
+    def stale(self, status: SafeMultisigTxRequestStatus, seconds: int):
+        return self.filter(status=status.value,
+                           modified__lt=timezone.now() - datetime.timedelta(seconds=seconds))
+
+
+class SafeMultisigTxRequest(TimeStampedModel):
+    """
+    Safe Multisig Tx queued to be validated and sent in background
+    """
+    objects = SafeMultisigTxRequestQuerySet.as_manager()
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    safe = models.ForeignKey(SafeContract, on_delete=models.CASCADE, related_name='multisig_tx_requests')
+    multisig_tx = models.OneToOneField(SafeMultisigTx, on_delete=models.SET_NULL, null=True, default=None,
+                                       related_name='request')  # If sent
+    status = models.PositiveSmallIntegerField(choices=[(tag.value, tag.name) for tag in SafeMultisigTxRequestStatus],
+                                              default=SafeMultisigTxRequestStatus.QUEUED.value, db_index=True)
+    error = models.TextField(null=True, default=None)  # If failed
+    to = EthereumAddressField(null=True)
+    value = Uint256Field()
+    data = models.BinaryField(null=True)
+    operation = models.PositiveSmallIntegerField(choices=[(tag.value, tag.name) for tag in SafeOperation])
+    safe_tx_gas = Uint256Field()
+    data_gas = Uint256Field()
+    gas_price = Uint256Field()
+    gas_token = EthereumAddressField(null=True)
+    refund_receiver = EthereumAddressField(null=True)
+    signatures = JSONField()  # List of dictionaries with `v`, `r` and `s`
+    nonce = Uint256Field()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['safe', 'nonce'],
+                                    condition=~Q(status=SafeMultisigTxRequestStatus.FAILED.value),
+                                    name='unique_not_failed_safe_nonce'),
+        ]
+
+    def __str__(self):
+        return '{} - {} - Safe {} - Nonce {}'.format(self.id, SafeMultisigTxRequestStatus(self.status).name,
+                                                     self.safe_id, self.nonce)
+
+
 class InternalTxManager(models.Manager):
     def get_or_create_from_trace(self, trace: Dict[str, Any], ethereum_tx: EthereumTx):
         tx_type = EthereumTxType.parse(trace['type'])
@@ -1,4 +1,6 @@
-from typing import Optional
+import time
+from logging import getLogger
+from typing import List, Optional
 
 from django.conf import settings
 
@@ -6,6 +8,8 @@ from redis import Redis
 
 from gnosis.eth import EthereumClient
 
+logger = getLogger(__name__)
+
 
 class RedisRepository:
     def __new__(cls):
@@ -20,30 +24,160 @@ class RedisRepository:
         return EthereumNonceLock(self.redis, ethereum_client, address, timeout=timeout)
 
 
-#TODO Test this using multiple threads
-class EthereumNonceLock:
-    def __init__(self, redis: Redis, ethereum_client: EthereumClient, address: str, timeout: Optional[int] = None):
+class NonceAllocator:
+    """
+    Allocates the nonces of an account using Redis Lua scripts, so every operation is atomic and needs only one
+    round trip. A nonce is reserved before sending a tx and then committed (tx was sent) or released (tx was not
+    sent). Released nonces are reused before allocating new ones, so no gaps are left
+    """
+    # KEYS: next nonce, released nonces, reserved nonces. ARGV: reservation expiration timestamp, only released
+    # Returns `-1` if next nonce is not initialized, `-2` if only released nonces are requested and there are none
+    RESERVE_SCRIPT = """
+    local nonce
+    local released = redis.call('ZRANGE', KEYS[2], 0, 0)
+    if #released > 0 then
+        nonce = tonumber(released[1])
+        redis.call('ZREM', KEYS[2], released[1])
+    elseif ARGV[2] == '1' then
+        return -2
+    else
+        local next_nonce = redis.call('GET', KEYS[1])
+        if not next_nonce then
+            return -1
+        end
+        nonce = tonumber(next_nonce)
+        redis.call('SET', KEYS[1], nonce + 1)
+    end
+    redis.call('ZADD', KEYS[3], ARGV[1], nonce)
+    return nonce
+    """
+
+    # KEYS: released nonces, reserved nonces. ARGV: nonce
+    RELEASE_SCRIPT = """
+    if redis.call('ZREM', KEYS[2], ARGV[1]) == 1 then
+        redis.call('ZADD', KEYS[1], ARGV[1], ARGV[1])
+        return 1
+    end
+    return 0
+    """
+
+    # KEYS: next nonce, released nonces, reserved nonces, stalled nonces.
+    # ARGV: pending nonce on the node, current timestamp, seconds to keep the stalled nonces mark
+    # Returns released nonces with a used or reserved nonce above them (gaps)
+    RECONCILE_SCRIPT = """
+    local pending_nonce = tonumber(ARGV[1])
+    for _, nonce in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[2])) do
+        redis.call('ZREM', KEYS[3], nonce)
+        if tonumber(nonce) >= pending_nonce then
+            redis.call('ZADD', KEYS[2], nonce, nonce)
+        end
+    end
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. pending_nonce)
+    local next_nonce = tonumber(redis.call('GET', KEYS[1]) or pending_nonce)
+    if next_nonce < pending_nonce then
+        next_nonce = pending_nonce
+    end
+    -- Released nonces on top are not gaps, they will be reused by the next txs
+    while next_nonce > pending_nonce and redis.call('ZSCORE', KEYS[2], next_nonce - 1) do
+        redis.call('ZREM', KEYS[2], next_nonce - 1)
+        next_nonce = next_nonce - 1
+    end
+    -- If node is behind with nothing reserved for two reconciliations in a row, txs were dropped from the mempool
+    if next_nonce > pending_nonce and redis.call('ZCARD', KEYS[3]) == 0 then
+        local stalled = pending_nonce .. ':' .. next_nonce
+        if redis.call('GET', KEYS[4]) == stalled then
+            next_nonce = pending_nonce
+            redis.call('DEL', KEYS[2], KEYS[4])
+        else
+            redis.call('SET', KEYS[4], stalled, 'EX', ARGV[3])
+        end
+    else
+        redis.call('DEL', KEYS[4])
+    end
+    redis.call('SET', KEYS[1], next_nonce)
+    return redis.call('ZRANGE', KEYS[2], 0, -1)
+    """
+
+    def __init__(self, redis: Redis, ethereum_client: EthereumClient, address: str,
+                 reservation_timeout: Optional[int] = None):
+        """
+        :param reservation_timeout: Seconds until a reserved nonce not committed or released can be recovered by
+        `reconcile`. 10 minutes by default
+        """
         self.redis = redis
         self.ethereum_client = ethereum_client
         self.address = address
-        self.timeout = timeout
+        self.reservation_timeout = reservation_timeout or 60 * 10
+        self.keys = [f'ethereum:next-nonce:{address}', f'ethereum:released-nonces:{address}',
+                     f'ethereum:reserved-nonces:{address}', f'ethereum:stalled-nonces:{address}']
+        self.reserve_script = redis.register_script(self.RESERVE_SCRIPT)
+        self.release_script = redis.register_script(self.RELEASE_SCRIPT)
+        self.reconcile_script = redis.register_script(self.RECONCILE_SCRIPT)
+
+    def _get_pending_nonce(self) -> int:
+        return self.ethereum_client.get_nonce_for_account(self.address, block_identifier='pending')
 
-    @property
-    def nonce_key(self):
-        return f'ethereum:nonce:{self.address}'
+    def reserve(self, only_released: bool = False) -> Optional[int]:
+        """
+        :param only_released: Only reserve a released nonce, don't allocate a new one
+        :return: Nonce to use for the next tx. It must be committed or released later. `None` if `only_released`
+        and there are no released nonces
+        """
+        args = [time.time() + self.reservation_timeout, int(only_released)]
+        nonce = self.reserve_script(keys=self.keys[:3], args=args)
+        if nonce == -1:  # First time, nonce is retrieved from the node
+            self.redis.set(self.keys[0], self._get_pending_nonce(), nx=True)
+            nonce = self.reserve_script(keys=self.keys[:3], args=args)
+        return None if nonce == -2 else nonce
 
-    @property
-    def redis_lock(self):
-        return f'ethereum:locks:{self.address}'
+    def commit(self, nonce: int):
+        """
+        Tx was sent, nonce cannot be used again
+        """
+        self.redis.zrem(self.keys[2], nonce)
+
+    def release(self, nonce: int):
+        """
+        Tx was not sent, so nonce will be used for the next tx. If node already knows a tx with that nonce
+        (as an error happened after sending the tx) nonce is committed instead
+        """
+        try:
+            if nonce < self._get_pending_nonce():
+                return self.commit(nonce)
+        except IOError:
+            logger.warning('Cannot check if nonce=%d was used for account=%s', nonce, self.address, exc_info=True)
+        self.release_script(keys=self.keys[1:], args=[nonce])
+
+    def reconcile(self, stalled_timeout: int = 60 * 10) -> List[int]:
+        """
+        Compares with the nonce of the node: Nonces used by the node are discarded, expired reservations are
+        released and next nonce is moved forward if txs were sent outside of the allocator. Released nonces on top
+        are given back to the allocator. If node pending nonce is behind next nonce with nothing reserved in two
+        calls in a row, txs were dropped by the node, so next nonce is moved back to the pending nonce
+        :param stalled_timeout: Max seconds between two calls to consider the node stalled
+        :return: Released nonces with used or reserved nonces above them. Txs with bigger nonces will not be
+        mined until they are used
+        """
+        nonces = self.reconcile_script(keys=self.keys,
+                                       args=[self._get_pending_nonce(), time.time(), stalled_timeout])
+        return [int(nonce) for nonce in nonces]
+
+
+class EthereumNonceLock:
+    """
+    Context manager returning the nonce to use for the next tx of an account. If an exception is raised inside
+    the context, nonce is released to be used for the next tx
+    """
+    def __init__(self, redis: Redis, ethereum_client: EthereumClient, address: str, timeout: Optional[int] = None):
+        self.nonce_allocator = NonceAllocator(redis, ethereum_client, address, reservation_timeout=timeout)
+        self.tx_nonce: Optional[int] = None
 
     def __enter__(self):
-        with self.redis.lock(self.redis_lock, timeout=self.timeout):
-            tx_nonce = self.redis.incr(self.nonce_key)
-            if tx_nonce == 1:
-                tx_nonce = self.ethereum_client.get_nonce_for_account(self.address, block_identifier='pending')
-                self.redis.set(self.nonce_key, tx_nonce)
-            return tx_nonce
+        self.tx_nonce = self.nonce_allocator.reserve()
+        return self.tx_nonce
 
     def __exit__(self, exc_type, exc_value, traceback):
         if exc_type:
-            self.redis.delete(self.nonce_key)
+            self.nonce_allocator.release(self.tx_nonce)
+        else:
+            self.nonce_allocator.commit(self.tx_nonce)
@@ -15,7 +15,8 @@ from gnosis.safe.serializers import SafeMultisigTxSerializer
 from safe_relay_service.relay.models import (EthereumEvent, EthereumTx,
                                              EthereumTxCallType,
                                              EthereumTxType, InternalTx,
-                                             SafeFunding)
+                                             SafeFunding,
+                                             SafeMultisigTxRequestStatus)
 
 from .services import StatsServiceProvider
 
@@ -322,6 +323,20 @@ class SafeMultisigTxResponseSerializer(serializers.Serializer):
         return tx_hash
 
 
+class SafeMultisigTxRequestResponseSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    status = serializers.SerializerMethodField()
+    error = serializers.CharField(allow_null=True)
+    nonce = serializers.IntegerField(min_value=0)
+    created = serializers.DateTimeField()
+    modified = serializers.DateTimeField()
+    safe_tx_hash = Sha3HashField(source='multisig_tx.safe_tx_hash', allow_null=True)  # If sent
+    tx_hash = Sha3HashField(source='multisig_tx.ethereum_tx_id', allow_null=True)  # If sent
+
+    def get_status(self, obj):
+        return SafeMultisigTxRequestStatus(obj.status).name
+
+
 class SafeMultisigEstimateTxResponseSerializer(serializers.Serializer):
     safe_tx_gas = serializers.IntegerField(min_value=0)
     base_gas = serializers.IntegerField(min_value=0)
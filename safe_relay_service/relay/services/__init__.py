@@ -6,5 +6,9 @@ from .notification_service import (NotificationService,
                                    NotificationServiceProvider)
 from .safe_creation_service import (SafeCreationService,
                                     SafeCreationServiceProvider)
+from .safe_metadata_service import (SafeMetadataService,
+                                    SafeMetadataServiceProvider)
 from .stats_service import StatsService, StatsServiceProvider
 from .transaction_service import TransactionService, TransactionServiceProvider
+from .tx_replacement_service import (TxReplacementService,
+                                     TxReplacementServiceProvider)
@@ -3,23 +3,19 @@ from typing import List, Set
 
 from gnosis.eth import EthereumClient
 
+from safe_relay_service.utils.providers import LazyProvider
+
 from ..models import EthereumEvent
 from .transaction_scan_service import TransactionScanService
 
 logger = getLogger(__name__)
 
 
-class Erc20EventsServiceProvider:
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            from django.conf import settings
-            cls.instance = Erc20EventsService(EthereumClient(settings.ETHEREUM_TRACING_NODE_URL))
-        return cls.instance
-
+class Erc20EventsServiceProvider(LazyProvider):
     @classmethod
-    def del_singleton(cls):
-        if hasattr(cls, "instance"):
-            del cls.instance
+    def build(cls) -> 'Erc20EventsService':
+        from django.conf import settings
+        return Erc20EventsService(EthereumClient(settings.ETHEREUM_TRACING_NODE_URL))
 
 
 class Erc20EventsService(TransactionScanService):
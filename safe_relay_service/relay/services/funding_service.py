@@ -10,6 +10,7 @@ from gnosis.eth import EthereumClient, EthereumClientProvider
 
 from safe_relay_service.gas_station.gas_station import (GasStation,
                                                         GasStationProvider)
+from safe_relay_service.utils.providers import LazyProvider
 
 from ..repositories.redis_repository import EthereumNonceLock, RedisRepository
 
@@ -24,18 +25,12 @@ class EtherLimitExceeded(FundingServiceException):
     pass
 
 
-class FundingServiceProvider:
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            cls.instance = FundingService(EthereumClientProvider(), GasStationProvider(),
-                                          RedisRepository().redis,
-                                          settings.SAFE_FUNDER_PRIVATE_KEY, settings.SAFE_FUNDER_MAX_ETH)
-        return cls.instance
-
+class FundingServiceProvider(LazyProvider):
     @classmethod
-    def del_singleton(cls):
-        if hasattr(cls, "instance"):
-            del cls.instance
+    def build(cls) -> 'FundingService':
+        return FundingService(EthereumClientProvider(), GasStationProvider(),
+                              RedisRepository().redis,
+                              settings.SAFE_FUNDER_PRIVATE_KEY, settings.SAFE_FUNDER_MAX_ETH)
 
 
 class FundingService:
@@ -3,24 +3,20 @@ from typing import Any, Dict, List, Set
 
 from gnosis.eth import EthereumClient
 
+from safe_relay_service.utils.providers import LazyProvider
+
 from ..models import EthereumTxCallType, EthereumTxType, InternalTx
 from .transaction_scan_service import TransactionScanService
 
 logger = getLogger(__name__)
 
 
-class InternalTxServiceProvider:
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            from django.conf import settings
-            cls.instance = InternalTxService(EthereumClient(settings.ETHEREUM_TRACING_NODE_URL),
-                                             block_process_limit=settings.INTERNAL_TXS_BLOCK_PROCESS_LIMIT)
-        return cls.instance
-
+class InternalTxServiceProvider(LazyProvider):
     @classmethod
-    def del_singleton(cls):
-        if hasattr(cls, "instance"):
-            del cls.instance
+    def build(cls) -> 'InternalTxService':
+        from django.conf import settings
+        return InternalTxService(EthereumClient(settings.ETHEREUM_TRACING_NODE_URL),
+                                 block_process_limit=settings.INTERNAL_TXS_BLOCK_PROCESS_LIMIT)
 
 
 class InternalTxService(TransactionScanService):
@@ -5,26 +5,22 @@ from urllib.parse import urljoin
 
 import requests
 
-logger = getLogger(__name__)
+from safe_relay_service.utils.providers import LazyProvider
 
+logger = getLogger(__name__)
 
-class NotificationServiceProvider:
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            from django.conf import settings
-            notification_service_uri = settings.NOTIFICATION_SERVICE_URI
-            if notification_service_uri:
-                cls.instance = NotificationService(settings.NOTIFICATION_SERVICE_URI,
-                                                   settings.NOTIFICATION_SERVICE_PASS)
-            else:
-                logger.warning('Using mock NotificationService because no NOTIFICATION_SERVICE_URI was configured')
-                cls.instance = NotificationServiceMock(None, None)
-        return cls.instance
 
+class NotificationServiceProvider(LazyProvider):
     @classmethod
-    def del_singleton(cls):
-        if hasattr(cls, "instance"):
-            del cls.instance
+    def build(cls) -> 'NotificationService':
+        from django.conf import settings
+        notification_service_uri = settings.NOTIFICATION_SERVICE_URI
+        if notification_service_uri:
+            return NotificationService(settings.NOTIFICATION_SERVICE_URI,
+                                       settings.NOTIFICATION_SERVICE_PASS)
+        else:
+            logger.warning('Using mock NotificationService because no NOTIFICATION_SERVICE_URI was configured')
+            return NotificationServiceMock(None, None)
 
 
 class NotificationService:
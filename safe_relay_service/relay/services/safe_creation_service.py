@@ -14,12 +14,15 @@ from gnosis.safe.safe import SafeCreationEstimate
 
 from safe_relay_service.gas_station.gas_station import (GasStation,
                                                         GasStationProvider)
-from safe_relay_service.tokens.models import Token
-from safe_relay_service.tokens.price_oracles import CannotGetTokenPriceFromApi
+from safe_relay_service.tokens.gas_token_registry import gas_token_registry
+from safe_relay_service.tokens.models import Token, TokenPrice
+from safe_relay_service.utils.providers import LazyProvider
 
 from ..models import (EthereumTx, SafeContract, SafeCreation, SafeCreation2,
                       SafeTxStatus)
 from ..repositories.redis_repository import EthereumNonceLock, RedisRepository
+from .safe_metadata_service import (SafeMetadataService,
+                                    SafeMetadataServiceProvider)
 
 logger = getLogger(__name__)
 
@@ -53,29 +56,25 @@ class SafeInfo(NamedTuple):
     version: str
 
 
-class SafeCreationServiceProvider:
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            cls.instance = SafeCreationService(GasStationProvider(),
-                                               EthereumClientProvider(),
-                                               RedisRepository().redis,
-                                               settings.SAFE_CONTRACT_ADDRESS,
-                                               settings.SAFE_OLD_CONTRACT_ADDRESS,
-                                               settings.SAFE_PROXY_FACTORY_ADDRESS,
-                                               settings.SAFE_FUNDER_PRIVATE_KEY,
-                                               settings.SAFE_FIXED_CREATION_COST)
-        return cls.instance
-
+class SafeCreationServiceProvider(LazyProvider):
     @classmethod
-    def del_singleton(cls):
-        if hasattr(cls, "instance"):
-            del cls.instance
+    def build(cls) -> 'SafeCreationService':
+        return SafeCreationService(GasStationProvider(),
+                                   EthereumClientProvider(),
+                                   RedisRepository().redis,
+                                   settings.SAFE_CONTRACT_ADDRESS,
+                                   settings.SAFE_OLD_CONTRACT_ADDRESS,
+                                   settings.SAFE_PROXY_FACTORY_ADDRESS,
+                                   settings.SAFE_FUNDER_PRIVATE_KEY,
+                                   settings.SAFE_FIXED_CREATION_COST,
+                                   SafeMetadataServiceProvider())
 
 
 class SafeCreationService:
     def __init__(self, gas_station: GasStation, ethereum_client: EthereumClient, redis: Redis,
                  safe_contract_address: str, safe_old_contract_address: str, proxy_factory_address: str,
-                 safe_funder_private_key: str, safe_fixed_creation_cost: int):
+                 safe_funder_private_key: str, safe_fixed_creation_cost: int,
+                 safe_metadata_service: SafeMetadataService):
         self.gas_station = gas_station
         self.ethereum_client = ethereum_client
         self.redis = redis
@@ -84,6 +83,7 @@ class SafeCreationService:
         self.proxy_factory = ProxyFactory(proxy_factory_address, self.ethereum_client)
         self.funder_account = Account.privateKeyToAccount(safe_funder_private_key)
         self.safe_fixed_creation_cost = safe_fixed_creation_cost
+        self.safe_metadata_service = safe_metadata_service
 
     def _get_token_eth_value_or_raise(self, address: str) -> float:
         """
@@ -95,9 +95,8 @@ class SafeCreationService:
         if address == NULL_ADDRESS:
             return 1.0
 
-        try:
-            token = Token.objects.get(address=address, gas=True)
-        except Token.DoesNotExist:
+        token = gas_token_registry.get(address)
+        if not token:
             # Add the token for development purposes.
             token = Token.objects.create(address=address, name="Cash", symbol="cash", decimals=2, fixed_eth_conversion=1, gas=True)
 
@@ -304,27 +303,28 @@ class SafeCreationService:
         ether_creation_estimate = self.estimate_safe_creation2(number_owners, NULL_ADDRESS)
         safe_creation_estimates = [ether_creation_estimate]
         token_gas_difference = 50000  # 50K gas more expensive than ether
-        for token in Token.objects.gas_tokens():
-            try:
+        gas_tokens = gas_token_registry.gas_tokens()
+        eth_values = TokenPrice.objects.get_eth_values(gas_tokens)
+        for token in gas_tokens:
+            eth_value = eth_values.get(token.address)
+            if eth_value:
                 safe_creation_estimates.append(
                     SafeCreationEstimate(
                         gas=ether_creation_estimate.gas + token_gas_difference,
                         gas_price=ether_creation_estimate.gas_price,
-                        payment=token.calculate_payment(ether_creation_estimate.payment),
+                        payment=token.calculate_payment(ether_creation_estimate.payment, eth_value=eth_value),
                         payment_token=token.address,
                     )
                 )
-            except CannotGetTokenPriceFromApi:
+            else:
                 logger.error('Cannot get price for token=%s', token.address)
         return safe_creation_estimates
 
     def retrieve_safe_info(self, address: str) -> SafeInfo:
         safe = Safe(address, self.ethereum_client)
-        if not self.ethereum_client.is_contract(address):
+        safe_metadata = self.safe_metadata_service.retrieve(address)
+        if not safe_metadata.is_deployed:
             raise SafeNotDeployed('Safe with address=%s not deployed' % address)
         nonce = safe.retrieve_nonce()
-        threshold = safe.retrieve_threshold()
-        owners = safe.retrieve_owners()
-        master_copy = safe.retrieve_master_copy_address()
-        version = safe.retrieve_version()
-        return SafeInfo(address, nonce, threshold, owners, master_copy, version)
+        return SafeInfo(address, nonce, safe_metadata.threshold, safe_metadata.owners, safe_metadata.master_copy,
+                        safe_metadata.version)
@@ -0,0 +1,209 @@
+import json
+from logging import getLogger
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+
+import requests
+from eth_abi import decode_single
+from hexbytes import HexBytes
+from redis import Redis
+from web3 import Web3
+
+from gnosis.eth import EthereumClient, EthereumClientProvider
+from gnosis.eth.contracts import get_safe_contract
+
+from safe_relay_service.utils.providers import LazyProvider
+
+from ..repositories.redis_repository import RedisRepository
+
+logger = getLogger(__name__)
+
+EMPTY_CODE_HASH = Web3.keccak(b'').hex()
+
+
+class SafeMetadataServiceException(Exception):
+    pass
+
+
+class CannotRetrieveSafeMetadata(SafeMetadataServiceException):
+    pass
+
+
+class SafeMetadata(NamedTuple):
+    address: str
+    code_hash: str  # Keccak of the proxy runtime code, to check if proxy is valid without retrieving it
+    master_copy: str
+    version: str
+    owners: List[str]
+    threshold: int
+    block_number: int  # Block when metadata was read
+
+    @property
+    def is_deployed(self) -> bool:
+        return self.code_hash != EMPTY_CODE_HASH
+
+
+class SafeMetadataServiceProvider(LazyProvider):
+    @classmethod
+    def build(cls) -> 'SafeMetadataService':
+        return SafeMetadataService(EthereumClientProvider(), RedisRepository().redis,
+                                   ttl=settings.SAFE_METADATA_CACHE_TTL)
+
+
+class SafeMetadataService:
+    """
+    Caches on Redis the Safe fields that rarely change (proxy code, master copy, version, owners and threshold).
+    Metadata is invalidated when Safe configuration events are found, and it expires anyway after `ttl` seconds,
+    as old Safes don't emit events for every configuration change
+    """
+    events = ('AddedOwner(address)', 'RemovedOwner(address)', 'ChangedThreshold(uint256)',
+              'ChangedMasterCopy(address)')
+    last_block_key = 'safe-metadata:last-block'
+
+    def __init__(self, ethereum_client: EthereumClient, redis: Redis, ttl: int = 60 * 60,
+                 reorg_blocks: int = 10, block_process_limit: int = 10000):
+        """
+        :param ttl: Seconds to keep the metadata of a Safe
+        :param reorg_blocks: Number of blocks already processed that are processed again to prevent reorgs
+        :param block_process_limit: If more blocks need to be processed, every metadata is invalidated instead
+        """
+        self.ethereum_client = ethereum_client
+        self.redis = redis
+        self.ttl = ttl
+        self.reorg_blocks = reorg_blocks
+        self.block_process_limit = block_process_limit
+        self.http_session = requests.Session()
+        self.event_topics = [Web3.keccak(text=event).hex() for event in self.events]
+
+    @staticmethod
+    def _get_key(address: str) -> str:
+        return 'safe-metadata:%s' % address
+
+    @staticmethod
+    def _get_invalidation_key(address: str) -> str:
+        return 'safe-metadata-invalidated:%s' % address
+
+    def build_queries(self, address: str, block_identifier: str) -> List[Dict[str, Any]]:
+        """
+        :return: JSON-RPC queries needed to build `SafeMetadata`, so they can be batched with other queries
+        """
+        safe_contract = get_safe_contract(self.ethereum_client.w3, address)
+        return [
+            {'method': 'eth_getCode', 'params': [address, block_identifier]},
+            {'method': 'eth_getStorageAt', 'params': [address, '0x0', block_identifier]},  # Master copy
+            {'method': 'eth_call', 'params': [{'to': address, 'data': safe_contract.encodeABI(fn_name='VERSION')},
+                                              block_identifier]},
+            {'method': 'eth_call', 'params': [{'to': address, 'data': safe_contract.encodeABI(fn_name='getOwners')},
+                                              block_identifier]},
+            {'method': 'eth_call', 'params': [{'to': address,
+                                               'data': safe_contract.encodeABI(fn_name='getThreshold')},
+                                              block_identifier]},
+        ]
+
+    def batch_request(self, queries: List[Dict[str, Any]]) -> List[HexBytes]:
+        """
+        Sends all the queries to the node using only one JSON-RPC batch request
+        :return: Results of the queries, in the same order
+        :raises: CannotRetrieveSafeMetadata
+        """
+        payload = [dict(query, jsonrpc='2.0', id=i) for i, query in enumerate(queries)]
+        try:
+            response = self.http_session.post(self.ethereum_client.ethereum_node_url, json=payload, timeout=30)
+            results = {result['id']: result for result in response.json()}
+            return [HexBytes(results[i]['result']) for i in range(len(queries))]
+        except (IOError, ValueError, KeyError, TypeError) as exc:
+            raise CannotRetrieveSafeMetadata('Error on batch request: %s' % exc) from exc
+
+    def build_metadata(self, address: str, block_number: int, results: List[HexBytes]) -> SafeMetadata:
+        """
+        :param results: Results of the queries returned by `build_queries`
+        """
+        code, storage, version, owners, threshold = results
+        return SafeMetadata(address=address,
+                            code_hash=Web3.keccak(code).hex(),
+                            master_copy=Web3.toChecksumAddress(storage[-20:].rjust(20, b'\0')),
+                            version=decode_single('string', version) if version else '',
+                            owners=[Web3.toChecksumAddress(owner)
+                                    for owner in decode_single('address[]', owners)] if owners else [],
+                            threshold=decode_single('uint256', threshold) if threshold else 0,
+                            block_number=block_number)
+
+    def get(self, address: str) -> Optional[SafeMetadata]:
+        """
+        :return: Cached `SafeMetadata`, `None` if not found
+        """
+        value = self.redis.get(self._get_key(address))
+        return SafeMetadata(**json.loads(value)) if value else None
+
+    def store(self, safe_metadata: SafeMetadata) -> bool:
+        """
+        Metadata is not stored if the Safe was modified after the block when it was read
+        :return: `True` if stored, `False` otherwise
+        """
+        invalidated_block_number = self.redis.get(self._get_invalidation_key(safe_metadata.address))
+        if invalidated_block_number and int(invalidated_block_number) >= safe_metadata.block_number:
+            return False
+        self.redis.set(self._get_key(safe_metadata.address), json.dumps(safe_metadata._asdict()), ex=self.ttl)
+        return True
+
+    def retrieve(self, address: str) -> SafeMetadata:
+        """
+        :return: Cached `SafeMetadata`, it is read from the blockchain if not found
+        :raises: CannotRetrieveSafeMetadata
+        """
+        safe_metadata = self.get(address)
+        if not safe_metadata:
+            block_number = self.ethereum_client.w3.eth.blockNumber
+            results = self.batch_request(self.build_queries(address, hex(block_number)))
+            safe_metadata = self.build_metadata(address, block_number, results)
+            if safe_metadata.is_deployed:  # Don't store metadata for not deployed Safes
+                self.store(safe_metadata)
+        return safe_metadata
+
+    def invalidate(self, address: str, block_number: Optional[int] = None):
+        """
+        :param block_number: Block when Safe was modified, metadata read before that block will not be stored
+        """
+        pipe = self.redis.pipeline()
+        pipe.delete(self._get_key(address))
+        if block_number is not None:
+            pipe.set(self._get_invalidation_key(address), block_number, ex=self.ttl)
+        pipe.execute()
+
+    def invalidate_all(self):
+        for key in self.redis.scan_iter('safe-metadata:0x*'):
+            self.redis.delete(key)
+
+    def process_events(self) -> int:
+        """
+        Invalidates metadata of the Safes with configuration events since the last block processed
+        :return: Number of Safes invalidated
+        """
+        current_block_number = self.ethereum_client.current_block_number
+        last_block_number = self.redis.get(self.last_block_key)
+        if last_block_number is None:
+            from_block_number = max(0, current_block_number - self.reorg_blocks)
+        else:
+            from_block_number = max(0, int(last_block_number) + 1 - self.reorg_blocks)
+
+        if current_block_number - from_block_number > self.block_process_limit:
+            logger.warning('Safe metadata events are %d blocks behind, invalidating every metadata',
+                           current_block_number - from_block_number)
+            self.invalidate_all()
+            self.redis.set(self.last_block_key, current_block_number)
+            return 0
+
+        logs = self.ethereum_client.w3.eth.getLogs({'fromBlock': from_block_number,
+                                                    'toBlock': current_block_number,
+                                                    'topics': [self.event_topics]})
+        modified_safes = {}
+        for log in logs:
+            address = Web3.toChecksumAddress(log['address'])
+            modified_safes[address] = max(log['blockNumber'], modified_safes.get(address, 0))
+
+        for address, block_number in modified_safes.items():
+            logger.info('Safe=%s was modified on block=%d, invalidating metadata', address, block_number)
+            self.invalidate(address, block_number)
+        self.redis.set(self.last_block_key, current_block_number)
+        return len(modified_safes)
@@ -14,22 +14,17 @@ from gnosis.eth import EthereumClient, EthereumClientProvider
 
 from safe_relay_service.gas_station.gas_station import (GasStation,
                                                         GasStationProvider)
+from safe_relay_service.utils.providers import LazyProvider
 
 from ..models import EthereumEvent, SafeContract, SafeMultisigTx
 
 logger = getLogger(__name__)
 
 
-class StatsServiceProvider:
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            cls.instance = StatsService(EthereumClientProvider(), GasStationProvider())
-        return cls.instance
-
+class StatsServiceProvider(LazyProvider):
     @classmethod
-    def del_singleton(cls):
-        if hasattr(cls, "instance"):
-            del cls.instance
+    def build(cls) -> 'StatsService':
+        return StatsService(EthereumClientProvider(), GasStationProvider())
 
 
 class StatsService:
@@ -1,26 +1,37 @@
 from logging import getLogger
-from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from typing import (Any, Dict, List, NamedTuple, Optional, Sequence, Set,
+                    Tuple)
 
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
 from eth_account import Account
+from hexbytes import HexBytes
 from packaging.version import Version
-from redis import Redis
+from redis import Redis, RedisError
+from web3 import Web3
 
 from gnosis.eth import EthereumClient, EthereumClientProvider
 from gnosis.eth.constants import NULL_ADDRESS
+from gnosis.eth.contracts import (get_paying_proxy_deployed_bytecode,
+                                  get_proxy_factory_contract)
 from gnosis.safe import ProxyFactory, Safe
 from gnosis.safe.exceptions import SafeServiceException
 from gnosis.safe.signatures import signatures_to_bytes
 
 from safe_relay_service.gas_station.gas_station import (GasStation,
                                                         GasStationProvider)
-from safe_relay_service.tokens.models import Token
-from safe_relay_service.tokens.price_oracles import CannotGetTokenPriceFromApi
+from safe_relay_service.tokens.gas_token_registry import gas_token_registry
+from safe_relay_service.tokens.models import TokenPrice
+from safe_relay_service.utils.providers import LazyProvider
 
-from ..models import EthereumTx, SafeContract, SafeMultisigTx
+from ..models import (EthereumTx, SafeContract, SafeMultisigTx,
+                      SafeMultisigTxRequest, SafeMultisigTxRequestStatus)
 from ..repositories.redis_repository import EthereumNonceLock, RedisRepository
+from .safe_metadata_service import (CannotRetrieveSafeMetadata, SafeMetadata,
+                                    SafeMetadataService,
+                                    SafeMetadataServiceProvider)
+from .tx_sender_pool import TxSenderPool
 
 logger = getLogger(__name__)
 
@@ -73,6 +84,16 @@ class GasPriceTooLow(TransactionServiceException):
     pass
 
 
+class CannotRetrieveSafeState(TransactionServiceException):
+    pass
+
+
+class SafeState(NamedTuple):
+    block_number: int
+    balance: int  # Balance of ether or of the gas token
+    metadata: SafeMetadata
+
+
 class TransactionEstimationWithNonce(NamedTuple):
     safe_tx_gas: int
     base_gas: int  # For old versions it will equal to `data_gas`
@@ -96,33 +117,37 @@ class TransactionEstimationWithNonceAndGasTokens(NamedTuple):
     estimations: List[TransactionGasTokenEstimation]
 
 
-class TransactionServiceProvider:
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            from django.conf import settings
-            cls.instance = TransactionService(GasStationProvider(),
-                                              EthereumClientProvider(),
-                                              RedisRepository().redis,
-                                              settings.SAFE_VALID_CONTRACT_ADDRESSES,
-                                              settings.SAFE_PROXY_FACTORY_ADDRESS,
-                                              settings.SAFE_TX_SENDER_PRIVATE_KEY)
-        return cls.instance
-
+class TransactionServiceProvider(LazyProvider):
     @classmethod
-    def del_singleton(cls):
-        if hasattr(cls, "instance"):
-            del cls.instance
+    def build(cls) -> 'TransactionService':
+        from django.conf import settings
+        return TransactionService(GasStationProvider(),
+                                  EthereumClientProvider(),
+                                  RedisRepository().redis,
+                                  settings.SAFE_VALID_CONTRACT_ADDRESSES,
+                                  settings.SAFE_PROXY_FACTORY_ADDRESS,
+                                  settings.SAFE_TX_SENDER_PRIVATE_KEY,
+                                  SafeMetadataServiceProvider(),
+                                  additional_tx_sender_private_keys=settings.SAFE_TX_SENDER_ADDITIONAL_PRIVATE_KEYS)
 
 
 class TransactionService:
+    estimate_cache_stats_key = 'estimate-cache:stats'
+    estimate_cache_timeout = 60  # Estimations are only reused on the same block, so they will not be needed later
+
     def __init__(self, gas_station: GasStation, ethereum_client: EthereumClient, redis: Redis,
-                 safe_valid_contract_addresses: Set[str], proxy_factory_address: str, tx_sender_private_key: str):
+                 safe_valid_contract_addresses: Set[str], proxy_factory_address: str, tx_sender_private_key: str,
+                 safe_metadata_service: SafeMetadataService, additional_tx_sender_private_keys: Sequence[str] = ()):
         self.gas_station = gas_station
         self.ethereum_client = ethereum_client
         self.redis = redis
         self.safe_valid_contract_addresses = safe_valid_contract_addresses
         self.proxy_factory = ProxyFactory(proxy_factory_address, self.ethereum_client)
         self.tx_sender_account = Account.privateKeyToAccount(tx_sender_private_key)
+        self.tx_sender_pool = TxSenderPool(self.ethereum_client, self.redis,
+                                           [tx_sender_private_key] + list(additional_tx_sender_private_keys))
+        self.safe_metadata_service = safe_metadata_service
+        self._valid_proxy_code_hashes: Optional[Set[str]] = None
 
     @staticmethod
     def _check_refund_receiver(refund_receiver: str) -> bool:
@@ -142,13 +167,65 @@ class TransactionService:
         address = address or NULL_ADDRESS
         if address == NULL_ADDRESS:
             return True
-        try:
-            Token.objects.get(address=address, gas=True)
+        if gas_token_registry.get(address):
             return True
-        except Token.DoesNotExist:
-            logger.warning('Cannot retrieve gas token from db: Gas token %s not valid' % address)
+        else:
+            logger.warning('Cannot retrieve gas token: Gas token %s not valid' % address)
             return False
 
+    def _get_valid_proxy_code_hashes(self) -> Set[str]:
+        """
+        :return: Keccak of the runtime codes accepted for the Safe proxies. They don't change, so they are only
+        retrieved once
+        """
+        if self._valid_proxy_code_hashes is None:
+            proxy_factory_contract = get_proxy_factory_contract(self.ethereum_client.w3, self.proxy_factory.address)
+            self._valid_proxy_code_hashes = {
+                Web3.keccak(get_paying_proxy_deployed_bytecode()).hex(),
+                Web3.keccak(proxy_factory_contract.functions.proxyRuntimeCode().call()).hex()
+            }
+        return self._valid_proxy_code_hashes
+
+    def _retrieve_safe_state(self, safe_address: str, gas_token: str,
+                             block_identifier='latest') -> SafeState:
+        """
+        Retrieves every Safe field needed to validate a multisig tx using only one JSON-RPC batch request, so all
+        the fields are read at the same block. Safe metadata is only requested if it's not cached
+        :param block_identifier: If not a block number, current block number will be used
+        :raises: CannotRetrieveSafeState
+        """
+        if isinstance(block_identifier, int):
+            block_number = block_identifier
+        else:
+            block_number = self.ethereum_client.w3.eth.blockNumber
+        block_hex = hex(block_number)
+
+        if gas_token == NULL_ADDRESS:
+            queries = [{'method': 'eth_getBalance', 'params': [safe_address, block_hex]}]
+        else:
+            queries = [{'method': 'eth_call',
+                        'params': [{'to': gas_token,  # Balance of
+                                    'data': '0x70a08231' + '{:0>64}'.format(safe_address.replace('0x', '').lower())
+                                    }, block_hex]}]
+
+        safe_metadata = self.safe_metadata_service.get(safe_address)
+        if not safe_metadata:
+            queries.extend(self.safe_metadata_service.build_queries(safe_address, block_hex))
+
+        try:
+            results = self.safe_metadata_service.batch_request(queries)
+        except CannotRetrieveSafeMetadata as exc:
+            raise CannotRetrieveSafeState('Cannot retrieve state for Safe=%s: %s' % (safe_address, exc)) from exc
+
+        if not safe_metadata:
+            safe_metadata = self.safe_metadata_service.build_metadata(safe_address, block_number, results[1:])
+            if safe_metadata.code_hash in self._get_valid_proxy_code_hashes():
+                self.safe_metadata_service.store(safe_metadata)
+
+        return SafeState(block_number=block_number,
+                         balance=int.from_bytes(results[0], byteorder='big'),
+                         metadata=safe_metadata)
+
     def _check_safe_gas_price(self, gas_token: Optional[str], safe_gas_price: int) -> bool:
         """
         Check that `safe_gas_price` is not too low, so that the relay gets a full refund
@@ -165,16 +242,15 @@ class TransactionService:
 
         minimum_accepted_gas_price = self._get_minimum_gas_price()
         if gas_token and gas_token != NULL_ADDRESS:
-            try:
-                gas_token_model = Token.objects.get(address=gas_token, gas=True)
-                estimated_gas_price = gas_token_model.calculate_gas_price(minimum_accepted_gas_price)
-                if safe_gas_price < estimated_gas_price:
-                    raise GasPriceTooLow('Required gas-price>=%d to use gas-token' % estimated_gas_price)
-                # We use gas station tx gas price. We cannot use internal tx's because is calculated
-                # based on the gas token
-            except Token.DoesNotExist:
-                logger.warning('Cannot retrieve gas token from db: Gas token %s not valid' % gas_token)
+            gas_token_model = gas_token_registry.get(gas_token)
+            if not gas_token_model:
+                logger.warning('Cannot retrieve gas token: Gas token %s not valid' % gas_token)
                 raise InvalidGasToken('Gas token %s not valid' % gas_token)
+            estimated_gas_price = gas_token_model.calculate_gas_price(minimum_accepted_gas_price)
+            if safe_gas_price < estimated_gas_price:
+                raise GasPriceTooLow('Required gas-price>=%d to use gas-token' % estimated_gas_price)
+            # We use gas station tx gas price. We cannot use internal tx's because is calculated
+            # based on the gas token
         else:
             if safe_gas_price < minimum_accepted_gas_price:
                 raise GasPriceTooLow('Required gas-price>=%d' % minimum_accepted_gas_price)
@@ -183,11 +259,10 @@ class TransactionService:
     def _estimate_tx_gas_price(self, gas_token: Optional[str] = None):
         gas_price_fast = self._get_configured_gas_price()
         if gas_token and gas_token != NULL_ADDRESS:
-            try:
-                gas_token_model = Token.objects.get(address=gas_token, gas=True)
-                return gas_token_model.calculate_gas_price(gas_price_fast)
-            except Token.DoesNotExist:
+            gas_token_model = gas_token_registry.get(gas_token)
+            if not gas_token_model:
                 raise InvalidGasToken('Gas token %s not found' % gas_token)
+            return gas_token_model.calculate_gas_price(gas_price_fast)
         else:
             return gas_price_fast
 
@@ -203,6 +278,59 @@ class TransactionService:
         """
         return self.gas_station.get_gas_prices().safe_low
 
+    def _retrieve_safe_version(self, safe_address: str) -> str:
+        """
+        :return: Version of the Safe, using the metadata cache
+        :raises: CannotRetrieveSafeState
+        """
+        try:
+            return self.safe_metadata_service.retrieve(safe_address).version
+        except CannotRetrieveSafeMetadata as exc:
+            raise CannotRetrieveSafeState('Cannot retrieve version for Safe=%s: %s' % (safe_address, exc)) from exc
+
+    @staticmethod
+    def _get_estimate_cache_key(safe_address: str, to: str, value: int, data: bytes, operation: int,
+                                gas_token: str, block_number: int) -> str:
+        return 'estimate:%s:%s:%d:%s:%d:%s:%d' % (safe_address, to, value, Web3.keccak(HexBytes(data or b'')).hex(),
+                                                  operation, gas_token, block_number)
+
+    def _estimate_tx_gas_and_base_gas(self, safe: Safe, to: str, value: int, data: bytes, operation: int,
+                                      gas_token: Optional[str]) -> Tuple[int, int]:
+        """
+        Clients usually request the same estimation many times while a tx is being edited, so estimations are
+        cached for the block they were calculated. If cache is not available a new estimation is done
+        :return: Tuple(safe_tx_gas, base_gas)
+        """
+        cache_key = self._get_estimate_cache_key(safe.address, to, value, data, operation, gas_token or NULL_ADDRESS,
+                                                 self.ethereum_client.current_block_number)
+        try:
+            cached = self.redis.get(cache_key)
+            self.redis.hincrby(self.estimate_cache_stats_key, 'hits' if cached else 'misses', 1)
+        except RedisError:
+            logger.warning('Cannot use estimate cache', exc_info=True)
+            cached = cache_key = None
+
+        if cached:
+            safe_tx_gas, base_gas = map(int, cached.split(b':'))
+            return safe_tx_gas, base_gas
+
+        safe_tx_gas = safe.estimate_tx_gas(to, value, data, operation)
+        base_gas = safe.estimate_tx_base_gas(to, value, data, operation, gas_token, safe_tx_gas)
+        if cache_key:
+            try:
+                self.redis.set(cache_key, '%d:%d' % (safe_tx_gas, base_gas), ex=self.estimate_cache_timeout)
+            except RedisError:
+                logger.warning('Cannot store estimation on estimate cache', exc_info=True)
+        return safe_tx_gas, base_gas
+
+    def get_estimate_cache_stats(self) -> Dict[str, float]:
+        """
+        :return: Dictionary with `hits`, `misses` and `hit_ratio` of the estimate cache for every process
+        """
+        stats = {key.decode(): int(value) for key, value in self.redis.hgetall(self.estimate_cache_stats_key).items()}
+        hits, misses = stats.get('hits', 0), stats.get('misses', 0)
+        return {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses) if hits + misses else 0.}
+
     def estimate_tx(self, safe_address: str, to: str, value: int, data: str, operation: int,
                     gas_token: Optional[str]) -> TransactionEstimationWithNonce:
         """
@@ -213,11 +341,11 @@ class TransactionService:
             raise InvalidGasToken(gas_token)
         last_used_nonce = SafeMultisigTx.objects.get_last_nonce_for_safe(safe_address)
         safe = Safe(safe_address, self.ethereum_client)
-        safe_tx_gas = safe.estimate_tx_gas(to, value, data, operation)
-        safe_tx_base_gas = safe.estimate_tx_base_gas(to, value, data, operation, gas_token, safe_tx_gas)
+        safe_tx_gas, safe_tx_base_gas = self._estimate_tx_gas_and_base_gas(safe, to, value, data, operation,
+                                                                           gas_token)
 
         # For Safe contracts v1.0.0 operational gas is not used (`base_gas` has all the related costs already)
-        safe_version = safe.retrieve_version()
+        safe_version = self._retrieve_safe_version(safe_address)
         if Version(safe_version) >= Version('1.0.0'):
             safe_tx_operational_gas = 0
         else:
@@ -232,27 +360,31 @@ class TransactionService:
                                    operation: int) -> TransactionEstimationWithNonceAndGasTokens:
         last_used_nonce = SafeMultisigTx.objects.get_last_nonce_for_safe(safe_address)
         safe = Safe(safe_address, self.ethereum_client)
-        safe_tx_gas = safe.estimate_tx_gas(to, value, data, operation)
+        # Calculate `base_gas` for ether and calculate for tokens using the ether token price
+        safe_tx_gas, ether_safe_tx_base_gas = self._estimate_tx_gas_and_base_gas(safe, to, value, data, operation,
+                                                                                 NULL_ADDRESS)
 
-        safe_version = safe.retrieve_version()
+        safe_version = self._retrieve_safe_version(safe_address)
         if Version(safe_version) >= Version('1.0.0'):
             safe_tx_operational_gas = 0
         else:
             safe_tx_operational_gas = safe.estimate_tx_operational_gas(len(data) if data else 0)
 
-        # Calculate `base_gas` for ether and calculate for tokens using the ether token price
-        ether_safe_tx_base_gas = safe.estimate_tx_base_gas(to, value, data, operation, NULL_ADDRESS, safe_tx_gas)
-        gas_price = self._estimate_tx_gas_price(NULL_ADDRESS)
+        # Same gas price and token prices are used for every token, retrieved only once
+        gas_price = self._get_configured_gas_price()
+        gas_tokens = gas_token_registry.gas_tokens()
+        eth_values = TokenPrice.objects.get_eth_values(gas_tokens)
         gas_token_estimations = [TransactionGasTokenEstimation(ether_safe_tx_base_gas, gas_price, NULL_ADDRESS)]
         token_gas_difference = 50000  # 50K gas more expensive than ether
-        for token in Token.objects.gas_tokens():
-            try:
-                gas_price = self._estimate_tx_gas_price(token.address)
+        for token in gas_tokens:
+            eth_value = eth_values.get(token.address)
+            if eth_value:
                 gas_token_estimations.append(
                     TransactionGasTokenEstimation(ether_safe_tx_base_gas + token_gas_difference,
-                                                  gas_price, token.address)
+                                                  token.calculate_gas_price(gas_price, eth_value=eth_value),
+                                                  token.address)
                 )
-            except CannotGetTokenPriceFromApi:
+            else:
                 logger.error('Cannot get price for token=%s', token.address)
 
         return TransactionEstimationWithNonceAndGasTokens(last_used_nonce, safe_tx_gas, safe_tx_operational_gas,
@@ -270,10 +402,13 @@ class TransactionService:
                            gas_token: str,
                            refund_receiver: str,
                            nonce: int,
-                           signatures: List[Dict[str, int]]) -> SafeMultisigTx:
+                           signatures: List[Dict[str, int]],
+                           multisig_tx_request_id: Optional[str] = None) -> SafeMultisigTx:
         """
+        :param multisig_tx_request_id: Id of the `SafeMultisigTxRequest` being processed, if tx was queued
         :return: Database model of SafeMultisigTx
-        :raises: SafeMultisigTxExists: If Safe Multisig Tx with nonce already exists
+        :raises: SafeMultisigTxExists: If Safe Multisig Tx with nonce already exists or other request with the
+        nonce is queued
         :raises: InvalidGasToken: If Gas Token is not valid
         :raises: TransactionServiceException: If Safe Tx is not valid (not sorted owners, bad signature, bad nonce...)
         """
@@ -281,7 +416,9 @@ class TransactionService:
         safe_contract = SafeContract.objects.get(address=safe_address)
         created = timezone.now()
 
-        if SafeMultisigTx.objects.filter(safe=safe_contract, nonce=nonce).exists():
+        if (SafeMultisigTx.objects.filter(safe=safe_contract, nonce=nonce).exists()
+                or SafeMultisigTxRequest.objects.not_failed().filter(
+                    safe=safe_contract, nonce=nonce).exclude(id=multisig_tx_request_id).exists()):
             raise SafeMultisigTxExists(f'Tx with nonce={nonce} for safe={safe_address} already exists in DB')
 
         signature_pairs = [(s['v'], s['r'], s['s']) for s in signatures]
@@ -329,6 +466,141 @@ class TransactionService:
         except IntegrityError as exc:
             raise SafeMultisigTxExists(f'Tx with nonce={nonce} for safe={safe_address} already exists in DB') from exc
 
+    def queue_multisig_tx(self,
+                          safe_address: str,
+                          to: str,
+                          value: int,
+                          data: bytes,
+                          operation: int,
+                          safe_tx_gas: int,
+                          base_gas: int,
+                          gas_price: int,
+                          gas_token: str,
+                          refund_receiver: str,
+                          nonce: int,
+                          signatures: List[Dict[str, int]]) -> SafeMultisigTxRequest:
+        """
+        Only checks not requiring calls to the node are done, the tx is stored to be validated and sent in
+        background by `process_multisig_tx_request`. Signatures order is only checked if the Safe version is cached
+        :return: Database model of SafeMultisigTxRequest
+        :raises: SafeMultisigTxExists: If Safe Multisig Tx with nonce already exists or is queued
+        :raises: SignaturesNotSorted: If signatures are not sorted by owner
+        """
+        safe_contract = SafeContract.objects.get(address=safe_address)
+        if (SafeMultisigTx.objects.filter(safe=safe_contract, nonce=nonce).exists()
+                or SafeMultisigTxRequest.objects.not_failed().filter(safe=safe_contract, nonce=nonce).exists()):
+            raise SafeMultisigTxExists(f'Tx with nonce={nonce} for safe={safe_address} already exists in DB')
+
+        if not self._check_refund_receiver(refund_receiver or NULL_ADDRESS):
+            raise InvalidRefundReceiver(refund_receiver)
+
+        safe_metadata = self.safe_metadata_service.get(safe_address)
+        if safe_metadata:  # If not cached, it will be checked when sending the tx
+            signature_pairs = [(s['v'], s['r'], s['s']) for s in signatures]
+            safe_tx = Safe(safe_address, self.ethereum_client).build_multisig_tx(
+                to or NULL_ADDRESS,
+                value,
+                data or b'',
+                operation,
+                safe_tx_gas,
+                base_gas,
+                gas_price,
+                gas_token or NULL_ADDRESS,
+                refund_receiver or NULL_ADDRESS,
+                signatures_to_bytes(signature_pairs),
+                safe_nonce=nonce,
+                safe_version=safe_metadata.version
+            )
+            if safe_tx.signers != safe_tx.sorted_signers:
+                raise SignaturesNotSorted('Safe-tx-hash=%s - Signatures are not sorted by owner: %s' %
+                                          (safe_tx.safe_tx_hash, safe_tx.signers))
+
+        try:
+            with transaction.atomic():
+                return SafeMultisigTxRequest.objects.create(
+                    safe=safe_contract,
+                    to=to,
+                    value=value,
+                    data=data,
+                    operation=operation,
+                    safe_tx_gas=safe_tx_gas,
+                    data_gas=base_gas,
+                    gas_price=gas_price,
+                    gas_token=gas_token,
+                    refund_receiver=refund_receiver,
+                    nonce=nonce,
+                    signatures=[{'v': s['v'], 'r': s['r'], 's': s['s']} for s in signatures],
+                )
+        except IntegrityError as exc:  # Other request with the same nonce was queued concurrently
+            raise SafeMultisigTxExists(f'Tx with nonce={nonce} for safe={safe_address} already exists in DB') from exc
+
+    def process_multisig_tx_request(self, request_id: str, retry: bool = False) -> Optional[SafeMultisigTxRequest]:
+        """
+        Validates and sends a tx queued by `queue_multisig_tx`. Request is `FAILED` if tx is not valid
+        :param retry: If `True` and node or Redis cannot be reached, request is `QUEUED` again and error is raised,
+        so it can be retried. Otherwise request is `FAILED`
+        :return: SafeMultisigTxRequest processed, `None` if it was not queued (already processed)
+        :raises: CannotRetrieveSafeState, IOError, RedisError if `retry`
+        """
+        if not SafeMultisigTxRequest.objects.filter(id=request_id, status=SafeMultisigTxRequestStatus.QUEUED.value
+                                                    ).update(status=SafeMultisigTxRequestStatus.PROCESSING.value,
+                                                             modified=timezone.now()):
+            return None
+
+        multisig_tx_request = SafeMultisigTxRequest.objects.get(id=request_id)
+        try:
+            multisig_tx_request.multisig_tx = self.create_multisig_tx(
+                safe_address=multisig_tx_request.safe_id,
+                to=multisig_tx_request.to,
+                value=multisig_tx_request.value,
+                data=bytes(multisig_tx_request.data) if multisig_tx_request.data else None,
+                operation=multisig_tx_request.operation,
+                safe_tx_gas=multisig_tx_request.safe_tx_gas,
+                base_gas=multisig_tx_request.data_gas,
+                gas_price=multisig_tx_request.gas_price,
+                gas_token=multisig_tx_request.gas_token,
+                refund_receiver=multisig_tx_request.refund_receiver,
+                nonce=multisig_tx_request.nonce,
+                signatures=multisig_tx_request.signatures,
+                multisig_tx_request_id=request_id
+            )
+            multisig_tx_request.status = SafeMultisigTxRequestStatus.SENT.value
+        except (CannotRetrieveSafeState, IOError, RedisError) as exc:  # Node or Redis are not available
+            if retry:
+                logger.warning('Safe-multisig-tx-request=%s cannot be processed, queuing it again: %s',
+                               request_id, exc)
+                SafeMultisigTxRequest.objects.filter(id=request_id).update(
+                    status=SafeMultisigTxRequestStatus.QUEUED.value, modified=timezone.now())
+                raise
+            logger.warning('Safe-multisig-tx-request=%s failed', request_id, exc_info=True)
+            multisig_tx_request.status = SafeMultisigTxRequestStatus.FAILED.value
+            multisig_tx_request.error = '{}: {}'.format(exc.__class__.__name__, exc)
+        except (TransactionServiceException, SafeContract.DoesNotExist) as exc:  # Tx is not valid
+            logger.warning('Safe-multisig-tx-request=%s failed', request_id, exc_info=True)
+            multisig_tx_request.status = SafeMultisigTxRequestStatus.FAILED.value
+            multisig_tx_request.error = '{}: {}'.format(exc.__class__.__name__, exc)
+        multisig_tx_request.save(update_fields=['multisig_tx', 'status', 'error', 'modified'])
+        return multisig_tx_request
+
+    def resolve_stale_multisig_tx_request(self, multisig_tx_request: SafeMultisigTxRequest) -> SafeMultisigTxRequest:
+        """
+        Resolves a request stuck on `PROCESSING` (worker died while processing it). If the tx was stored for the
+        nonce it's `SENT`, otherwise it's `FAILED`, as it's not known if the tx was sent to the network
+        """
+        safe_multisig_tx = SafeMultisigTx.objects.filter(
+            safe=multisig_tx_request.safe_id,
+            nonce=multisig_tx_request.nonce,
+            request=None
+        ).first()
+        if safe_multisig_tx:
+            multisig_tx_request.multisig_tx = safe_multisig_tx
+            multisig_tx_request.status = SafeMultisigTxRequestStatus.SENT.value
+        else:
+            multisig_tx_request.status = SafeMultisigTxRequestStatus.FAILED.value
+            multisig_tx_request.error = 'Processing of the request was interrupted'
+        multisig_tx_request.save(update_fields=['multisig_tx', 'status', 'error', 'modified'])
+        return multisig_tx_request
+
     def _send_multisig_tx(self,
                           safe_address: str,
                           to: str,
@@ -363,23 +635,26 @@ class TransactionService:
 
         self._check_safe_gas_price(gas_token, gas_price)
 
+        # Independent reads are done with one request, only the steps depending on them are done later
+        safe_state = self._retrieve_safe_state(safe_address, gas_token, block_identifier=block_identifier)
+
+        safe_metadata = safe_state.metadata
+
         # Make sure proxy contract is ours
-        if not self.proxy_factory.check_proxy_code(safe_address):
+        if safe_metadata.code_hash not in self._get_valid_proxy_code_hashes():
             raise InvalidProxyContract(safe_address)
 
         # Make sure master copy is valid
-        safe_master_copy_address = safe.retrieve_master_copy_address()
-        if safe_master_copy_address not in self.safe_valid_contract_addresses:
-            raise InvalidMasterCopyAddress(safe_master_copy_address)
+        if safe_metadata.master_copy not in self.safe_valid_contract_addresses:
+            raise InvalidMasterCopyAddress(safe_metadata.master_copy)
 
         # Check enough funds to pay for the gas
-        if not safe.check_funds_for_tx_gas(safe_tx_gas, base_gas, gas_price, gas_token):
+        if safe_state.balance < (safe_tx_gas + base_gas) * gas_price:
             raise NotEnoughFundsForMultisigTx
 
-        threshold = safe.retrieve_threshold()
         number_signatures = len(signatures) // 65  # One signature = 65 bytes
-        if number_signatures < threshold:
-            raise SignaturesNotFound('Need at least %d signatures' % threshold)
+        if number_signatures < safe_metadata.threshold:
+            raise SignaturesNotFound('Need at least %d signatures' % safe_metadata.threshold)
 
         safe_tx_gas_estimation = safe.estimate_tx_gas(to, value, data, operation)
         safe_base_gas_estimation = safe.estimate_tx_base_gas(to, value, data, operation, gas_token,
@@ -391,8 +666,6 @@ class TransactionService:
 
         # We use fast tx gas price, if not txs could be stuck
         tx_gas_price = self._get_configured_gas_price()
-        tx_sender_private_key = self.tx_sender_account.privateKey
-        tx_sender_address = Account.privateKeyToAccount(tx_sender_private_key).address
 
         safe_tx = safe.build_multisig_tx(
             to,
@@ -406,17 +679,24 @@ class TransactionService:
             refund_receiver,
             signatures,
             safe_nonce=safe_nonce,
-            safe_version=safe.retrieve_version()
+            safe_version=safe_metadata.version
         )
 
         if safe_tx.signers != safe_tx.sorted_signers:
             raise SignaturesNotSorted('Safe-tx-hash=%s - Signatures are not sorted by owner: %s' %
                                       (safe_tx.safe_tx_hash, safe_tx.signers))
 
-        safe_tx.call(tx_sender_address=tx_sender_address, block_identifier=block_identifier)
+        # Every sender account has its own nonce, so txs can be sent in parallel
+        with self.tx_sender_pool.acquire() as tx_sender_account:
+            safe_tx.call(tx_sender_address=tx_sender_account.address, block_identifier=safe_state.block_number)
+
+            with EthereumNonceLock(self.redis, self.ethereum_client, tx_sender_account.address,
+                                   timeout=60 * 2) as tx_nonce:
+                tx_hash, tx = safe_tx.execute(tx_sender_account.privateKey, tx_gas=tx_gas,
+                                              tx_gas_price=tx_gas_price, tx_nonce=tx_nonce,
+                                              block_identifier=block_identifier)
 
-        with EthereumNonceLock(self.redis, self.ethereum_client, self.tx_sender_account.address,
-                               timeout=60 * 2) as tx_nonce:
-            tx_hash, tx = safe_tx.execute(tx_sender_private_key, tx_gas=tx_gas, tx_gas_price=tx_gas_price,
-                                          tx_nonce=tx_nonce, block_identifier=block_identifier)
-            return tx_hash, safe_tx.tx_hash, tx
+        # Txs to the Safe itself can modify its configuration
+        if to == safe_address:
+            self.safe_metadata_service.invalidate(safe_address)
+        return tx_hash, safe_tx.tx_hash, tx
@@ -0,0 +1,215 @@
+import math
+from datetime import timedelta
+from logging import getLogger
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from eth_account.local import LocalAccount
+from hexbytes import HexBytes
+
+from gnosis.eth import EthereumClient, EthereumClientProvider
+from gnosis.eth.constants import NULL_ADDRESS
+
+from safe_relay_service.gas_station.gas_station import (GasStation,
+                                                        GasStationProvider)
+from safe_relay_service.tokens.gas_token_registry import gas_token_registry
+from safe_relay_service.tokens.price_oracles import CannotGetTokenPriceFromApi
+from safe_relay_service.utils.providers import LazyProvider
+
+from ..models import EthereumBlock, EthereumTx, SafeCreation2, SafeMultisigTx
+from .safe_creation_service import SafeCreationServiceProvider
+from .transaction_service import TransactionServiceProvider
+
+logger = getLogger(__name__)
+
+
+class TxReplacementServiceProvider(LazyProvider):
+    @classmethod
+    def build(cls) -> 'TxReplacementService':
+        from django.conf import settings
+        accounts = ([SafeCreationServiceProvider().funder_account]
+                    + TransactionServiceProvider().tx_sender_pool.accounts)
+        return TxReplacementService(GasStationProvider(), EthereumClientProvider(), accounts,
+                                    settings.SAFE_TX_REPLACEMENT_TIMEOUT,
+                                    settings.SAFE_TX_REPLACEMENT_GAS_PRICE_FACTOR)
+
+
+class TxReplacementService:
+    """
+    Relayed and deployment txs pending for more than `replacement_timeout` seconds are sent again with the same
+    nonce and a higher gas price. The gas price is capped by the gas price refunded to the relay, so relay doesn't
+    lose money (unless `gas_price_factor` > 1). Replaced txs are linked to the new one using `EthereumTx.replaced_by`
+    """
+    gas_price_bump = 1.125  # Nodes reject replacements with less than 10% (Geth) or 12.5% (Parity) higher gas price
+    max_age = timedelta(days=1)  # Older txs are not replaced. Their nonce could have been used by other tx
+
+    def __init__(self, gas_station: GasStation, ethereum_client: EthereumClient, accounts: Iterable[LocalAccount],
+                 replacement_timeout: int, gas_price_factor: float = 1.0):
+        self.gas_station = gas_station
+        self.ethereum_client = ethereum_client
+        self.accounts: Dict[str, LocalAccount] = {account.address: account for account in accounts}
+        self.replacement_timeout = replacement_timeout
+        self.gas_price_factor = gas_price_factor
+
+    def _get_stuck_filters(self, prefix: str = '') -> Dict[str, Any]:
+        now = timezone.now()
+        return {prefix + 'block': None,
+                prefix + 'created__lt': now - timedelta(seconds=self.replacement_timeout),
+                prefix + 'created__gte': now - self.max_age,
+                prefix + '_from__in': list(self.accounts)}
+
+    def _get_or_create_ethereum_block(self, block_number: int) -> EthereumBlock:
+        try:
+            return EthereumBlock.objects.get(number=block_number)
+        except EthereumBlock.DoesNotExist:
+            return EthereumBlock.objects.create_from_block(self.ethereum_client.get_block(block_number))
+
+    def get_replaced_txs(self, ethereum_tx: EthereumTx) -> List[EthereumTx]:
+        """
+        :return: `ethereum_tx` and every tx replaced by it, newest first
+        """
+        ethereum_txs = [ethereum_tx]
+        while True:
+            try:
+                ethereum_txs.append(ethereum_txs[-1].replaces)
+            except EthereumTx.DoesNotExist:
+                return ethereum_txs
+
+    def get_last_replacement(self, ethereum_tx: EthereumTx) -> EthereumTx:
+        """
+        :return: Last tx sent replacing `ethereum_tx`, `ethereum_tx` if it was not replaced
+        """
+        while ethereum_tx.replaced_by_id:
+            ethereum_tx = ethereum_tx.replaced_by
+        return ethereum_tx
+
+    def get_mined_tx(self, ethereum_tx: EthereumTx) -> Optional[EthereumTx]:
+        """
+        Any tx of the replacement chain can be mined, not only the last one. If one is mined its block is stored
+        :return: Mined tx of the replacement chain, `None` if none was mined
+        """
+        for replaced_tx in self.get_replaced_txs(ethereum_tx):
+            tx_receipt = self.ethereum_client.get_transaction_receipt(replaced_tx.tx_hash)
+            if tx_receipt and tx_receipt.blockNumber is not None:
+                replaced_tx.block = self._get_or_create_ethereum_block(tx_receipt.blockNumber)
+                replaced_tx.gas_used = tx_receipt.gasUsed
+                replaced_tx.save(update_fields=['block', 'gas_used', 'modified'])
+                return replaced_tx
+        return None
+
+    def get_max_gas_price(self, gas_price: int, gas_token: Optional[str]) -> int:
+        """
+        :param gas_price: Gas price refunded to the relay, in `gas_token` units
+        :param gas_token: Address of the token used for the refund, `NULL_ADDRESS` or `None` if it's ether
+        :return: Max ether gas price to use for a replacement. `0` if it cannot be calculated
+        """
+        if gas_token and gas_token != NULL_ADDRESS:
+            token = gas_token_registry.get(gas_token)
+            if not token:
+                return 0
+            try:
+                gas_price = math.floor(gas_price * token.get_eth_value())
+            except CannotGetTokenPriceFromApi:
+                logger.warning('Cannot get eth value for gas-token=%s', gas_token)
+                return 0
+        return math.floor(gas_price * self.gas_price_factor)
+
+    def send_replacement(self, ethereum_tx: EthereumTx, max_gas_price: int) -> Optional[EthereumTx]:
+        """
+        Sends `ethereum_tx` again with the same nonce and a higher gas price. Fast gas price is used if it's
+        higher than the minimum bump, and it's capped by `max_gas_price`
+        :return: Replacement tx, `None` if tx cannot be replaced
+        """
+        min_gas_price = math.ceil(ethereum_tx.gas_price * self.gas_price_bump)
+        gas_price = min(max(min_gas_price, self.gas_station.get_gas_prices().fast), max_gas_price)
+        if gas_price < min_gas_price:
+            logger.warning('Cannot replace tx-hash=%s with gas-price=%d, max gas-price is %d',
+                           ethereum_tx.tx_hash, min_gas_price, max_gas_price)
+            return None
+
+        account = self.accounts[ethereum_tx._from]
+        tx = {
+            'to': ethereum_tx.to,
+            'value': int(ethereum_tx.value),
+            'data': HexBytes(bytes(ethereum_tx.data or b'')),
+            'gas': int(ethereum_tx.gas),
+            'gasPrice': gas_price,
+            'nonce': int(ethereum_tx.nonce),
+        }
+        if not tx['to']:  # Contract creation
+            del tx['to']
+        try:
+            tx_hash = self.ethereum_client.send_unsigned_transaction(tx, private_key=account.privateKey)
+        except ValueError as exc:  # Replacement underpriced, nonce too low...
+            logger.warning('Cannot replace tx-hash=%s: %s', ethereum_tx.tx_hash, exc)
+            return None
+
+        # Tx is already sent, so it's stored right away, not depending on other database operations
+        try:
+            with transaction.atomic():
+                replacement_tx = EthereumTx.objects.create_from_tx(dict(tx, **{'from': account.address}), tx_hash)
+                ethereum_tx.replaced_by = replacement_tx
+                ethereum_tx.save(update_fields=['replaced_by', 'modified'])
+        except Exception:
+            logger.error('Cannot store tx-hash=%s replacing tx-hash=%s', tx_hash.hex(), ethereum_tx.tx_hash)
+            raise
+        logger.info('Replaced tx-hash=%s with tx-hash=%s, gas-price %d -> %d', ethereum_tx.tx_hash,
+                    tx_hash.hex(), ethereum_tx.gas_price, gas_price)
+        return replacement_tx
+
+    def replace_stuck_tx(self, ethereum_tx: EthereumTx, max_gas_price: int) -> Optional[EthereumTx]:
+        """
+        :return: Mined tx of the replacement chain of `ethereum_tx`, or the new replacement if none was mined.
+        `None` if none was mined and it could not be replaced
+        """
+        ethereum_tx = self.get_last_replacement(ethereum_tx)
+        try:
+            return self.get_mined_tx(ethereum_tx) or self.send_replacement(ethereum_tx, max_gas_price)
+        except IOError as exc:
+            logger.warning('Cannot replace tx-hash=%s: %s', ethereum_tx.tx_hash, exc)
+            return None
+
+    def replace_stuck_multisig_txs(self) -> int:
+        """
+        :return: Number of relayed txs replaced
+        """
+        replaced = 0
+        for safe_multisig_tx in SafeMultisigTx.objects.filter(
+                **self._get_stuck_filters('ethereum_tx__')).select_related('ethereum_tx'):
+            max_gas_price = self.get_max_gas_price(safe_multisig_tx.gas_price, safe_multisig_tx.gas_token)
+            ethereum_tx = self.replace_stuck_tx(safe_multisig_tx.ethereum_tx, max_gas_price)
+            if ethereum_tx:
+                safe_multisig_tx.ethereum_tx = ethereum_tx
+                safe_multisig_tx.save(update_fields=['ethereum_tx', 'modified'])
+                if ethereum_tx.block_id is None:
+                    replaced += 1
+        return replaced
+
+    def replace_stuck_deployment_txs(self) -> int:
+        """
+        :return: Number of Safe deployment txs replaced. `check_create2_deployed_safes_task` takes care of
+        storing the block number when they are mined
+        """
+        safe_creation2_by_tx_hash = {safe_creation2.tx_hash: safe_creation2
+                                     for safe_creation2 in SafeCreation2.objects.pending_to_check()}
+        replaced = 0
+        for ethereum_tx in EthereumTx.objects.filter(tx_hash__in=list(safe_creation2_by_tx_hash),
+                                                     **self._get_stuck_filters()):
+            safe_creation2 = safe_creation2_by_tx_hash[ethereum_tx.tx_hash]
+            # Payment for the deployment was calculated using `gas_price_estimated`
+            max_gas_price = math.floor(safe_creation2.gas_price_estimated * self.gas_price_factor)
+            ethereum_tx = self.replace_stuck_tx(ethereum_tx, max_gas_price)
+            if ethereum_tx:
+                safe_creation2.tx_hash = ethereum_tx.tx_hash
+                safe_creation2.save(update_fields=['tx_hash', 'modified'])
+                if ethereum_tx.block_id is None:
+                    replaced += 1
+        return replaced
+
+    def replace_stuck_txs(self) -> int:
+        """
+        :return: Number of txs replaced
+        """
+        return self.replace_stuck_multisig_txs() + self.replace_stuck_deployment_txs()
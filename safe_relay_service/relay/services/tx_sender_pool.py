@@ -0,0 +1,137 @@
+import time
+import uuid
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import requests
+from eth_account import Account
+from eth_account.local import LocalAccount
+from redis import Redis
+
+from gnosis.eth import EthereumClient
+
+logger = getLogger(__name__)
+
+
+class TxSenderPool:
+    """
+    Pool of accounts used to send the relayed txs. Every account has its own nonce (see `EthereumNonceLock`),
+    so txs can be sent in parallel. The account with the least pending txs is used, and accounts without enough
+    balance are not used while other accounts are available
+    """
+    in_flight_key = 'tx-senders:in-flight:{}'
+    disabled_key = 'tx-senders:disabled'
+
+    def __init__(self, ethereum_client: EthereumClient, redis: Redis, private_keys: Sequence[str],
+                 in_flight_timeout: int = 60 * 3, pending_txs_cache_timeout: int = 5):
+        """
+        :param in_flight_timeout: Seconds to consider an account in use if it's not released (e.g. worker was
+        killed)
+        :param pending_txs_cache_timeout: Seconds to reuse the number of pending txs of the accounts
+        """
+        assert private_keys, 'At least one tx sender private key is required'
+        self.ethereum_client = ethereum_client
+        self.redis = redis
+        self.in_flight_timeout = in_flight_timeout
+        self.pending_txs_cache_timeout = pending_txs_cache_timeout
+        self._pending_txs: Dict[str, int] = {}
+        self._pending_txs_expiration: float = 0.
+        self.accounts: List[LocalAccount] = []
+        for private_key in private_keys:
+            account = Account.privateKeyToAccount(private_key)
+            if account.address not in self.addresses:
+                self.accounts.append(account)
+        self.http_session = requests.Session()
+
+    @property
+    def addresses(self) -> List[str]:
+        return [account.address for account in self.accounts]
+
+    def get_pending_txs(self) -> Dict[str, int]:
+        """
+        Pending txs are retrieved for every account using one JSON-RPC batch request
+        :return: Dictionary of `address -> number of txs sent and not mined yet`
+        """
+        queries = []
+        for i, address in enumerate(self.addresses):
+            queries.append({'jsonrpc': '2.0', 'method': 'eth_getTransactionCount',
+                            'params': [address, 'pending'], 'id': i * 2})
+            queries.append({'jsonrpc': '2.0', 'method': 'eth_getTransactionCount',
+                            'params': [address, 'latest'], 'id': i * 2 + 1})
+        response = self.http_session.post(self.ethereum_client.ethereum_node_url, json=queries, timeout=10)
+        results = {result['id']: int(result['result'], 16) for result in response.json()}
+        return {address: results[i * 2] - results[i * 2 + 1] for i, address in enumerate(self.addresses)}
+
+    def get_cached_pending_txs(self) -> Dict[str, int]:
+        """
+        :return: `get_pending_txs` result, reused for `pending_txs_cache_timeout` seconds. Empty if it cannot be
+        retrieved
+        """
+        if time.time() >= self._pending_txs_expiration:
+            try:
+                self._pending_txs = self.get_pending_txs()
+            except (IOError, ValueError, KeyError) as exc:
+                logger.warning('Cannot retrieve pending txs for tx senders: %s', exc)
+                self._pending_txs = {}
+            self._pending_txs_expiration = time.time() + self.pending_txs_cache_timeout
+        return self._pending_txs
+
+    def get_in_flight_txs(self, addresses: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        """
+        Every acquisition is stored with its expiration, so acquisitions not released don't count forever
+        :return: Dictionary of `address -> number of accounts acquired and not released`
+        """
+        addresses = self.addresses if addresses is None else addresses
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        for address in addresses:
+            pipe.zcount(self.in_flight_key.format(address), now, '+inf')
+        return dict(zip(addresses, pipe.execute()))
+
+    def get_disabled_addresses(self) -> List[str]:
+        return [address.decode() for address in self.redis.smembers(self.disabled_key)]
+
+    def set_disabled(self, address: str, disabled: bool):
+        """
+        Accounts without enough balance are disabled by `check_balance_of_accounts_task`
+        """
+        if disabled:
+            self.redis.sadd(self.disabled_key, address)
+        else:
+            self.redis.srem(self.disabled_key, address)
+
+    def select_account(self) -> LocalAccount:
+        """
+        :return: Enabled account with the least txs being sent or pending to be mined
+        """
+        if len(self.accounts) == 1:
+            return self.accounts[0]
+
+        disabled_addresses = set(self.get_disabled_addresses())
+        accounts = [account for account in self.accounts if account.address not in disabled_addresses]
+        if not accounts:
+            logger.error('Every tx sender account is disabled, using all of them')
+            accounts = self.accounts
+
+        pending_txs = self.get_cached_pending_txs()
+        in_flight = self.get_in_flight_txs([account.address for account in accounts])
+        return min(accounts, key=lambda account: (in_flight[account.address] + pending_txs.get(account.address, 0)))
+
+    @contextmanager
+    def acquire(self) -> Iterator[LocalAccount]:
+        """
+        Context manager returning the account to use. Account is marked as in use until exiting
+        """
+        account = self.select_account()
+        key = self.in_flight_key.format(account.address)
+        acquisition_id = str(uuid.uuid4())
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.zremrangebyscore(key, '-inf', now)
+        pipe.zadd(key, {acquisition_id: now + self.in_flight_timeout})
+        pipe.execute()
+        try:
+            yield account
+        finally:
+            self.redis.zrem(key, acquisition_id)
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 
 from django.conf import settings
 from django.utils import timezone
@@ -7,19 +7,25 @@ from django.utils import timezone
 from celery import app
 from celery.utils.log import get_task_logger
 from ethereum.utils import check_checksum, checksum_encode, mk_contract_address
-from redis.exceptions import LockError
+from redis.exceptions import LockError, RedisError
 
 from gnosis.eth import EthereumClientProvider, TransactionAlreadyImported
 from gnosis.eth.constants import NULL_ADDRESS
 
+from safe_relay_service.gas_station.gas_station import GasStationProvider
 from safe_relay_service.relay.models import (SafeContract, SafeCreation,
-                                             SafeCreation2, SafeFunding)
+                                             SafeCreation2, SafeFunding,
+                                             SafeMultisigTxRequest,
+                                             SafeMultisigTxRequestStatus)
 
-from .repositories.redis_repository import RedisRepository
+from .repositories.redis_repository import NonceAllocator, RedisRepository
 from .services import (Erc20EventsServiceProvider, FundingServiceProvider,
                        InternalTxServiceProvider, NotificationServiceProvider,
-                       SafeCreationServiceProvider, TransactionServiceProvider)
+                       SafeCreationServiceProvider,
+                       SafeMetadataServiceProvider, TransactionServiceProvider,
+                       TxReplacementServiceProvider)
 from .services.safe_creation_service import NotEnoughFundingForCreation
+from .services.transaction_service import CannotRetrieveSafeState
 
 logger = get_task_logger(__name__)
 
@@ -320,11 +326,13 @@ def send_create_notification(safe_address: str, owners: List[str]) -> None:
 @app.shared_task(soft_time_limit=300)
 def check_balance_of_accounts_task() -> bool:
     """
-    Checks if balance of relayer accounts (tx sender, safe funder) are less than the configured threshold
+    Checks if balance of relayer accounts (tx senders, safe funder) are less than the configured threshold.
+    Tx sender accounts without enough balance are not used while other accounts are available
     :return: True if every account have enough ether, False otherwise
     """
     balance_warning_wei = settings.SAFE_ACCOUNTS_BALANCE_WARNING
-    addresses = FundingServiceProvider().funder_account.address, TransactionServiceProvider().tx_sender_account.address
+    tx_sender_pool = TransactionServiceProvider().tx_sender_pool
+    addresses = [FundingServiceProvider().funder_account.address] + tx_sender_pool.addresses
 
     ethereum_client = EthereumClientProvider()
     result = True
@@ -334,6 +342,8 @@ def check_balance_of_accounts_task() -> bool:
             logger.error('Relayer account=%s current balance=%d . Balance must be greater than %d',
                          address, balance_wei, balance_warning_wei)
             result = False
+        if address in tx_sender_pool.addresses:
+            tx_sender_pool.set_disabled(address, balance_wei <= balance_warning_wei)
     return result
 
 
@@ -369,3 +379,123 @@ def find_erc_20_721_transfers_task() -> int:
     except LockError:
         pass
     return number_safes
+
+
+@app.shared_task(soft_time_limit=LOCK_TIMEOUT)
+def invalidate_safe_metadata_task() -> int:
+    """
+    Invalidate cached metadata of the Safes modified since the last execution
+    :return: Number of safes invalidated
+    """
+    number_safes = 0
+    try:
+        redis = RedisRepository().redis
+        with redis.lock('tasks:invalidate_safe_metadata_task', blocking_timeout=1, timeout=LOCK_TIMEOUT):
+            number_safes = SafeMetadataServiceProvider().process_events()
+            if number_safes:
+                logger.info('Invalidated metadata for %d safes', number_safes)
+    except LockError:
+        pass
+    return number_safes
+
+
+@app.shared_task(soft_time_limit=LOCK_TIMEOUT)
+def reconcile_nonces_task() -> int:
+    """
+    Compare nonces of the relayer accounts with the node. Nonces reserved and not used leave gaps, and txs with
+    bigger nonces will not be mined until they are used, so 0 ether txs are sent to fill them
+    :return: Number of gaps filled
+    """
+    filled_gaps = 0
+    try:
+        redis = RedisRepository().redis
+        with redis.lock('tasks:reconcile_nonces_task', blocking_timeout=1, timeout=LOCK_TIMEOUT):
+            ethereum_client = EthereumClientProvider()
+            accounts = [FundingServiceProvider().funder_account] + TransactionServiceProvider().tx_sender_pool.accounts
+            for account in accounts:
+                nonce_allocator = NonceAllocator(redis, ethereum_client, account.address)
+                gaps = nonce_allocator.reconcile()
+                if gaps:
+                    gas_price = GasStationProvider().get_gas_prices().fast
+                for _ in gaps:
+                    nonce = nonce_allocator.reserve(only_released=True)
+                    if nonce is None:  # Gaps were already filled by other txs
+                        break
+                    try:
+                        tx_hash = ethereum_client.send_eth_to(account.privateKey, account.address, gas_price, 0,
+                                                              gas=21000, nonce=nonce)
+                    except Exception:
+                        nonce_allocator.release(nonce)
+                        raise
+                    nonce_allocator.commit(nonce)
+                    filled_gaps += 1
+                    logger.warning('Filled gap for account=%s with nonce=%d, tx-hash=%s',
+                                   account.address, nonce, tx_hash.hex())
+    except LockError:
+        pass
+    return filled_gaps
+
+
+@app.shared_task(soft_time_limit=LOCK_TIMEOUT)
+def replace_stuck_txs_task() -> int:
+    """
+    Send again relayed and deployment txs not mined after `SAFE_TX_REPLACEMENT_TIMEOUT`, with the same nonce and
+    a higher gas price
+    :return: Number of txs replaced
+    """
+    replaced = 0
+    try:
+        redis = RedisRepository().redis
+        with redis.lock('tasks:replace_stuck_txs_task', blocking_timeout=1, timeout=LOCK_TIMEOUT):
+            replaced = TxReplacementServiceProvider().replace_stuck_txs()
+            if replaced:
+                logger.info('Replaced %d stuck txs', replaced)
+    except LockError:
+        pass
+    return replaced
+
+
+@app.shared_task(bind=True, max_retries=3, soft_time_limit=LOCK_TIMEOUT)
+def process_multisig_tx_request_task(self, request_id: str) -> Optional[str]:
+    """
+    Validate and send a Safe Multisig Tx queued by the API. It's routed to the `relay` queue, so workers can be
+    dedicated to it. If node or Redis cannot be reached it's retried, request is `FAILED` on the last retry
+    :param request_id: Id of the `SafeMultisigTxRequest`
+    :return: Status of the request, `None` if it was already processed
+    """
+    try:
+        multisig_tx_request = TransactionServiceProvider().process_multisig_tx_request(
+            request_id, retry=self.request.retries < self.max_retries)
+    except (CannotRetrieveSafeState, IOError, RedisError) as exc:
+        raise self.retry(exc=exc, countdown=self.request.retries * 10 + 15)
+    if multisig_tx_request:
+        return SafeMultisigTxRequestStatus(multisig_tx_request.status).name
+
+
+@app.shared_task(soft_time_limit=LOCK_TIMEOUT)
+def recover_multisig_tx_requests_task() -> int:
+    """
+    Recover Safe Multisig Tx requests if the Celery message was lost (still `QUEUED`, task is sent again) or if the
+    worker died while processing it (still `PROCESSING`, see `resolve_stale_multisig_tx_request`)
+    :return: Number of requests recovered
+    """
+    recovered = 0
+    try:
+        redis = RedisRepository().redis
+        with redis.lock('tasks:recover_multisig_tx_requests_task', blocking_timeout=1, timeout=LOCK_TIMEOUT):
+            for request_id in SafeMultisigTxRequest.objects.stale(SafeMultisigTxRequestStatus.QUEUED,
+                                                                  60 * 5).values_list('id', flat=True):
+                logger.warning('Safe-multisig-tx-request=%s was not processed, queuing it again', request_id)
+                process_multisig_tx_request_task.delay(str(request_id))
+                recovered += 1
+
+            transaction_service = TransactionServiceProvider()
+            for multisig_tx_request in SafeMultisigTxRequest.objects.stale(SafeMultisigTxRequestStatus.PROCESSING,
+                                                                           LOCK_TIMEOUT * 5):
+                multisig_tx_request = transaction_service.resolve_stale_multisig_tx_request(multisig_tx_request)
+                logger.warning('Safe-multisig-tx-request=%s processing was interrupted, status is %s',
+                               multisig_tx_request.id, SafeMultisigTxRequestStatus(multisig_tx_request.status).name)
+                recovered += 1
+    except LockError:
+        pass
+    return recovered
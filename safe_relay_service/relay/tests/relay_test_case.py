@@ -8,6 +8,7 @@ from safe_relay_service.gas_station.gas_station import GasStationProvider
 from ..models import SafeCreation, SafeCreation2
 from ..services import FundingServiceProvider
 from ..services.safe_creation_service import SafeCreationServiceProvider
+from ..services.safe_metadata_service import SafeMetadataServiceProvider
 from ..services.transaction_service import TransactionServiceProvider
 
 
@@ -19,10 +20,12 @@ class RelayTestCaseMixin(SafeTestCaseMixin):
         SafeCreationServiceProvider.del_singleton()
         TransactionServiceProvider.del_singleton()
         FundingServiceProvider.del_singleton()
+        SafeMetadataServiceProvider.del_singleton()
         cls.gas_station = GasStationProvider()
         cls.funding_service = FundingServiceProvider()
         cls.safe_creation_service = SafeCreationServiceProvider()
         cls.transaction_service = TransactionServiceProvider()
+        cls.safe_metadata_service = SafeMetadataServiceProvider()
 
     def create_test_safe_in_db(self, owners=None, number_owners=3, threshold=None,
                                payment_token=None) -> SafeCreation:
@@ -0,0 +1,122 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+
+from ..repositories.redis_repository import (EthereumNonceLock,
+                                             NonceAllocator, RedisRepository)
+
+
+class TestRedisRepository(TestCase):
+    def setUp(self):
+        self.redis = RedisRepository().redis
+        self.ethereum_client = mock.MagicMock()
+        self.ethereum_client.get_nonce_for_account.return_value = 5
+        self.address = Account.create().address
+
+    def test_nonce_allocator(self):
+        nonce_allocator = NonceAllocator(self.redis, self.ethereum_client, self.address)
+        self.assertEqual(nonce_allocator.reserve(), 5)
+        self.assertEqual(nonce_allocator.reserve(), 6)
+        self.assertIsNone(nonce_allocator.reserve(only_released=True))
+        nonce_allocator.commit(5)
+
+        # Released nonces are used first
+        nonce_allocator.release(6)
+        self.assertEqual(nonce_allocator.reserve(only_released=True), 6)
+        self.assertEqual(nonce_allocator.reserve(), 7)
+        nonce_allocator.release(6)
+        nonce_allocator.commit(7)
+        self.assertEqual(nonce_allocator.reconcile(), [6])  # Nonce 7 is used, so nonce 6 is a gap
+
+        # Nonces known by the node are not released
+        self.ethereum_client.get_nonce_for_account.return_value = 8
+        self.assertEqual(nonce_allocator.reconcile(), [])
+        nonce = nonce_allocator.reserve()
+        self.assertEqual(nonce, 8)
+        nonce_allocator.release(nonce)
+        self.assertEqual(nonce_allocator.reserve(), 8)
+
+        # Nonce of the node is used if txs were sent outside of the allocator
+        self.ethereum_client.get_nonce_for_account.return_value = 20
+        self.assertEqual(nonce_allocator.reconcile(), [])
+        self.assertEqual(nonce_allocator.reserve(), 20)
+
+    def test_nonce_allocator_expired_reservations(self):
+        nonce_allocator = NonceAllocator(self.redis, self.ethereum_client, self.address, reservation_timeout=-1)
+        self.assertEqual(nonce_allocator.reserve(), 5)
+        self.assertEqual(nonce_allocator.reserve(), 6)
+        self.ethereum_client.get_nonce_for_account.return_value = 6  # Nonce 5 was sent
+        self.assertEqual(nonce_allocator.reconcile(), [])  # Nonce 6 is not a gap, it's reused by the next tx
+        self.assertEqual(nonce_allocator.reserve(), 6)
+
+    def test_nonce_allocator_released_on_top(self):
+        nonce_allocator = NonceAllocator(self.redis, self.ethereum_client, self.address)
+        for nonce in (5, 6, 7):
+            self.assertEqual(nonce_allocator.reserve(), nonce)
+        nonce_allocator.commit(5)
+        nonce_allocator.release(6)
+        nonce_allocator.release(7)
+        self.ethereum_client.get_nonce_for_account.return_value = 6
+        self.assertEqual(nonce_allocator.reconcile(), [])
+        self.assertEqual(int(self.redis.get(nonce_allocator.keys[0])), 6)
+
+    def test_nonce_allocator_dropped_txs(self):
+        nonce_allocator = NonceAllocator(self.redis, self.ethereum_client, self.address)
+        self.assertEqual(nonce_allocator.reserve(), 5)
+        nonce_allocator.commit(5)  # Tx is dropped by the node, pending nonce stays on 5
+        self.assertEqual(nonce_allocator.reconcile(), [])
+        self.assertEqual(int(self.redis.get(nonce_allocator.keys[0])), 6)
+
+        # Node is still behind with nothing in flight, so next nonce is moved back
+        self.assertEqual(nonce_allocator.reconcile(), [])
+        self.assertEqual(nonce_allocator.reserve(), 5)
+
+        # Node is behind but a nonce is reserved, so nothing is changed
+        nonce_allocator.reconcile()
+        nonce_allocator.reconcile()
+        self.assertEqual(nonce_allocator.reserve(), 6)
+
+    def test_ethereum_nonce_lock(self):
+        with EthereumNonceLock(self.redis, self.ethereum_client, self.address) as tx_nonce:
+            self.assertEqual(tx_nonce, 5)
+
+        with self.assertRaises(ValueError):
+            with EthereumNonceLock(self.redis, self.ethereum_client, self.address) as tx_nonce:
+                self.assertEqual(tx_nonce, 6)
+                raise ValueError
+
+        # Nonce was released
+        with EthereumNonceLock(self.redis, self.ethereum_client, self.address) as tx_nonce:
+            self.assertEqual(tx_nonce, 6)
+
+    def test_ethereum_nonce_lock_multiple_threads(self):
+        def send_txs(number_txs: int):
+            used_nonces = []
+            for _ in range(number_txs):
+                try:
+                    with EthereumNonceLock(self.redis, self.ethereum_client, self.address) as tx_nonce:
+                        if random.random() < 0.2:
+                            raise ValueError('Tx not sent')
+                        used_nonces.append(tx_nonce)
+                except ValueError:
+                    pass
+            return used_nonces
+
+        number_threads, number_txs = 20, 50
+        with ThreadPoolExecutor(max_workers=number_threads) as executor:
+            results = list(executor.map(send_txs, [number_txs] * number_threads))
+
+        used_nonces = [nonce for result in results for nonce in result]
+        self.assertEqual(len(used_nonces), len(set(used_nonces)))  # No duplicated nonces
+
+        # Used and released nonces have no gaps
+        nonce_allocator = NonceAllocator(self.redis, self.ethereum_client, self.address)
+        released_nonces = nonce_allocator.reconcile()
+        self.assertFalse(set(used_nonces) & set(released_nonces))
+        all_nonces = sorted(used_nonces + released_nonces)
+        self.assertEqual(all_nonces, list(range(5, 5 + len(all_nonces))))
+        self.assertEqual(int(self.redis.get(nonce_allocator.keys[0])), 5 + len(all_nonces))
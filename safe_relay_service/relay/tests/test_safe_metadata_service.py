@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+
+from gnosis.safe import Safe
+
+from .relay_test_case import RelayTestCaseMixin
+
+
+class TestSafeMetadataService(RelayTestCaseMixin, TestCase):
+    def test_retrieve(self):
+        safe_address = self.deploy_test_safe(number_owners=2, threshold=2).safe_address
+        safe = Safe(safe_address, self.ethereum_client)
+        self.assertIsNone(self.safe_metadata_service.get(safe_address))
+
+        safe_metadata = self.safe_metadata_service.retrieve(safe_address)
+        self.assertEqual(safe_metadata.address, safe_address)
+        self.assertEqual(safe_metadata.master_copy, safe.retrieve_master_copy_address())
+        self.assertEqual(safe_metadata.version, safe.retrieve_version())
+        self.assertEqual(safe_metadata.owners, safe.retrieve_owners())
+        self.assertEqual(safe_metadata.threshold, 2)
+        self.assertEqual(self.safe_metadata_service.get(safe_address), safe_metadata)
+
+        self.safe_metadata_service.invalidate(safe_address, block_number=safe_metadata.block_number)
+        self.assertIsNone(self.safe_metadata_service.get(safe_address))
+
+        # Metadata read before the Safe was modified is not stored
+        self.assertFalse(self.safe_metadata_service.store(safe_metadata))
+        self.assertTrue(self.safe_metadata_service.store(
+            safe_metadata._replace(block_number=safe_metadata.block_number + 1)))
+
+        # Not deployed Safes are not cached
+        not_deployed_address = Account.create().address
+        self.assertEqual(self.safe_metadata_service.retrieve(not_deployed_address).owners, [])
+        self.assertIsNone(self.safe_metadata_service.get(not_deployed_address))
+
+    def test_process_events(self):
+        safe_address = self.deploy_test_safe().safe_address
+        safe_metadata = self.safe_metadata_service.retrieve(safe_address)
+        current_block_number = self.ethereum_client.current_block_number
+        self.safe_metadata_service.redis.delete(self.safe_metadata_service.last_block_key)
+
+        with mock.patch.object(self.w3.eth, 'getLogs', return_value=[]):
+            self.assertEqual(self.safe_metadata_service.process_events(), 0)
+        self.assertEqual(self.safe_metadata_service.get(safe_address), safe_metadata)
+
+        logs = [{'address': safe_address, 'blockNumber': current_block_number}]
+        with mock.patch.object(self.w3.eth, 'getLogs', return_value=logs) as get_logs_mock:
+            self.assertEqual(self.safe_metadata_service.process_events(), 1)
+            self.assertEqual(get_logs_mock.call_args[0][0]['topics'], [self.safe_metadata_service.event_topics])
+        self.assertIsNone(self.safe_metadata_service.get(safe_address))
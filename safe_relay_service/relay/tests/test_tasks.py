@@ -1,19 +1,23 @@
 import logging
 from datetime import timedelta
+from unittest import mock
 
 from django.conf import settings
 from django.test import TestCase
 from django.utils import timezone
 
-from ..models import SafeContract, SafeFunding
+from ..models import (SafeContract, SafeFunding, SafeMultisigTxRequest,
+                      SafeMultisigTxRequestStatus)
 from ..services import Erc20EventsServiceProvider, InternalTxServiceProvider
 from ..tasks import (check_balance_of_accounts_task,
                      check_deployer_funded_task, deploy_create2_safe_task,
                      deploy_safes_task, find_erc_20_721_transfers_task,
-                     find_internal_txs_task, fund_deployer_task)
+                     find_internal_txs_task, fund_deployer_task,
+                     process_multisig_tx_request_task,
+                     recover_multisig_tx_requests_task)
 from .factories import (SafeContractFactory, SafeCreation2Factory,
                         SafeCreationFactory, SafeFundingFactory,
-                        SafeTxStatusFactory)
+                        SafeMultisigTxFactory, SafeTxStatusFactory)
 from .relay_test_case import RelayTestCaseMixin
 from .test_internal_tx_service import EthereumClientMock
 
@@ -266,3 +270,31 @@ class TestTasks(RelayTestCaseMixin, TestCase):
         SafeTxStatusFactory(safe=safe)
         self.assertEqual(find_erc_20_721_transfers_task.delay().get(), 1)
         Erc20EventsServiceProvider.del_singleton()
+
+    def test_recover_multisig_tx_requests_task(self):
+        safe_multisig_tx = SafeMultisigTxFactory()
+        safe = safe_multisig_tx.safe
+
+        def create_request(status: SafeMultisigTxRequestStatus, nonce: int) -> SafeMultisigTxRequest:
+            multisig_tx_request = SafeMultisigTxRequest.objects.create(safe=safe, value=0, operation=0,
+                                                                       safe_tx_gas=0, data_gas=0, gas_price=1,
+                                                                       signatures=[], nonce=nonce,
+                                                                       status=status.value)
+            SafeMultisigTxRequest.objects.filter(id=multisig_tx_request.id).update(
+                modified=timezone.now() - timedelta(hours=1))
+            return multisig_tx_request
+
+        queued_request = create_request(SafeMultisigTxRequestStatus.QUEUED, safe_multisig_tx.nonce + 1)
+        sent_request = create_request(SafeMultisigTxRequestStatus.PROCESSING, safe_multisig_tx.nonce)
+        failed_request = create_request(SafeMultisigTxRequestStatus.PROCESSING, safe_multisig_tx.nonce + 2)
+        create_request(SafeMultisigTxRequestStatus.SENT, safe_multisig_tx.nonce + 3)
+
+        with mock.patch.object(process_multisig_tx_request_task, 'delay') as delay_mock:
+            self.assertEqual(recover_multisig_tx_requests_task.delay().get(), 3)
+            delay_mock.assert_called_once_with(str(queued_request.id))
+
+        sent_request.refresh_from_db()
+        self.assertEqual(sent_request.status, SafeMultisigTxRequestStatus.SENT.value)
+        self.assertEqual(sent_request.multisig_tx, safe_multisig_tx)
+        failed_request.refresh_from_db()
+        self.assertEqual(failed_request.status, SafeMultisigTxRequestStatus.FAILED.value)
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.test import TestCase
 
 from eth_account import Account
@@ -10,13 +12,16 @@ from gnosis.safe import CannotEstimateGas, Safe, SafeOperation
 
 from safe_relay_service.tokens.tests.factories import TokenFactory
 
+from ..models import SafeMultisigTxRequest, SafeMultisigTxRequestStatus
 from ..services.transaction_service import (GasPriceTooLow, InvalidGasToken,
                                             InvalidMasterCopyAddress,
                                             InvalidProxyContract,
                                             InvalidRefundReceiver,
                                             NotEnoughFundsForMultisigTx,
                                             RefundMustBeEnabled,
-                                            SignaturesNotSorted)
+                                            SafeMultisigTxExists,
+                                            SignaturesNotSorted,
+                                            TransactionService)
 from .factories import SafeContractFactory
 from .relay_test_case import RelayTestCaseMixin
 
@@ -303,6 +308,61 @@ class TestTransactionService(RelayTestCaseMixin, TestCase):
         tx_receipt = w3.eth.waitForTransactionReceipt(safe_multisig_tx.ethereum_tx.tx_hash)
         self.assertTrue(tx_receipt['status'])
 
+    def test_create_multisig_tx_queued(self):
+        safe_contract = SafeContractFactory()
+        SafeMultisigTxRequest.objects.create(safe=safe_contract, value=0, operation=0, safe_tx_gas=0, data_gas=0,
+                                             gas_price=1, signatures=[], nonce=0)
+        # Nonce is queued by other request
+        with self.assertRaises(SafeMultisigTxExists):
+            self.transaction_service.create_multisig_tx(safe_contract.address, Account.create().address, 0, None, 0,
+                                                        0, 0, 1, NULL_ADDRESS, NULL_ADDRESS, 0, [])
+
+    def test_process_multisig_tx_request(self):
+        safe_contract = SafeContractFactory()
+
+        def create_request() -> SafeMultisigTxRequest:
+            return SafeMultisigTxRequest.objects.create(safe=safe_contract, value=0, operation=0, safe_tx_gas=0,
+                                                        data_gas=0, gas_price=1, signatures=[], nonce=0)
+
+        # Node not available, request is queued again to be retried
+        multisig_tx_request = create_request()
+        with mock.patch.object(TransactionService, '_send_multisig_tx', side_effect=IOError('Connection refused')):
+            with self.assertRaises(IOError):
+                self.transaction_service.process_multisig_tx_request(multisig_tx_request.id, retry=True)
+            multisig_tx_request.refresh_from_db()
+            self.assertEqual(multisig_tx_request.status, SafeMultisigTxRequestStatus.QUEUED.value)
+
+            # Last retry
+            multisig_tx_request = self.transaction_service.process_multisig_tx_request(multisig_tx_request.id)
+            self.assertEqual(multisig_tx_request.status, SafeMultisigTxRequestStatus.FAILED.value)
+            self.assertIn('Connection refused', multisig_tx_request.error)
+
+        # Tx is not valid, it's not retried
+        multisig_tx_request = create_request()
+        with mock.patch.object(TransactionService, '_send_multisig_tx', side_effect=GasPriceTooLow('Low')):
+            multisig_tx_request = self.transaction_service.process_multisig_tx_request(
+                multisig_tx_request.id, retry=True)
+            self.assertEqual(multisig_tx_request.status, SafeMultisigTxRequestStatus.FAILED.value)
+
+    def test_retrieve_safe_state(self):
+        safe_address = self.deploy_test_safe().safe_address
+        safe = Safe(safe_address, self.ethereum_client)
+        safe_state = self.transaction_service._retrieve_safe_state(safe_address, NULL_ADDRESS)
+        self.assertEqual(safe_state.block_number, self.w3.eth.blockNumber)
+        self.assertEqual(safe_state.balance, self.w3.eth.getBalance(safe_address))
+        safe_metadata = safe_state.metadata
+        self.assertIn(safe_metadata.code_hash, self.transaction_service._get_valid_proxy_code_hashes())
+        self.assertEqual(safe_metadata.master_copy, safe.retrieve_master_copy_address())
+        self.assertEqual(safe_metadata.threshold, safe.retrieve_threshold())
+        self.assertEqual(safe_metadata.version, safe.retrieve_version())
+
+        # Metadata is cached
+        self.assertEqual(self.safe_metadata_service.get(safe_address), safe_metadata)
+
+        erc20_contract = self.deploy_example_erc20(100, safe_address)
+        safe_state = self.transaction_service._retrieve_safe_state(safe_address, erc20_contract.address)
+        self.assertEqual(safe_state.balance, 100)
+
     def test_estimate_tx(self):
         safe_address = Account.create().address
         to = Account.create().address
@@ -331,6 +391,23 @@ class TestTransactionService(RelayTestCaseMixin, TestCase):
         self.assertEqual(transaction_estimation.gas_token, NULL_ADDRESS)
         #TODO Test operational gas for old safes
 
+    def test_estimate_tx_cache(self):
+        safe_address = self.deploy_test_safe().safe_address
+        to = Account.create().address
+        stats = self.transaction_service.get_estimate_cache_stats()
+        transaction_estimation = self.transaction_service.estimate_tx(safe_address, to, 0, b'', 0, NULL_ADDRESS)
+
+        # Same estimation on the same block is not requested to the node again
+        with mock.patch.object(Safe, 'estimate_tx_gas') as estimate_tx_gas_mock:
+            self.assertEqual(self.transaction_service.estimate_tx(safe_address, to, 0, b'', 0, NULL_ADDRESS),
+                             transaction_estimation)
+            estimate_tx_gas_mock.assert_not_called()
+
+        new_stats = self.transaction_service.get_estimate_cache_stats()
+        self.assertEqual(new_stats['hits'], stats['hits'] + 1)
+        self.assertEqual(new_stats['misses'], stats['misses'] + 1)
+        self.assertGreater(new_stats['hit_ratio'], 0)
+
     def test_estimate_tx_for_all_tokent(self):
         safe_address = self.deploy_test_safe().safe_address
         to = Account.create().address
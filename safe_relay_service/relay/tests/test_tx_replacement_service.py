@@ -0,0 +1,60 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from eth_account import Account
+from web3 import Web3
+
+from ..models import EthereumTx, SafeMultisigTx
+from ..services.tx_replacement_service import TxReplacementService
+from .factories import EthereumTxFactory, SafeMultisigTxFactory
+from .relay_test_case import RelayTestCaseMixin
+
+
+class TestTxReplacementService(RelayTestCaseMixin, TestCase):
+    def setUp(self):
+        self.account = Account.create()
+        self.send_ether(self.account.address, Web3.toWei(0.01, 'ether'))
+        self.gas_station = mock.MagicMock()
+        self.gas_station.get_gas_prices.return_value.fast = Web3.toWei(2, 'gwei')
+        self.tx_replacement_service = TxReplacementService(self.gas_station, self.ethereum_client,
+                                                           [self.account], 60)
+
+    def create_stuck_tx(self, nonce: int = 0) -> EthereumTx:
+        ethereum_tx = EthereumTxFactory(block=None, _from=self.account.address, nonce=nonce, gas=21000,
+                                        gas_price=Web3.toWei(1, 'gwei'), data=b'', value=0)
+        EthereumTx.objects.filter(pk=ethereum_tx.pk).update(created=timezone.now() - timedelta(minutes=2))
+        return ethereum_tx
+
+    def test_get_max_gas_price(self):
+        self.assertEqual(self.tx_replacement_service.get_max_gas_price(10, None), 10)
+        self.assertEqual(self.tx_replacement_service.get_max_gas_price(10, Account.create().address), 0)
+
+    def test_replace_stuck_multisig_txs(self):
+        ethereum_tx = self.create_stuck_tx()
+        safe_multisig_tx = SafeMultisigTxFactory(ethereum_tx=ethereum_tx, gas_token=None,
+                                                 gas_price=Web3.toWei(10, 'gwei'))
+        # Errors connecting to the node don't stop the replacements
+        with mock.patch.object(self.ethereum_client, 'send_unsigned_transaction', side_effect=IOError):
+            self.assertEqual(self.tx_replacement_service.replace_stuck_multisig_txs(), 0)
+        # Max gas price refunded by the Safe is too low for a replacement
+        SafeMultisigTxFactory(ethereum_tx=self.create_stuck_tx(nonce=1), gas_token=None,
+                              gas_price=Web3.toWei(1, 'gwei'))
+
+        self.assertEqual(self.tx_replacement_service.replace_stuck_multisig_txs(), 1)
+        ethereum_tx.refresh_from_db()
+        safe_multisig_tx.refresh_from_db()
+        replacement_tx = ethereum_tx.replaced_by
+        self.assertEqual(safe_multisig_tx.ethereum_tx, replacement_tx)
+        self.assertEqual(replacement_tx.nonce, ethereum_tx.nonce)
+        self.assertEqual(replacement_tx.gas_price, Web3.toWei(2, 'gwei'))
+        self.assertEqual(self.tx_replacement_service.get_replaced_txs(replacement_tx), [replacement_tx, ethereum_tx])
+
+        # Replacement is mined, so it's not replaced again
+        EthereumTx.objects.filter(pk=replacement_tx.pk).update(created=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(self.tx_replacement_service.replace_stuck_multisig_txs(), 0)
+        replacement_tx.refresh_from_db()
+        self.assertIsNotNone(replacement_tx.block)
+        self.assertEqual(SafeMultisigTx.objects.pending().count(), 1)
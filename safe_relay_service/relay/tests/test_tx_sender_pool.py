@@ -0,0 +1,40 @@
+from django.test import TestCase
+
+from eth_account import Account
+
+from ..services.tx_sender_pool import TxSenderPool
+from .relay_test_case import RelayTestCaseMixin
+
+
+class TestTxSenderPool(RelayTestCaseMixin, TestCase):
+    def test_tx_sender_pool(self):
+        accounts = [Account.create() for _ in range(3)]
+        tx_sender_pool = TxSenderPool(self.ethereum_client, self.transaction_service.redis,
+                                      [account.privateKey for account in accounts + accounts[:1]])
+        self.assertEqual(tx_sender_pool.addresses, [account.address for account in accounts])
+        self.assertEqual(tx_sender_pool.get_pending_txs(), {account.address: 0 for account in accounts})
+
+        # Accounts in use are not selected
+        with tx_sender_pool.acquire() as account_1:
+            with tx_sender_pool.acquire() as account_2:
+                self.assertNotEqual(account_1.address, account_2.address)
+                self.assertNotIn(tx_sender_pool.select_account().address, (account_1.address, account_2.address))
+                self.assertEqual(tx_sender_pool.get_in_flight_txs()[account_1.address], 1)
+        self.assertEqual(tx_sender_pool.get_in_flight_txs(), {account.address: 0 for account in accounts})
+
+        # Acquisitions not released expire
+        tx_sender_pool.in_flight_timeout = -1
+        with tx_sender_pool.acquire():
+            self.assertEqual(tx_sender_pool.get_in_flight_txs(), {account.address: 0 for account in accounts})
+        tx_sender_pool.in_flight_timeout = 60
+
+        # Disabled accounts are not selected, unless every account is disabled
+        for account in accounts[:2]:
+            tx_sender_pool.set_disabled(account.address, True)
+        self.assertEqual(tx_sender_pool.select_account().address, accounts[2].address)
+        tx_sender_pool.set_disabled(accounts[2].address, True)
+        self.assertIn(tx_sender_pool.select_account().address, tx_sender_pool.addresses)
+
+        for account in accounts:
+            tx_sender_pool.set_disabled(account.address, False)
+        self.assertEqual(tx_sender_pool.get_disabled_addresses(), [])
@@ -1,6 +1,8 @@
 import datetime
 import logging
+import uuid
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import dateparse, timezone
@@ -19,11 +21,13 @@ from gnosis.safe.signatures import signatures_to_bytes
 from gnosis.safe.tests.utils import generate_valid_s
 
 from safe_relay_service.gas_station.tests.factories import GasPriceFactory
+from safe_relay_service.gas_station.views import gas_price_snapshot_provider
 from safe_relay_service.tokens.tests.factories import TokenFactory
 
 from ..models import SafeContract, SafeCreation, SafeMultisigTx
 from ..serializers import SafeCreationSerializer
 from ..services.safe_creation_service import SafeCreationServiceProvider
+from ..tasks import process_multisig_tx_request_task
 from .factories import (EthereumEventFactory, EthereumTxFactory,
                         InternalTxFactory, SafeContractFactory,
                         SafeCreation2Factory, SafeFundingFactory,
@@ -41,8 +45,20 @@ class TestViews(RelayTestCaseMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_gas_station(self):
+        gas_price_snapshot_provider.clear()
         response = self.client.get(reverse('v1:gas-station'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('standard', response.json())
+        etag = response['ETag']
+        self.assertTrue(etag)
+
+        response = self.client.get(reverse('v1:gas-station'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+        response = self.client.get(reverse('v1:gas-station'), HTTP_IF_NONE_MATCH='"another-etag"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_gas_station_history(self):
         response = self.client.get(reverse('v1:gas-station-history'), format='json')
@@ -70,6 +86,67 @@ class TestViews(RelayTestCaseMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 2)
 
+    def test_gas_station_history_bucket(self):
+        response = self.client.get(reverse('v1:gas-station-history') + '?bucket=2m', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        now = datetime.datetime(2019, 10, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        gas_prices = [GasPriceFactory(created=now - datetime.timedelta(hours=hours, minutes=minutes), standard=standard)
+                      for hours, minutes, standard in ((13, 0, 100), (3, 1, 10), (3, 2, 20), (3, 3, 60), (2, 0, 50))]
+        params = {'fromDate': (now - datetime.timedelta(days=1)).isoformat(), 'toDate': now.isoformat()}
+        response = self.client.get(reverse('v1:gas-station-history'), data=dict(params, bucket='1h'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        first_bucket, second_bucket, third_bucket = response.data['results']
+        self.assertEqual(dateparse.parse_datetime(first_bucket['bucket']),
+                         datetime.datetime(2019, 9, 30, 23, tzinfo=datetime.timezone.utc))
+        self.assertEqual(first_bucket['standard_avg'], '100')
+        self.assertEqual(dateparse.parse_datetime(second_bucket['bucket']),
+                         datetime.datetime(2019, 10, 1, 9, tzinfo=datetime.timezone.utc))
+        self.assertEqual(second_bucket['standard_min'], '10')
+        self.assertEqual(second_bucket['standard_avg'], '30')
+        self.assertEqual(second_bucket['standard_max'], '60')
+        self.assertEqual(dateparse.parse_datetime(third_bucket['bucket']),
+                         datetime.datetime(2019, 10, 1, 10, tzinfo=datetime.timezone.utc))
+        self.assertEqual(third_bucket['standard_avg'], '50')
+        self.assertEqual(third_bucket['fastest_max'], str(gas_prices[-1].fastest))
+
+        response = self.client.get(reverse('v1:gas-station-history'), data=dict(params, bucket='1d'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        first_bucket, second_bucket = response.data['results']
+        self.assertEqual(dateparse.parse_datetime(first_bucket['bucket']),
+                         datetime.datetime(2019, 9, 30, tzinfo=datetime.timezone.utc))
+        self.assertEqual(first_bucket['standard_min'], '100')
+        self.assertEqual(first_bucket['standard_avg'], '100')
+        self.assertEqual(first_bucket['standard_max'], '100')
+        self.assertEqual(dateparse.parse_datetime(second_bucket['bucket']),
+                         datetime.datetime(2019, 10, 1, tzinfo=datetime.timezone.utc))
+        self.assertEqual(second_bucket['standard_min'], '10')
+        self.assertEqual(second_bucket['standard_avg'], '35')
+        self.assertEqual(second_bucket['standard_max'], '60')
+        self.assertEqual(second_bucket['fastest_max'], str(max(gas_price.fastest for gas_price in gas_prices[1:])))
+
+    def test_gas_station_history_bucket_retention(self):
+        url = reverse('v1:gas-station-history')
+        GasPriceFactory()
+        response = self.client.get(url, data={'bucket': '5m'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+        # Raw gas prices older than the retention were deleted, so 5m buckets are not available
+        from_date = timezone.now() - datetime.timedelta(days=settings.GAS_STATION_RAW_RETENTION_DAYS + 1)
+        response = self.client.get(url, data={'bucket': '5m', 'fromDate': from_date.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, data={'bucket': '1h', 'fromDate': from_date.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_stats(self):
+        response = self.client.get(reverse('v1:stats'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('safes_created', response.data)
+        self.assertEqual(set(response.data['estimate_cache']), {'hits', 'misses', 'hit_ratio'})
+
     def test_safe_balances(self):
         safe_address = Account.create().address
         response = self.client.get(reverse('v1:safe-balances', args=(safe_address, )))
@@ -407,6 +484,75 @@ class TestViews(RelayTestCaseMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
         self.assertTrue('exists' in response.data['exception'])
 
+    def test_safe_multisig_tx_post_async(self):
+        w3 = self.ethereum_client.w3
+        safe_balance = w3.toWei(0.01, 'ether')
+        accounts = [self.create_account(), self.create_account()]
+        accounts.sort(key=lambda account: account.address.lower())
+        owners = [x.address for x in accounts]
+        safe_creation = self.deploy_test_safe(owners=owners, threshold=len(owners), initial_funding_wei=safe_balance)
+        my_safe_address = safe_creation.safe_address
+        SafeContractFactory(address=my_safe_address)
+
+        to, _ = get_eth_address_with_key()
+        value = safe_balance // 2
+        response = self.client.post(reverse('v1:safe-multisig-tx-estimate', args=(my_safe_address,)),
+                                    data={'to': to, 'value': value, 'data': None, 'operation': 0}, format='json')
+        estimation_json = response.json()
+        nonce = 0
+        safe_tx_gas = estimation_json['safeTxGas'] + estimation_json['operationalGas']
+        multisig_tx_hash = SafeTx(None, my_safe_address, to, value, None, 0, safe_tx_gas, estimation_json['dataGas'],
+                                  estimation_json['gasPrice'], estimation_json['gasToken'], None,
+                                  safe_nonce=nonce).safe_tx_hash
+        signatures = [account.signHash(multisig_tx_hash) for account in accounts]
+        data = {
+            "to": to,
+            "value": value,
+            "data": None,
+            "operation": 0,
+            "safe_tx_gas": safe_tx_gas,
+            "data_gas": estimation_json['dataGas'],
+            "gas_price": estimation_json['gasPrice'],
+            "gas_token": estimation_json['gasToken'],
+            "nonce": nonce,
+            "signatures": [{'v': s['v'], 'r': s['r'], 's': s['s']} for s in signatures]
+        }
+
+        # Signatures not sorted are rejected without queueing the tx
+        response = self.client.post(reverse('v1:safe-multisig-txs', args=(my_safe_address,)),
+                                    data=dict(data, signatures=list(reversed(data['signatures']))),
+                                    format='json', HTTP_PREFER='respond-async')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        response = self.client.post(reverse('v1:safe-multisig-txs', args=(my_safe_address,)),
+                                    data=data, format='json', HTTP_PREFER='respond-async')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'QUEUED')
+        request_id = response.data['id']
+        status_url = reverse('v1:safe-multisig-tx-request', args=(my_safe_address, request_id))
+        self.assertEqual(response['Location'], status_url)
+
+        # Nonce is already queued
+        response = self.client.post(reverse('v1:safe-multisig-txs', args=(my_safe_address,)),
+                                    data=data, format='json', HTTP_PREFER='respond-async')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        response = self.client.post(reverse('v1:safe-multisig-txs', args=(my_safe_address,)),
+                                    data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertIn('exists', response.data['exception'])
+
+        self.assertEqual(process_multisig_tx_request_task(request_id), 'SENT')
+        self.assertIsNone(process_multisig_tx_request_task(request_id))  # Not processed again
+        response = self.client.get(status_url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'SENT')
+        tx_hash = response.json()['txHash'][2:]  # Remove leading 0x
+        self.assertEqual(SafeMultisigTx.objects.get(ethereum_tx__tx_hash=tx_hash).nonce, nonce)
+
+        response = self.client.get(reverse('v1:safe-multisig-tx-request', args=(my_safe_address, uuid.uuid4())),
+                                   format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_safe_multisig_tx_get(self):
         safe = SafeContractFactory()
         my_safe_address = safe.address
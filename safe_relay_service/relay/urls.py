@@ -25,6 +25,8 @@ urlpatterns = [
     path('safes/<str:address>/balances/', views.SafeBalanceView.as_view(), name='safe-balances'),
     path('safes/<str:address>/funded/', views.SafeSignalView.as_view(), name='safe-signal'),
     path('safes/<str:address>/transactions/', views.SafeMultisigTxView.as_view(), name='safe-multisig-txs'),
+    path('safes/<str:address>/transactions/requests/<uuid:request_id>/', views.SafeMultisigTxRequestView.as_view(),
+         name='safe-multisig-tx-request'),
     path('safes/<str:address>/erc20-transactions/', views.ERC20View.as_view(), name='erc20-txs'),
     path('safes/<str:address>/erc721-transactions/', views.ERC721View.as_view(), name='erc721-txs'),
     path('safes/<str:address>/internal-transactions/', views.InternalTxsView.as_view(), name='internal-txs'),
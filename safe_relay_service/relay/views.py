@@ -1,7 +1,9 @@
 import logging
 
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
+from django.urls import reverse
 from django.utils.dateparse import parse_datetime
 
 from django_filters.rest_framework import DjangoFilterBackend
@@ -25,14 +27,15 @@ from safe_relay_service.version import __version__
 
 from .filters import DefaultPagination, SafeMultisigTxFilter
 from .models import (EthereumEvent, EthereumTx, InternalTx, SafeContract,
-                     SafeFunding, SafeMultisigTx)
+                     SafeFunding, SafeMultisigTx, SafeMultisigTxRequest)
 from .serializers import (
     ERC20Serializer, ERC721Serializer, EthereumTxWithInternalTxsSerializer,
     InternalTxWithEthereumTxSerializer, SafeBalanceResponseSerializer,
     SafeContractSerializer, SafeCreationEstimateResponseSerializer,
     SafeCreationEstimateSerializer, SafeCreationResponseSerializer,
     SafeCreationSerializer, SafeFundingResponseSerializer,
-    SafeMultisigEstimateTxResponseSerializer, SafeMultisigTxResponseSerializer,
+    SafeMultisigEstimateTxResponseSerializer,
+    SafeMultisigTxRequestResponseSerializer, SafeMultisigTxResponseSerializer,
     SafeRelayMultisigTxSerializer, SafeResponseSerializer,
     TransactionEstimationWithNonceAndGasTokensResponseSerializer)
 from .services import StatsServiceProvider
@@ -42,7 +45,7 @@ from .services.safe_creation_service import (SafeCreationServiceException,
 from .services.transaction_service import (SafeMultisigTxExists,
                                            TransactionServiceException,
                                            TransactionServiceProvider)
-from .tasks import fund_deployer_task
+from .tasks import fund_deployer_task, process_multisig_tx_request_task
 
 logger = logging.getLogger(__name__)
 
@@ -375,12 +378,17 @@ class SafeMultisigTxView(SafeListApiView):
         return SafeMultisigTx.objects.filter(safe=self.kwargs['address'])
 
     @swagger_auto_schema(responses={201: SafeMultisigTxResponseSerializer(),
+                                    202: SafeMultisigTxRequestResponseSerializer(),
                                     400: 'Data not valid',
                                     404: 'Safe not found',
-                                    422: 'Safe address checksum not valid/Tx not valid'})
+                                    422: 'Safe address checksum not valid/Tx not valid'},
+                         manual_parameters=[openapi.Parameter('Prefer', openapi.IN_HEADER, type=openapi.TYPE_STRING,
+                                                              description="If `respond-async`, tx is validated and "
+                                                                          "sent in background")])
     def post(self, request, address, format=None):
         """
-        Send a Safe Multisig Transaction
+        Send a Safe Multisig Transaction. With `Prefer: respond-async` header only basic checks are done, tx is
+        queued and `202 Accepted` is returned. Status of the tx can be checked using the `Location` returned
         """
         if not Web3.isChecksumAddress(address):
             return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY)
@@ -397,6 +405,8 @@ class SafeMultisigTxView(SafeListApiView):
                 return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
             else:
                 data = serializer.validated_data
+                if 'respond-async' in request.META.get('HTTP_PREFER', ''):
+                    return self._queue(data)
                 safe_multisig_tx = TransactionServiceProvider().create_multisig_tx(
                     safe_address=data['safe'],
                     to=data['to'],
@@ -414,6 +424,46 @@ class SafeMultisigTxView(SafeListApiView):
                 response_serializer = SafeMultisigTxResponseSerializer(safe_multisig_tx)
                 return Response(status=status.HTTP_201_CREATED, data=response_serializer.data)
 
+    def _queue(self, data) -> Response:
+        multisig_tx_request = TransactionServiceProvider().queue_multisig_tx(
+            safe_address=data['safe'],
+            to=data['to'],
+            value=data['value'],
+            data=data['data'],
+            operation=data['operation'],
+            safe_tx_gas=data['safe_tx_gas'],
+            base_gas=data['data_gas'],
+            gas_price=data['gas_price'],
+            gas_token=data['gas_token'],
+            nonce=data['nonce'],
+            refund_receiver=data['refund_receiver'],
+            signatures=data['signatures']
+        )
+        request_id = str(multisig_tx_request.id)
+        transaction.on_commit(lambda: process_multisig_tx_request_task.delay(request_id))
+        response_serializer = SafeMultisigTxRequestResponseSerializer(multisig_tx_request)
+        location = reverse('v1:safe-multisig-tx-request', args=(data['safe'], request_id))
+        return Response(status=status.HTTP_202_ACCEPTED, data=response_serializer.data,
+                        headers={'Location': location})
+
+
+class SafeMultisigTxRequestView(APIView):
+    serializer_class = SafeMultisigTxRequestResponseSerializer
+
+    @swagger_auto_schema(responses={200: SafeMultisigTxRequestResponseSerializer(),
+                                    404: 'Safe Multisig Tx request not found'})
+    def get(self, request, address, request_id, format=None):
+        """
+        Get status of a Safe Multisig Transaction sent with `Prefer: respond-async`
+        """
+        try:
+            multisig_tx_request = SafeMultisigTxRequest.objects.select_related('multisig_tx').get(
+                safe=address, id=request_id)
+        except SafeMultisigTxRequest.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_200_OK,
+                        data=SafeMultisigTxRequestResponseSerializer(multisig_tx_request).data)
+
 
 class EthereumTxView(SafeListApiView):
     ordering = ('-block__number',)
@@ -471,13 +521,15 @@ class StatsView(APIView):
     ])
     def get(self, request, format=None):
         """
-        Get stats of the Safe Relay Service
+        Get stats of the Safe Relay Service. `estimate_cache` hits and misses are not filtered by date
         """
         from_date = self.request.query_params.get('fromDate')
         to_date = self.request.query_params.get('toDate')
         from_date = parse_datetime(from_date) if from_date else from_date
         to_date = parse_datetime(to_date) if to_date else to_date
-        return Response(status=status.HTTP_200_OK, data=StatsServiceProvider().get_relay_stats(from_date, to_date))
+        stats = StatsServiceProvider().get_relay_stats(from_date, to_date)
+        stats['estimate_cache'] = TransactionServiceProvider().get_estimate_cache_stats()
+        return Response(status=status.HTTP_200_OK, data=stats)
 
 
 class StatsHistoryView(APIView):
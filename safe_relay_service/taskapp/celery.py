@@ -4,7 +4,7 @@ from django.apps import AppConfig, apps
 from django.conf import settings
 
 from celery import Celery
-from celery.signals import setup_logging
+from celery.signals import setup_logging, worker_process_init
 
 if not settings.configured:
     # set the default Django settings module for the 'celery' program.
@@ -23,6 +23,13 @@ class CeleryConfig(AppConfig):
     def on_celery_setup_logging(**kwargs):
         pass
 
+    # Build services in every worker process after forking, so connections are not shared between processes
+    @worker_process_init.connect
+    def on_worker_process_init(**kwargs):
+        if settings.PROVIDERS_WARMUP:
+            from safe_relay_service.utils.providers import warmup_providers
+            warmup_providers()
+
     def ready(self):
         # Using a string here means the worker will not have to
         # pickle the object when using Windows.
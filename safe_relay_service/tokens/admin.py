@@ -1,14 +1,36 @@
 from django.contrib import admin
 
-from .models import PriceOracle, PriceOracleTicker, Token
-from .price_oracles import CannotGetTokenPriceFromApi
+from .models import PriceOracle, PriceOracleTicker, Token, TokenPrice
+from .price_cache import price_cache
+from .price_oracles import CannotGetTokenPriceFromApi, get_price_oracle
 
 
 @admin.register(PriceOracle)
 class PriceOracleAdmin(admin.ModelAdmin):
-    list_display = ('name', )
+    list_display = ('name', 'circuit_state', 'error_rate', 'latency', 'last_error', 'price_cache_metrics')
     ordering = ('name',)
 
+    def _get_health(self, obj: PriceOracle):
+        try:
+            return get_price_oracle(obj.name).circuit_breaker.get_health()
+        except NotImplementedError:
+            return {}
+
+    def circuit_state(self, obj: PriceOracle):
+        return self._get_health(obj).get('state')
+
+    def error_rate(self, obj: PriceOracle):
+        return self._get_health(obj).get('error_rate')
+
+    def latency(self, obj: PriceOracle):
+        return self._get_health(obj).get('latency')
+
+    def last_error(self, obj: PriceOracle):
+        return self._get_health(obj).get('last_error')
+
+    def price_cache_metrics(self, obj: PriceOracle):
+        return price_cache.get_shared_metrics(obj.name.lower())
+
 
 @admin.register(PriceOracleTicker)
 class PriceOracleTickerAdmin(admin.ModelAdmin):
@@ -41,3 +63,14 @@ class TokenAdmin(admin.ModelAdmin):
     def price_oracle_ticker_pairs(self, obj: Token):
         return [(price_oracle_ticker.price_oracle.name, price_oracle_ticker.ticker) for price_oracle_ticker
                 in obj.price_oracle_tickers.all()]
+
+
+@admin.register(TokenPrice)
+class TokenPriceAdmin(admin.ModelAdmin):
+    list_display = ('token_symbol', 'token_id', 'eth_value', 'sources', 'modified')
+    list_select_related = ('token',)
+    ordering = ('-modified',)
+    search_fields = ['token__symbol', '=token__address']
+
+    def token_symbol(self, obj):
+        return obj.token.symbol
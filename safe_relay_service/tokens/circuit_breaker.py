@@ -0,0 +1,95 @@
+import time
+from logging import getLogger
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache
+
+logger = getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a price oracle, shared between workers using the Django cache (Redis). After
+    `failure_threshold` consecutive failures the circuit is opened and requests to the oracle are skipped. After
+    `open_seconds` one worker is allowed to probe the oracle (half open), closing the circuit again if it works.
+    Error rate and latency are tracked using an exponentially weighted moving average
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, open_seconds: int = 30, ewma_alpha: float = 0.2):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.ewma_alpha = ewma_alpha
+
+    def _get_cache_key(self) -> str:
+        return 'circuit-breaker:%s' % self.name
+
+    def _get_probe_lock_key(self) -> str:
+        return 'circuit-breaker-probe:%s' % self.name
+
+    def _store_health(self, health: Dict[str, Any]):
+        # Race conditions between workers updating the health are tolerated, it's only a heuristic
+        cache.set(self._get_cache_key(), health, None)
+
+    def _ewma(self, previous: Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return self.ewma_alpha * value + (1 - self.ewma_alpha) * previous
+
+    def get_health(self) -> Dict[str, Any]:
+        """
+        :return: Dictionary with `state`, consecutive `failures`, `error_rate`, `latency` (seconds), `opened_at`
+        (timestamp) and `last_error`
+        """
+        return cache.get(self._get_cache_key()) or {
+            'state': self.CLOSED,
+            'failures': 0,
+            'error_rate': 0.,
+            'latency': None,
+            'opened_at': None,
+            'last_error': None,
+        }
+
+    def is_open(self) -> bool:
+        """
+        :return: `True` if requests to the oracle must be skipped
+        """
+        return self.get_health()['state'] != self.CLOSED
+
+    def should_probe(self) -> bool:
+        """
+        :return: `True` if caller must probe the oracle. Only one caller is allowed to probe every `open_seconds`
+        """
+        health = self.get_health()
+        if health['state'] == self.CLOSED:
+            return False
+        if health['state'] == self.OPEN and time.time() - health['opened_at'] < self.open_seconds:
+            return False
+        if not cache.add(self._get_probe_lock_key(), True, self.open_seconds):
+            return False
+        health['state'] = self.HALF_OPEN
+        self._store_health(health)
+        return True
+
+    def record_success(self, latency: float):
+        health = self.get_health()
+        if health['state'] != self.CLOSED:
+            logger.info('Closing circuit for price oracle %s', self.name)
+        health.update(state=self.CLOSED, failures=0, error_rate=self._ewma(health['error_rate'], 0.),
+                      latency=self._ewma(health['latency'], latency), opened_at=None)
+        self._store_health(health)
+
+    def record_failure(self, latency: float, error: str):
+        health = self.get_health()
+        failures = health['failures'] + 1
+        health.update(failures=failures, error_rate=self._ewma(health['error_rate'], 1.),
+                      latency=self._ewma(health['latency'], latency), last_error=error)
+        if health['state'] == self.HALF_OPEN or (health['state'] == self.CLOSED
+                                                 and failures >= self.failure_threshold):
+            logger.warning('Opening circuit for price oracle %s after %d failures, last error: %s',
+                           self.name, failures, error)
+            health.update(state=self.OPEN, opened_at=time.time())
+        self._store_health(health)
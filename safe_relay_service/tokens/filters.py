@@ -1,4 +1,7 @@
+from django.db.models import Q
+
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
 from .models import Token
 
@@ -15,3 +18,19 @@ class TokenFilter(filters.FilterSet):
             'gas': ['exact'],
             'decimals': ['lt', 'gt', 'exact'],
         }
+
+
+class TokenSearchFilter(SearchFilter):
+    """
+    Search tokens by `name` or `symbol`. `ilike_contains` is used instead of `icontains`, so the trigram indexes
+    are used, and names similar to long enough terms are also returned (e.g. `etherium` will find `Ethereum`)
+    """
+    min_similarity_length = 4
+
+    def filter_queryset(self, request, queryset, view):
+        for search_term in self.get_search_terms(request):
+            query = Q(name__ilike_contains=search_term) | Q(symbol__ilike_contains=search_term)
+            if len(search_term) >= self.min_similarity_length:
+                query |= Q(name__trigram_similar=search_term)
+            queryset = queryset.filter(query)
+        return queryset
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from logging import getLogger
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from redis import Redis, RedisError
+
+from .models import Token
+
+logger = getLogger(__name__)
+
+
+class GasTokenRegistry:
+    """
+    Process local registry of the gas tokens (with their price oracle tickers), so requests don't need to query the
+    database for them. When a token is modified every process is notified using Redis pub/sub. As pub/sub messages
+    can be lost, tokens are reloaded anyway every `ttl` seconds
+    """
+    channel = 'gas-tokens:invalidate'
+
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = 60):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._tokens: Optional[Dict[str, Token]] = None
+        self._loaded_at = 0.
+        self._subscriber_pid: Optional[int] = None
+        self._redis: Optional[Redis] = None
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = Redis.from_url(self.redis_url or settings.REDIS_URL)
+        return self._redis
+
+    def _load(self) -> Dict[str, Token]:
+        tokens = Token.objects.gas_tokens().prefetch_related('price_oracle_tickers__price_oracle')
+        return {token.address: token for token in tokens}
+
+    def _subscribe(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for _ in pubsub.listen():
+                    self.invalidate()
+            except RedisError:
+                logger.warning('Cannot listen for gas token changes, retrying', exc_info=True)
+                time.sleep(5)
+
+    def _start_subscriber(self):
+        # Threads are not copied when forking, subscriber must be started for every process
+        if self._subscriber_pid != os.getpid():
+            self._subscriber_pid = os.getpid()
+            threading.Thread(target=self._subscribe, name='gas-token-registry', daemon=True).start()
+
+    def get_tokens(self) -> Dict[str, Token]:
+        """
+        :return: Dictionary of `address -> Token` for the gas tokens
+        """
+        tokens = self._tokens
+        if tokens is None or time.time() - self._loaded_at > self.ttl:
+            with self.lock:
+                self._start_subscriber()
+                tokens = self._load()
+                self._tokens, self._loaded_at = tokens, time.time()
+        return tokens
+
+    def get(self, address: str) -> Optional[Token]:
+        """
+        :return: Gas token for the address, `None` if not found
+        """
+        return self.get_tokens().get(address)
+
+    def gas_tokens(self) -> List[Token]:
+        return list(self.get_tokens().values())
+
+    def invalidate(self):
+        """
+        Invalidates the tokens of this process
+        """
+        self._tokens = None
+
+    def publish_invalidation(self):
+        """
+        Invalidates the tokens of every process
+        """
+        self.invalidate()
+        try:
+            self.redis.publish(self.channel, 'invalidate')
+        except RedisError:
+            logger.warning('Cannot notify gas token changes to other processes', exc_info=True)
+
+
+gas_token_registry = GasTokenRegistry()
@@ -0,0 +1,15 @@
+from django.db.models.lookups import IContains
+
+
+class ILikeContains(IContains):
+    """
+    Case insensitive `contains` using PostgreSQL `ILIKE`. Django `icontains` builds `UPPER("column"::text) LIKE
+    UPPER(%s)`, which cannot use the trigram indexes on the column, `"column" ILIKE %s` can
+    """
+    lookup_name = 'ilike_contains'
+
+    def as_sql(self, compiler, connection):
+        lhs_sql, params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        params.extend(rhs_params)
+        return '%s ILIKE %s' % (lhs_sql, rhs_sql), params
@@ -1,4 +1,5 @@
 import os
+from typing import Any, Dict, List
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
@@ -7,6 +8,7 @@ from ethereum.utils import checksum_encode
 
 from ...models import Token
 from ...token_repository import TokenRepository
+from ...views import TokensView
 
 
 class Command(BaseCommand):
@@ -18,40 +20,59 @@ class Command(BaseCommand):
         parser.add_argument('--download-icons', help='Download icons', action='store_true')
         parser.add_argument('--download-folder', help='Download folder. It implies --download')
         parser.add_argument('--store-db', help='Store tokens in db', action='store_true')
+        parser.add_argument('--workers', help='Number of concurrent requests', type=int, default=10)
+        parser.add_argument('--cache-file', help='File to store ETags of the token info, so it is not downloaded '
+                                                 'again if not modified. Not used if not provided. It should not be '
+                                                 'on a public folder')
 
     def handle(self, *args, **options):
         pages = options['pages'] or 3
         download = options['download_icons'] or options['download_folder']
         download_folder = options['download_folder'] or os.path.join(settings.STATIC_ROOT, 'tokens')
         store_db = options['store_db']
-        token_repository = TokenRepository()
+        token_repository = TokenRepository(max_workers=options['workers'], cache_file=options['cache_file'])
         tokens = token_repository.get_tokens(pages=pages)
         self.stdout.write(self.style.SUCCESS(str(tokens)))
         if store_db:
-            for i, token in enumerate(tokens):
-                symbol = token['symbol']
-                relevance = 0 if symbol == 'GNO' else i + 1
-                token_db, created = Token.objects.get_or_create(
-                    address=checksum_encode(token['address']),
-                    defaults={
-                        'name': token['name'],
-                        'symbol': symbol,
-                        'description': token['description'],
-                        'decimals': token['decimals'],
-                        'logo_uri': token['logo_url'] if token['logo_url'] else '',
-                        'website_uri': token['website_url'],
-                        'gas': False,
-                        'relevance': relevance
-                    }
-                )
-                if token_db.relevance != relevance:
-                    token_db.relevance = relevance
-                    token_db.save(update_fields=['relevance'])
-                    self.stdout.write(self.style.SUCCESS('%s changed relevance to %d' % (token['name'], relevance)))
-
-                if created:
-                    self.stdout.write(self.style.SUCCESS('Inserted new token %s' % token['name']))
+            self.store_tokens(tokens)
 
         if download:
             token_repository.download_images_for_tokens(folder=download_folder,
                                                         token_addresses=[token['address'] for token in tokens])
+
+    def store_tokens(self, tokens: List[Dict[str, Any]]):
+        """
+        Inserts new tokens and updates relevance of the existing ones using bulk queries
+        """
+        tokens_db = Token.objects.in_bulk([checksum_encode(token['address']) for token in tokens])
+        tokens_to_create = {}
+        tokens_to_update = []
+        for i, token in enumerate(tokens):
+            address = checksum_encode(token['address'])
+            symbol = token['symbol']
+            relevance = 0 if symbol == 'GNO' else i + 1
+            token_db = tokens_db.get(address)
+            if token_db is None:
+                tokens_to_create[address] = Token(address=address,
+                                                  name=token['name'],
+                                                  symbol=symbol,
+                                                  description=token['description'],
+                                                  decimals=token['decimals'],
+                                                  logo_uri=token['logo_url'] if token['logo_url'] else '',
+                                                  website_uri=token['website_url'],
+                                                  gas=False,
+                                                  relevance=relevance)
+            elif token_db.relevance != relevance:
+                token_db.relevance = relevance
+                tokens_to_update.append(token_db)
+                self.stdout.write(self.style.SUCCESS('%s changed relevance to %d' % (token['name'], relevance)))
+
+        # Same token can appear more than once
+        Token.objects.bulk_create(tokens_to_create.values(), ignore_conflicts=True)
+        Token.objects.bulk_update(tokens_to_update, ['relevance'])
+        self.stdout.write(self.style.SUCCESS('Created %d tokens, updated %d tokens' % (len(tokens_to_create),
+                                                                                       len(tokens_to_update))))
+
+        # Signals are not sent for bulk operations
+        if tokens_to_create or tokens_to_update:
+            TokensView.invalidate_cache()
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.6 on 2026-10-18 12:05
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tokens', '0011_auto_20190225_1646'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenPrice',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('token', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='token_price', serialize=False, to='tokens.Token')),
+                ('eth_value', models.FloatField()),
+                ('sources', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), size=None)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.6 on 2026-10-18 12:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tokens', '0012_tokenprice'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='token',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='token_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='token',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['symbol'], name='token_symbol_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='token',
+            index=models.Index(fields=['relevance', 'name'], name='token_relevance_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='token',
+            index=models.Index(fields=['name'], name='token_name_idx'),
+        ),
+    ]
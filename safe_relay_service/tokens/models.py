@@ -1,18 +1,33 @@
 import logging
 import math
-from typing import Optional
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.core.cache import cache
 from django.db import models
 
+from model_utils.models import TimeStampedModel
+
 from gnosis.eth.django.models import EthereumAddressField
 
+from .lookups import ILikeContains
 from .price_oracles import (CannotGetTokenPriceFromApi, ExchangeApiException,
                             get_price_oracle)
 
 logger = logging.getLogger(__name__)
 
+models.CharField.register_lookup(ILikeContains)
+
+# Shared by every request, so threads are not created for every price lookup
+price_oracles_executor = ThreadPoolExecutor(max_workers=settings.PRICE_ORACLES_MAX_WORKERS,
+                                            thread_name_prefix='price-oracles')
+
 
 class PriceOracle(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -30,15 +45,24 @@ class PriceOracleTicker(models.Model):
     def __str__(self):
         return '%s - %s - %s - Inverse %s' % (self.price_oracle.name, self.token.symbol, self.ticker, self.inverse)
 
-    def _price(self) -> Optional[float]:
+    @staticmethod
+    def get_ticker_price(price_oracle_name: str, ticker: str, inverse: bool) -> Optional[float]:
+        """
+        Doesn't use the database, so it can be called from other threads
+        :return: Price of the ticker, `None` if price oracle failed
+        """
         try:
-            price = get_price_oracle(self.price_oracle.name).get_price(self.ticker)
-            if price and self.inverse:  # Avoid 1 / 0
+            price_oracle = get_price_oracle(price_oracle_name, timeout=settings.PRICE_ORACLES_REQUEST_TIMEOUT)
+            price = price_oracle.get_price(ticker)
+            if price and inverse:  # Avoid 1 / 0
                 price = 1 / price
         except ExchangeApiException:
-            logger.warning('Cannot get price for %s - %s', self.price_oracle.name, self.ticker, exc_info=True)
+            logger.warning('Cannot get price for %s - %s', price_oracle_name, ticker, exc_info=True)
             price = None
         return price
+
+    def _price(self) -> Optional[float]:
+        return self.get_ticker_price(self.price_oracle.name, self.ticker, self.inverse)
     price = property(_price)
 
 
@@ -61,40 +85,99 @@ class Token(models.Model):
     fixed_eth_conversion = models.DecimalField(null=True, default=None, blank=True, max_digits=25, decimal_places=15)
     relevance = models.PositiveIntegerField(default=100)
 
+    class Meta:
+        indexes = [
+            # Trigram indexes are used for `ilike_contains` and `trigram_similar` searches. Django `icontains`
+            # cannot use them, as it's translated to `UPPER("name"::text) LIKE UPPER(...)`
+            GinIndex(fields=['name'], name='token_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['symbol'], name='token_symbol_trgm_idx', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['relevance', 'name'], name='token_relevance_name_idx'),
+            models.Index(fields=['name'], name='token_name_idx'),
+        ]
+
     def __str__(self):
         return '%s - %s' % (self.name, self.address)
 
     def get_eth_value(self) -> float:
+        """
+        Price oracles are not used, so request latency doesn't depend on the exchanges
+        :return: Eth value using `fixed_eth_conversion` or precalculated by `refresh_token_prices_task`. Prices
+        older than `TOKEN_PRICE_MAX_AGE` are returned with a warning
+        :raises: CannotGetTokenPriceFromApi if there's no price stored for the token
+        """
+        eth_value = TokenPrice.objects.get_eth_values([self]).get(self.address)
+        if eth_value is None:
+            raise CannotGetTokenPriceFromApi('There is no price stored for token=%s' % self.address)
+        return eth_value
+
+    def get_fixed_eth_value(self) -> Optional[float]:
+        """
+        :return: Eth value using `fixed_eth_conversion`, `None` if not configured
+        """
         if self.fixed_eth_conversion:  # `None` or `0` are ignored
             # Ether has 18 decimals, but maybe the token has a different number
             multiplier = 1e18 / 10**self.decimals
             return round(multiplier * float(self.fixed_eth_conversion), 10)
+
+    def calculate_eth_value(self) -> float:
+        """
+        :return: Average of the prices of the price oracles
+        :raises: CannotGetTokenPriceFromApi
+        """
+        prices = self._get_price_oracle_tickers_prices()
+        prices = [price for price in prices if price is not None and price > 0]
+        if prices:
+            # Get the average price of the price oracles
+            return sum(prices) / len(prices)
         else:
-            prices = [price_oracle_ticker.price for price_oracle_ticker in self.price_oracle_tickers.all()]
-            prices = [price for price in prices if price is not None and price > 0]
-            if prices:
-                # Get the average price of the price oracles
-                return sum(prices) / len(prices)
-            else:
-                raise CannotGetTokenPriceFromApi('There is no working provider for token=%s' % self.address)
+            raise CannotGetTokenPriceFromApi('There is no working provider for token=%s' % self.address)
+
+    def _get_price_oracle_tickers_prices(self) -> List[Optional[float]]:
+        """
+        Prices are requested to every oracle at the same time. Oracles not answering before
+        `PRICE_ORACLES_DEADLINE` seconds are ignored
+        :return: Prices of the oracles answering in time, `None` if oracle failed
+        """
+        # Price oracle tickers are prefetched for the tokens of the `gas_token_registry`
+        if 'price_oracle_tickers' in getattr(self, '_prefetched_objects_cache', {}):
+            price_oracle_tickers = list(self.price_oracle_tickers.all())
+        else:
+            price_oracle_tickers = list(self.price_oracle_tickers.select_related('price_oracle'))
+        if len(price_oracle_tickers) <= 1:
+            return [price_oracle_ticker.price for price_oracle_ticker in price_oracle_tickers]
+
+        # Database is only used in this thread, price oracle threads don't open database connections
+        futures = [price_oracles_executor.submit(PriceOracleTicker.get_ticker_price,
+                                                 price_oracle_ticker.price_oracle.name,
+                                                 price_oracle_ticker.ticker,
+                                                 price_oracle_ticker.inverse)
+                   for price_oracle_ticker in price_oracle_tickers]
+        done, not_done = wait(futures, timeout=settings.PRICE_ORACLES_DEADLINE)
+        if not_done:
+            logger.warning('%d of %d price oracles did not answer in time for token=%s',
+                           len(not_done), len(futures), self.address)
+        return [future.result() for future in futures if future in done]
 
-    def calculate_payment(self, eth_payment: int) -> int:
+    def calculate_payment(self, eth_payment: int, eth_value: Optional[float] = None) -> int:
         """
         Converts an ether payment to a token payment
         :param eth_payment: Ether payment (in wei)
+        :param eth_value: Eth value of the token if already known, `get_eth_value()` will be used otherwise
         :return: Token payment equivalent for the ether value
         """
-        return math.ceil(eth_payment / self.get_eth_value())
+        return math.ceil(eth_payment / (eth_value or self.get_eth_value()))
 
-    def calculate_gas_price(self, gas_price: int, price_margin: float = 1.0) -> int:
+    def calculate_gas_price(self, gas_price: int, price_margin: float = 1.0,
+                            eth_value: Optional[float] = None) -> int:
         """
         Converts ether gas price to token's gas price
         :param gas_price: Regular ether gas price
         :param price_margin: Threshold to estimate a little higher, so tx will
         not be rejected in a few minutes
+        :param eth_value: Eth value of the token if already known, `get_eth_value()` will be used otherwise
         :return:
         """
-        return math.ceil(gas_price / self.get_eth_value() * price_margin)
+        return math.ceil(gas_price / (eth_value or self.get_eth_value()) * price_margin)
 
     def get_full_logo_uri(self):
         if urlparse(self.logo_uri).netloc:
@@ -106,3 +189,124 @@ class Token(models.Model):
         else:
             # Generate logo uri based on configuration
             return urljoin(settings.TOKEN_LOGO_BASE_URI, self.address + settings.TOKEN_LOGO_EXTENSION)
+
+
+class TokenPriceQuerySet(models.QuerySet):
+    def get_stored_eth_values(self, token_addresses: Iterable[str]) -> Dict[str, Tuple[float, float]]:
+        """
+        Uses one cache request and one database query for the tokens not cached, regardless of the number of tokens
+        :return: Dictionary of `token address -> (eth value, timestamp when it was calculated)`. Tokens without a
+        stored price are not included
+        """
+        token_addresses = list(token_addresses)
+        cache_keys = {TokenPrice.get_cache_key(address): address for address in token_addresses}
+        values = {cache_keys[cache_key]: value for cache_key, value in cache.get_many(cache_keys).items()}
+        not_cached = [address for address in token_addresses if address not in values]
+        if not_cached:
+            for token_id, eth_value, modified in self.filter(token_id__in=not_cached
+                                                             ).values_list('token_id', 'eth_value', 'modified'):
+                values[token_id] = (eth_value, modified.timestamp())
+        return values
+
+    def get_recent_eth_value(self, token_address: str, max_age: Optional[int] = None) -> Optional[float]:
+        """
+        :param max_age: Max seconds since the price was calculated, `TOKEN_PRICE_MAX_AGE` by default
+        :return: Eth value precalculated for the token, `None` if not found or too old
+        """
+        max_age = settings.TOKEN_PRICE_MAX_AGE if max_age is None else max_age
+        value = self.get_stored_eth_values([token_address]).get(token_address)
+        if value is not None:
+            eth_value, timestamp = value
+            if time.time() - timestamp <= max_age:
+                return eth_value
+
+    def get_eth_values(self, tokens: Iterable[Token], max_age: Optional[int] = None) -> Dict[str, float]:
+        """
+        Eth values for a list of tokens precalculated by `refresh_token_prices_task`, with a constant number of
+        queries regardless of the number of tokens. Price oracles are never used, so it's safe to call it when
+        serving requests
+        :param max_age: Seconds since the price was calculated to consider it stale, `TOKEN_PRICE_MAX_AGE` by
+        default. Stale prices are returned anyway and a warning is logged
+        :return: Dictionary of `token address -> eth value`. Tokens without a stored price are not included
+        """
+        max_age = settings.TOKEN_PRICE_MAX_AGE if max_age is None else max_age
+        eth_values: Dict[str, float] = {}
+        not_fixed_addresses = []
+        for token in tokens:
+            fixed_eth_value = token.get_fixed_eth_value()
+            if fixed_eth_value is not None:
+                eth_values[token.address] = fixed_eth_value
+            else:
+                not_fixed_addresses.append(token.address)
+
+        if not_fixed_addresses:
+            now = time.time()
+            for address, (eth_value, timestamp) in self.get_stored_eth_values(not_fixed_addresses).items():
+                if now - timestamp > max_age:
+                    logger.warning('Using stale price for token=%s calculated %d seconds ago, check '
+                                   '`refresh_token_prices_task` is running', address, now - timestamp)
+                eth_values[address] = eth_value
+        return eth_values
+
+    def refresh(self, tokens: Iterable[Token]) -> List['TokenPrice']:
+        """
+        Calculates the eth value of the tokens and stores it on database and cache. Only one request is done for
+        every price oracle using `PriceOracle.get_prices`
+        :return: Token prices updated. Tokens with no working price oracle are not updated
+        """
+        tokens = list(tokens)
+        tickers_by_oracle = defaultdict(set)
+        for token in tokens:
+            for price_oracle_ticker in token.price_oracle_tickers.all():
+                tickers_by_oracle[price_oracle_ticker.price_oracle.name].add(price_oracle_ticker.ticker)
+
+        futures = {price_oracle_name: price_oracles_executor.submit(
+            get_price_oracle(price_oracle_name, timeout=settings.PRICE_ORACLES_REQUEST_TIMEOUT).get_prices, tickers)
+            for price_oracle_name, tickers in tickers_by_oracle.items()}
+        prices_by_oracle: Dict[str, Dict[str, float]] = {}
+        for price_oracle_name, future in futures.items():
+            try:
+                prices_by_oracle[price_oracle_name] = future.result()
+            except ExchangeApiException:
+                logger.warning('Cannot get prices from price oracle %s', price_oracle_name, exc_info=True)
+                prices_by_oracle[price_oracle_name] = {}
+            except Exception:  # Malformed responses must not stop the refresh for the other price oracles
+                logger.error('Unexpected error getting prices from price oracle %s', price_oracle_name, exc_info=True)
+                prices_by_oracle[price_oracle_name] = {}
+
+        token_prices = []
+        for token in tokens:
+            prices, sources = [], []
+            for price_oracle_ticker in token.price_oracle_tickers.all():
+                price_oracle_name = price_oracle_ticker.price_oracle.name
+                price = prices_by_oracle[price_oracle_name].get(price_oracle_ticker.ticker)
+                if price and price > 0:
+                    prices.append(1 / price if price_oracle_ticker.inverse else price)
+                    sources.append(price_oracle_name)
+            if not prices:
+                logger.warning('There is no working provider for token=%s', token.address)
+                continue
+
+            eth_value = sum(prices) / len(prices)
+            token_price, _ = self.update_or_create(token=token, defaults={'eth_value': eth_value, 'sources': sources})
+            cache.set(TokenPrice.get_cache_key(token.address), (eth_value, token_price.modified.timestamp()),
+                      settings.TOKEN_PRICE_MAX_AGE)
+            token_prices.append(token_price)
+        return token_prices
+
+
+class TokenPrice(TimeStampedModel):
+    """
+    Eth value of a token calculated in background, so requests don't need to wait for the price oracles
+    """
+    objects = TokenPriceQuerySet.as_manager()
+    token = models.OneToOneField(Token, primary_key=True, on_delete=models.CASCADE, related_name='token_price')
+    eth_value = models.FloatField()
+    sources = ArrayField(models.CharField(max_length=50))  # Names of the price oracles used
+
+    def __str__(self):
+        return '%s - %f - %s' % (self.token_id, self.eth_value, self.modified)
+
+    @staticmethod
+    def get_cache_key(token_address: str) -> str:
+        return 'token-eth-value:%s' % token_address
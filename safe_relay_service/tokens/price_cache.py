@@ -0,0 +1,168 @@
+import functools
+import threading
+import time
+from collections import Counter
+from logging import getLogger
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from django.core.cache import cache
+
+from cachetools import LRUCache
+
+logger = getLogger(__name__)
+
+
+class CachedPrice(NamedTuple):
+    price: float
+    fresh_until: float  # Timestamp. After it, price can still be served while it's refreshed
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+
+class PriceCache:
+    """
+    Two tier cache for the price oracles: an in-process LRU in front of the Django cache (Redis), so every worker
+    shares the prices. When a price is not fresh anymore, one worker refreshes it (holding a lock on the Django
+    cache) while the others keep serving the stale price, so no request pays for the exchange API call after
+    every expiration
+    """
+
+    metric_names = ('local_hits', 'redis_hits', 'stale_hits', 'refreshes', 'misses')
+
+    def __init__(self, local_maxsize: int = 1024, lock_timeout: int = 30, metrics_publish_interval: int = 60):
+        """
+        :param local_maxsize: Max number of prices stored in memory
+        :param lock_timeout: Max seconds a worker holds the lock for refreshing a price
+        :param metrics_publish_interval: Seconds between publications of the metrics of this process to the
+        Django cache, so prices can still be served from memory without a request to Redis
+        """
+        self.local_cache: LRUCache = LRUCache(maxsize=local_maxsize)
+        self.local_lock = threading.Lock()
+        self.lock_timeout = lock_timeout
+        self.metrics_publish_interval = metrics_publish_interval
+        self.metrics = Counter()
+        self.unpublished_metrics = Counter()  # `(oracle_name, metric) -> count` not published yet
+        self.metrics_lock = threading.Lock()
+        self.metrics_published_at = time.time()
+
+    def _get_cache_key(self, oracle_name: str, ticker: str) -> str:
+        return 'price-oracle:%s:%s' % (oracle_name, ticker)
+
+    def _get_lock_key(self, oracle_name: str, ticker: str) -> str:
+        return 'price-oracle-lock:%s:%s' % (oracle_name, ticker)
+
+    def _get_metric_key(self, oracle_name: str, metric: str) -> str:
+        return 'price-oracle-metrics:%s:%s' % (oracle_name, metric)
+
+    def _get_local(self, key: Tuple[str, str]) -> Optional[CachedPrice]:
+        with self.local_lock:
+            return self.local_cache.get(key)
+
+    def _set_local(self, key: Tuple[str, str], cached_price: CachedPrice):
+        with self.local_lock:
+            self.local_cache[key] = cached_price
+
+    def _fetch(self, oracle_name: str, ticker: str, fetch: Callable[[], float], ttl: int, stale_ttl: int) -> float:
+        price = fetch()
+        cached_price = CachedPrice(price, time.time() + ttl)
+        cache.set(self._get_cache_key(oracle_name, ticker), tuple(cached_price), ttl + stale_ttl)
+        self._set_local((oracle_name, ticker), cached_price)
+        return price
+
+    def _increment_metric(self, oracle_name: str, metric: str):
+        with self.metrics_lock:
+            self.metrics[metric] += 1
+            self.unpublished_metrics[(oracle_name, metric)] += 1
+            publish = time.time() - self.metrics_published_at >= self.metrics_publish_interval
+        if publish:
+            self.publish_metrics()
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        :return: Number of `local_hits`, `redis_hits`, `stale_hits`, `refreshes` and `misses` for this process
+        """
+        return dict(self.metrics)
+
+    def publish_metrics(self):
+        """
+        Adds the metrics of this process not published yet to the ones shared by every process on the Django cache
+        """
+        with self.metrics_lock:
+            unpublished_metrics, self.unpublished_metrics = self.unpublished_metrics, Counter()
+            self.metrics_published_at = time.time()
+        try:
+            for (oracle_name, metric), value in unpublished_metrics.items():
+                key = self._get_metric_key(oracle_name, metric)
+                if not cache.add(key, value, timeout=None):
+                    cache.incr(key, value)
+        except Exception:  # Metrics must never break getting prices
+            logger.warning('Cannot publish price cache metrics', exc_info=True)
+
+    def get_shared_metrics(self, oracle_name: str) -> Dict[str, int]:
+        """
+        :return: Metrics published by every process for the price oracle
+        """
+        keys = {self._get_metric_key(oracle_name, metric): metric for metric in self.metric_names}
+        return {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    def clear_local(self):
+        with self.local_lock:
+            self.local_cache.clear()
+
+    def get_or_fetch(self, oracle_name: str, ticker: str, fetch: Callable[[], float], ttl: int,
+                     stale_ttl: int) -> float:
+        """
+        :param fetch: Function to get the price from the exchange
+        :param ttl: Seconds the price is fresh
+        :param stale_ttl: Seconds the price can be served after not being fresh while it's refreshed
+        :return: Price for the ticker
+        """
+        key = (oracle_name, ticker)
+        cached_price = self._get_local(key)
+        if cached_price and cached_price.is_fresh():
+            self._increment_metric(oracle_name, 'local_hits')
+            return cached_price.price
+
+        value = cache.get(self._get_cache_key(oracle_name, ticker))
+        if value is None:
+            self._increment_metric(oracle_name, 'misses')
+            return self._fetch(oracle_name, ticker, fetch, ttl, stale_ttl)
+
+        cached_price = CachedPrice(*value)
+        self._set_local(key, cached_price)
+        if cached_price.is_fresh():
+            self._increment_metric(oracle_name, 'redis_hits')
+            return cached_price.price
+
+        # Only one worker refreshes the price, the others serve the stale one
+        lock_key = self._get_lock_key(oracle_name, ticker)
+        if cache.add(lock_key, True, self.lock_timeout):
+            self._increment_metric(oracle_name, 'refreshes')
+            try:
+                return self._fetch(oracle_name, ticker, fetch, ttl, stale_ttl)
+            except Exception:
+                logger.warning('Cannot refresh price for %s - %s, using stale price', oracle_name, ticker,
+                               exc_info=True)
+            finally:
+                cache.delete(lock_key)
+        self._increment_metric(oracle_name, 'stale_hits')
+        return cached_price.price
+
+
+price_cache = PriceCache()
+
+
+def cached_price(ttl: int, stale_ttl: int = 300):
+    """
+    Decorator for `PriceOracle.get_price`, caching prices on `price_cache`
+    :param ttl: Seconds the price is fresh
+    :param stale_ttl: Seconds a not fresh price can be served while it's refreshed
+    """
+    def decorator(get_price):
+        @functools.wraps(get_price)
+        def wrapper(self, ticker: str) -> float:
+            return price_cache.get_or_fetch(self.__class__.__name__.lower(), ticker,
+                                            lambda: get_price(self, ticker), ttl, stale_ttl)
+        return wrapper
+    return decorator
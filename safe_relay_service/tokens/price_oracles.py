@@ -1,8 +1,14 @@
 import logging
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Tuple
 
 import requests
-from cachetools import TTLCache, cached
+from requests.adapters import HTTPAdapter
+
+from .circuit_breaker import CircuitBreaker
+from .price_cache import cached_price
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +25,72 @@ class InvalidTicker(ExchangeApiException):
     pass
 
 
+class PriceOracleNotAvailable(CannotGetTokenPriceFromApi):
+    pass
+
+
+# Probes for price oracles with an open circuit are done in background
+probe_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='price-oracles-probe')
+
+
 class PriceOracle(ABC):
+    def __init__(self, timeout: float = 5.):
+        """
+        :param timeout: Seconds to wait for the exchange API
+        """
+        self.timeout = timeout
+        # Keep connections alive between requests, a pool is needed as prices can be requested concurrently
+        self.http_session = requests.Session()
+        self.http_session.mount('https://', HTTPAdapter(pool_maxsize=10))
+        self.circuit_breaker = CircuitBreaker(self.__class__.__name__.lower())
+
+    def _get(self, url: str) -> requests.Response:
+        """
+        :raises: PriceOracleNotAvailable if circuit is open for the oracle, no request is done
+        :raises: CannotGetTokenPriceFromApi if exchange cannot be reached in time
+        """
+        if self.circuit_breaker.is_open():
+            if self.circuit_breaker.should_probe():
+                probe_executor.submit(self._request, url)
+            raise PriceOracleNotAvailable('Circuit is open for price oracle %s' % self.circuit_breaker.name)
+        return self._request(url)
+
+    def _request(self, url: str) -> requests.Response:
+        """
+        Does the request and records the result on the circuit breaker. Errors for a ticker (e.g. not found) are
+        not considered failures of the oracle
+        """
+        start = time.time()
+        try:
+            response = self.http_session.get(url, timeout=self.timeout)
+        except requests.RequestException as exc:
+            self.circuit_breaker.record_failure(time.time() - start, str(exc))
+            logger.warning('Cannot get price from url=%s' % url)
+            raise CannotGetTokenPriceFromApi(str(exc)) from exc
+
+        if response.status_code >= 500:
+            self.circuit_breaker.record_failure(time.time() - start, 'HTTP %d' % response.status_code)
+        else:
+            self.circuit_breaker.record_success(time.time() - start)
+        return response
+
     @abstractmethod
     def get_price(self, ticker) -> float:
         pass
 
+    def get_prices(self, tickers: Iterable[str]) -> Dict[str, float]:
+        """
+        Oracles with bulk endpoints override this method to get every price with only one request
+        :return: Dictionary of `ticker -> price`. Tickers whose price cannot be retrieved are not included
+        """
+        prices = {}
+        for ticker in tickers:
+            try:
+                prices[ticker] = self.get_price(ticker)
+            except ExchangeApiException:
+                logger.warning('Cannot get price for ticker=%s', ticker)
+        return prices
+
 
 class Binance(PriceOracle):
     """
@@ -31,16 +98,31 @@ class Binance(PriceOracle):
     Remember to always use USDT instead of USD
     """
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached_price(ttl=60)
     def get_price(self, ticker) -> float:
         url = 'https://api.binance.com/api/v3/avgPrice?symbol=' + ticker
-        response = requests.get(url)
+        response = self._get(url)
         api_json = response.json()
         if not response.ok:
             logger.warning('Cannot get price from url=%s' % url)
             raise CannotGetTokenPriceFromApi(api_json.get('msg'))
         return float(api_json['price'])
 
+    def get_prices(self, tickers: Iterable[str]) -> Dict[str, float]:
+        """
+        Every symbol is returned by Binance in one request. Last price is returned instead of the average of the
+        last 5 minutes returned by `get_price`
+        """
+        url = 'https://api.binance.com/api/v3/ticker/price'
+        response = self._get(url)
+        api_json = response.json()
+        if not response.ok:
+            logger.warning('Cannot get prices from url=%s' % url)
+            raise CannotGetTokenPriceFromApi(api_json.get('msg'))
+        tickers = set(tickers)
+        return {symbol_price['symbol']: float(symbol_price['price'])
+                for symbol_price in api_json if symbol_price['symbol'] in tickers}
+
 
 class DutchX(PriceOracle):
     def validate_ticker(self, ticker: str):
@@ -51,12 +133,12 @@ class DutchX(PriceOracle):
     def reverse_ticker(self, ticker: str):
         return '-'.join(reversed(ticker.split('-')))
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=1200))
+    @cached_price(ttl=1200)
     def get_price(self, ticker: str) -> float:
         self.validate_ticker(ticker)
         url = 'https://dutchx.d.exchange/api/v1/markets/{}/prices/custom-median?requireWhitelisted=false&' \
               'maximumTimePeriod=388800&numberOfAuctions=9'.format(ticker)
-        response = requests.get(url)
+        response = self._get(url)
         api_json = response.json()
         if not response.ok or api_json is None:
             logger.warning('Cannot get price from url=%s' % url)
@@ -69,10 +151,10 @@ class Huobi(PriceOracle):
     Get valid symbols from https://api.huobi.pro/v1/common/symbols
     """
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached_price(ttl=60)
     def get_price(self, ticker) -> float:
         url = 'https://api.huobi.pro/market/detail/merged?symbol=%s' % ticker
-        response = requests.get(url)
+        response = self._get(url)
         api_json = response.json()
         error = api_json.get('err-msg')
         if not response.ok or error:
@@ -80,13 +162,28 @@ class Huobi(PriceOracle):
             raise CannotGetTokenPriceFromApi(error)
         return float(api_json['tick']['close'])
 
+    def get_prices(self, tickers: Iterable[str]) -> Dict[str, float]:
+        """
+        Every symbol is returned by Huobi in one request
+        """
+        url = 'https://api.huobi.pro/market/tickers'
+        response = self._get(url)
+        api_json = response.json()
+        error = api_json.get('err-msg')
+        if not response.ok or error:
+            logger.warning('Cannot get prices from url=%s' % url)
+            raise CannotGetTokenPriceFromApi(error)
+        tickers = set(tickers)
+        return {symbol_ticker['symbol']: float(symbol_ticker['close'])
+                for symbol_ticker in api_json['data'] if symbol_ticker['symbol'] in tickers}
+
 
 class Kraken(PriceOracle):
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached_price(ttl=60)
     def get_price(self, ticker) -> float:
         url = 'https://api.kraken.com/0/public/Ticker?pair=' + ticker
-        response = requests.get(url)
+        response = self._get(url)
         api_json = response.json()
         error = api_json.get('error')
         if not response.ok or error:
@@ -97,8 +194,47 @@ class Kraken(PriceOracle):
         for new_ticker in result:
             return float(result[new_ticker]['c'][0])
 
+    @staticmethod
+    def _normalize_pair(pair: str) -> str:
+        """
+        Kraken returns pairs using its internal name, with `X` (crypto) and `Z` (fiat) prefixes for the assets
+        :param pair: `ETHEUR` or `XETHZEUR`
+        :return: `ETHEUR`
+        """
+        if len(pair) == 8 and pair[0] in 'XZ' and pair[4] in 'XZ':
+            return pair[1:4] + pair[5:]
+        return pair
+
+    def get_prices(self, tickers: Iterable[str]) -> Dict[str, float]:
+        """
+        Kraken accepts multiple pairs in one request, but fails if one of them is not valid. Tickers not found
+        on the bulk request are requested one by one
+        """
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        url = 'https://api.kraken.com/0/public/Ticker?pair=' + ','.join(tickers)
+        response = self._get(url)
+        api_json = response.json()
+        prices = {}
+        if response.ok and not api_json.get('error'):
+            tickers_by_pair = {self._normalize_pair(ticker): ticker for ticker in tickers}
+            for pair, pair_result in api_json['result'].items():
+                ticker = tickers_by_pair.get(self._normalize_pair(pair))
+                if ticker:
+                    prices[ticker] = float(pair_result['c'][0])
+        else:
+            logger.warning('Cannot get prices from url=%s, requesting one by one', url)
+        missing_tickers = [ticker for ticker in tickers if ticker not in prices]
+        prices.update(super().get_prices(missing_tickers))
+        return prices
+
+
+# Oracles are reused, so connections and cached prices are shared between calls
+_price_oracles: Dict[Tuple[str, float], PriceOracle] = {}
+
 
-def get_price_oracle(name) -> PriceOracle:
+def get_price_oracle(name, timeout: float = 5.) -> PriceOracle:
     oracles = {
         'binance': Binance,
         'dutchx': DutchX,
@@ -106,8 +242,12 @@ def get_price_oracle(name) -> PriceOracle:
         'kraken': Kraken,
     }
 
-    oracle = oracles.get(name.lower())
+    name = name.lower()
+    oracle = oracles.get(name)
     if oracle:
-        return oracle()
+        key = (name, timeout)
+        if key not in _price_oracles:
+            _price_oracles[key] = oracle(timeout=timeout)
+        return _price_oracles[key]
     else:
         raise NotImplementedError("Oracle '%s' not found" % name)
@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .gas_token_registry import gas_token_registry
+from .models import PriceOracleTicker, Token
+from .views import TokensView
+
+
+@receiver(post_save, sender=Token, dispatch_uid='token.invalidate_gas_tokens_on_save')
+@receiver(post_delete, sender=Token, dispatch_uid='token.invalidate_gas_tokens_on_delete')
+@receiver(post_save, sender=PriceOracleTicker, dispatch_uid='price_oracle_ticker.invalidate_gas_tokens_on_save')
+@receiver(post_delete, sender=PriceOracleTicker, dispatch_uid='price_oracle_ticker.invalidate_gas_tokens_on_delete')
+def invalidate_gas_tokens(sender, **kwargs):
+    gas_token_registry.invalidate()
+    # Other processes must not reload the tokens before the changes are committed
+    transaction.on_commit(gas_token_registry.publish_invalidation)
+
+
+@receiver(post_save, sender=Token, dispatch_uid='token.invalidate_tokens_view_cache_on_save')
+@receiver(post_delete, sender=Token, dispatch_uid='token.invalidate_tokens_view_cache_on_delete')
+def invalidate_tokens_view_cache(sender, **kwargs):
+    TokensView.invalidate_cache()
@@ -0,0 +1,23 @@
+from django.db.models import Q
+
+from celery import app
+from celery.utils.log import get_task_logger
+
+from .models import Token, TokenPrice
+
+logger = get_task_logger(__name__)
+
+
+@app.shared_task(soft_time_limit=60)
+def refresh_token_prices_task() -> int:
+    """
+    Calculates the eth value of the gas tokens without a fixed conversion
+    :return: Number of token prices updated
+    """
+    tokens = Token.objects.gas_tokens().filter(
+        Q(fixed_eth_conversion=None) | Q(fixed_eth_conversion=0)
+    ).prefetch_related('price_oracle_tickers__price_oracle')
+    token_prices = TokenPrice.objects.refresh(tokens)
+    for token_price in token_prices:
+        logger.info('Updated token price %s', token_price)
+    return len(token_prices)
@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+import requests
+
+from ..circuit_breaker import CircuitBreaker
+from ..price_oracles import (Binance, CannotGetTokenPriceFromApi,
+                             PriceOracleNotAvailable)
+
+
+class TestCircuitBreaker(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_circuit_breaker(self):
+        circuit_breaker = CircuitBreaker('test', failure_threshold=2, open_seconds=0)
+        self.assertFalse(circuit_breaker.is_open())
+        self.assertFalse(circuit_breaker.should_probe())
+
+        circuit_breaker.record_failure(1., 'Timeout')
+        self.assertFalse(circuit_breaker.is_open())
+        circuit_breaker.record_failure(3., 'Timeout')
+        self.assertTrue(circuit_breaker.is_open())
+        health = circuit_breaker.get_health()
+        self.assertEqual(health['state'], CircuitBreaker.OPEN)
+        self.assertEqual(health['failures'], 2)
+        self.assertEqual(health['last_error'], 'Timeout')
+        self.assertAlmostEqual(health['latency'], 1.4)
+
+        # State is shared
+        self.assertTrue(CircuitBreaker('test').is_open())
+
+        # Only one probe at the same time
+        self.assertTrue(circuit_breaker.should_probe())
+        self.assertEqual(circuit_breaker.get_health()['state'], CircuitBreaker.HALF_OPEN)
+        self.assertFalse(circuit_breaker.should_probe())
+
+        # If probe fails circuit is opened again
+        circuit_breaker.record_failure(1., 'Timeout')
+        self.assertEqual(circuit_breaker.get_health()['state'], CircuitBreaker.OPEN)
+
+        circuit_breaker.record_success(1.)
+        self.assertFalse(circuit_breaker.is_open())
+        self.assertEqual(circuit_breaker.get_health()['failures'], 0)
+
+    def test_price_oracle_circuit_breaker(self):
+        price_oracle = Binance()
+        price_oracle.circuit_breaker = CircuitBreaker('binance', failure_threshold=1, open_seconds=60)
+        with mock.patch.object(price_oracle.http_session, 'get', side_effect=requests.Timeout) as get_mock:
+            with self.assertRaises(CannotGetTokenPriceFromApi):
+                price_oracle.get_price('GNOETH')
+            self.assertTrue(price_oracle.circuit_breaker.is_open())
+
+            # Oracle is not called while circuit is open
+            with self.assertRaises(PriceOracleNotAvailable):
+                price_oracle.get_price('GNOETH')
+            self.assertEqual(get_mock.call_count, 1)
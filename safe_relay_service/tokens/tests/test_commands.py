@@ -1,4 +1,5 @@
 from io import StringIO
+from unittest import mock
 
 from django.core.management import call_command
 from django.test import TestCase
@@ -8,6 +9,8 @@ from eth_account import Account
 from gnosis.eth import EthereumClientProvider
 from gnosis.eth.tests.utils import deploy_example_erc20
 
+from ..models import Token
+from ..token_repository import TokenRepository
 from .factories import TokenFactory
 
 
@@ -22,3 +25,24 @@ class TestCommands(TestCase):
         erc20 = deploy_example_erc20(ethereum_client.w3, 10, Account.create().address)
         call_command('add_token', erc20.address, '--no-prompt', stdout=buf)
         self.assertIn('Created token', buf.getvalue())
+
+    def test_update_tokens(self):
+        existing_token = TokenFactory(relevance=50)
+        new_address = Account.create().address
+        tokens = [{'address': existing_token.address, 'name': existing_token.name, 'symbol': existing_token.symbol,
+                   'description': '', 'decimals': 18, 'logo_url': None, 'website_url': ''},
+                  {'address': new_address, 'name': 'New Token', 'symbol': 'NEW', 'description': 'New',
+                   'decimals': 18, 'logo_url': None, 'website_url': 'https://new.token'}]
+        buf = StringIO()
+        with mock.patch.object(TokenRepository, 'get_tokens', return_value=tokens):
+            call_command('update_tokens', '--store-db', stdout=buf)
+        self.assertIn('Created 1 tokens, updated 1 tokens', buf.getvalue())
+        existing_token.refresh_from_db()
+        self.assertEqual(existing_token.relevance, 1)
+        self.assertEqual(Token.objects.get(address=new_address).relevance, 2)
+
+        # Rerun without changes
+        buf = StringIO()
+        with mock.patch.object(TokenRepository, 'get_tokens', return_value=tokens):
+            call_command('update_tokens', '--store-db', stdout=buf)
+        self.assertIn('Created 0 tokens, updated 0 tokens', buf.getvalue())
@@ -31,6 +31,12 @@ class TestExchanges(TestCase):
             with self.assertRaises(ExchangeApiException):
                 exchange.get_price(ticker)
 
+        prices = exchange.get_prices(tickers + bad_tickers)
+        self.assertEqual(set(prices), set(tickers))
+        for price in prices.values():
+            self.assertIsInstance(price, float)
+            self.assertGreater(price, .0)
+
     def test_binance(self):
         exchange = Binance()
         self.exchange_helper(exchange, ['BTCUSDT', 'ETHUSDT'], ['BADTICKER'])
@@ -0,0 +1,33 @@
+from django.test import TestCase
+
+from ..gas_token_registry import GasTokenRegistry, gas_token_registry
+from .factories import TokenFactory
+
+
+class TestGasTokenRegistry(TestCase):
+    def test_gas_token_registry(self):
+        registry = GasTokenRegistry()
+        token = TokenFactory(gas=True)
+        not_gas_token = TokenFactory(gas=False)
+
+        self.assertEqual(registry.get(token.address), token)
+        self.assertIsNone(registry.get(not_gas_token.address))
+        self.assertIn(token, registry.gas_tokens())
+
+        # Tokens are not queried again
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get(token.address).decimals, token.decimals)
+            self.assertEqual(list(registry.get(token.address).price_oracle_tickers.all()), [])
+
+        registry.invalidate()
+        token.delete()
+        self.assertIsNone(registry.get(token.address))
+
+    def test_invalidation_on_save(self):
+        token = TokenFactory(gas=False)
+        self.assertIsNone(gas_token_registry.get(token.address))
+        token.gas = True
+        token.save(update_fields=['gas'])
+        self.assertEqual(gas_token_registry.get(token.address), token)
+        token.delete()
+        self.assertIsNone(gas_token_registry.get(token.address))
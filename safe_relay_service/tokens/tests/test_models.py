@@ -1,3 +1,5 @@
+import time
+from unittest import mock
 from urllib.parse import urljoin
 
 from django.conf import settings
@@ -5,7 +7,7 @@ from django.test import TestCase
 
 from web3 import Web3
 
-from ..models import PriceOracle
+from ..models import PriceOracle, PriceOracleTicker, Token, TokenPrice
 from ..price_oracles import CannotGetTokenPriceFromApi
 from .factories import PriceOracleTickerFactory, TokenFactory
 
@@ -33,40 +35,77 @@ class TestModels(TestCase):
         token = TokenFactory(fixed_eth_conversion=1.0, decimals=17)
         self.assertEqual(token.calculate_payment(Web3.toWei(1, 'ether')), Web3.toWei(0.1, 'ether'))
 
-    def test_token_eth_value(self):
+    def test_token_calculate_eth_value(self):
         price_oracle = PriceOracle.objects.get(name='DutchX')
         token = TokenFactory(fixed_eth_conversion=None)
         with self.assertRaises(CannotGetTokenPriceFromApi):
-            token.get_eth_value()
+            token.calculate_eth_value()
         PriceOracleTickerFactory(token=token, price_oracle=price_oracle, ticker='0xdd974D5C2e2928deA5F71b9825b8b646686BD200-WETH')
-        price = token.get_eth_value()
+        price = token.calculate_eth_value()
         self.assertIsInstance(price, float)
         self.assertGreater(price, .0)
         PriceOracleTickerFactory(token=token, price_oracle=price_oracle, ticker='BADTICKER')
-        price = token.get_eth_value()
+        price = token.calculate_eth_value()
         self.assertIsInstance(price, float)
         self.assertGreater(price, .0)
 
         token = TokenFactory(fixed_eth_conversion=None)
         with self.assertRaises(CannotGetTokenPriceFromApi):
-            token.get_eth_value()
+            token.calculate_eth_value()
         PriceOracleTickerFactory(token=token, price_oracle=price_oracle, ticker='BADTICKER')
         with self.assertRaises(CannotGetTokenPriceFromApi):
-            token.get_eth_value()
+            token.calculate_eth_value()
 
-    def test_token_eth_value_inverted(self):
+    def test_token_calculate_eth_value_inverted(self):
         price_oracle = PriceOracle.objects.get(name='DutchX')
 
         token = TokenFactory(fixed_eth_conversion=None)
         PriceOracleTickerFactory(token=token, price_oracle=price_oracle, ticker='0xdd974D5C2e2928deA5F71b9825b8b646686BD200-WETH')
-        price = token.get_eth_value()
+        price = token.calculate_eth_value()
 
         token = TokenFactory(fixed_eth_conversion=None)
         PriceOracleTickerFactory(token=token, price_oracle=price_oracle, ticker='0xdd974D5C2e2928deA5F71b9825b8b646686BD200-WETH', inverse=True)
-        price_inverted = token.get_eth_value()
+        price_inverted = token.calculate_eth_value()
 
         self.assertAlmostEqual(1 / price, price_inverted, delta=10.0)
 
+    def test_token_calculate_eth_value_concurrent_oracles(self):
+        token = TokenFactory(fixed_eth_conversion=None)
+        for price_oracle in PriceOracle.objects.all():
+            PriceOracleTickerFactory(token=token, price_oracle=price_oracle, ticker=price_oracle.name)
+
+        # Huobi fails and Kraken is too slow
+        prices = {'Binance': 1.0, 'DutchX': 3.0, 'Huobi': None, 'Kraken': 5.0}
+
+        def get_ticker_price(price_oracle_name: str, ticker: str, inverse: bool):
+            if ticker == 'Kraken':
+                time.sleep(1)
+            return prices[ticker]
+
+        # Price oracle threads only get plain values, not models
+        with mock.patch.object(PriceOracleTicker, 'get_ticker_price', side_effect=get_ticker_price):
+            with self.settings(PRICE_ORACLES_DEADLINE=0.5):
+                start = time.time()
+                self.assertEqual(token.calculate_eth_value(), 2.0)
+                self.assertLess(time.time() - start, 1)
+
+    def test_token_eth_value(self):
+        token = TokenFactory(fixed_eth_conversion=None)
+        PriceOracleTickerFactory(token=token, price_oracle=PriceOracle.objects.get(name='Binance'), ticker='GNOETH')
+        with mock.patch('safe_relay_service.tokens.models.get_price_oracle') as get_price_oracle_mock:
+            # Price oracles are never used, prices are calculated by `refresh_token_prices_task`
+            with self.assertRaises(CannotGetTokenPriceFromApi):
+                token.get_eth_value()
+
+            TokenPrice.objects.create(token=token, eth_value=0.03, sources=['Binance'])
+            self.assertEqual(token.get_eth_value(), 0.03)
+
+            # Stale price is returned with a warning
+            with self.settings(TOKEN_PRICE_MAX_AGE=-1):
+                with self.assertLogs('safe_relay_service.tokens.models', level='WARNING'):
+                    self.assertEqual(token.get_eth_value(), 0.03)
+            get_price_oracle_mock.assert_not_called()
+
     def test_token_eth_value_with_fixed_conversion(self):
         fixed_eth_conversion = 0.1
         token = TokenFactory(fixed_eth_conversion=fixed_eth_conversion)
@@ -78,6 +117,38 @@ class TestModels(TestCase):
         token = TokenFactory(decimals=19, fixed_eth_conversion=fixed_eth_conversion)
         self.assertEqual(token.get_eth_value(), fixed_eth_conversion / 10)
 
+    def test_token_price_get_eth_values(self):
+        fixed_token = TokenFactory(fixed_eth_conversion=0.1)
+        tokens = [TokenFactory(fixed_eth_conversion=None) for _ in range(3)]
+        for i, token in enumerate(tokens[:2]):
+            TokenPrice.objects.create(token=token, eth_value=i + 1., sources=['Binance'])
+        # Price oracle tickers are prefetched, as on `gas_token_registry`
+        addresses = [fixed_token.address] + [token.address for token in tokens]
+        all_tokens = list(Token.objects.filter(address__in=addresses
+                                               ).prefetch_related('price_oracle_tickers__price_oracle'))
+
+        # Same number of queries regardless of the number of tokens
+        with self.assertNumQueries(1):
+            eth_values = TokenPrice.objects.get_eth_values(all_tokens)
+        self.assertEqual(eth_values, {fixed_token.address: 0.1, tokens[0].address: 1., tokens[1].address: 2.})
+
+        # Stale prices are returned with a warning, price oracles are not used
+        with mock.patch('safe_relay_service.tokens.models.get_price_oracle') as get_price_oracle_mock:
+            with self.assertLogs('safe_relay_service.tokens.models', level='WARNING') as logs:
+                self.assertEqual(TokenPrice.objects.get_eth_values(all_tokens, max_age=-1), eth_values)
+            self.assertEqual(len(logs.records), 2)
+            get_price_oracle_mock.assert_not_called()
+
+    def test_token_ilike_contains(self):
+        token = TokenFactory(name='Ethereum', symbol='ETH')
+        TokenFactory(name='Gnosis_Token', symbol='GNO')
+        queryset = Token.objects.filter(name__ilike_contains='THER')
+        self.assertIn('ILIKE', str(queryset.query))
+        self.assertEqual(list(queryset), [token])
+        # LIKE wildcards are escaped
+        self.assertEqual(Token.objects.filter(name__ilike_contains='s_t').count(), 1)
+        self.assertEqual(Token.objects.filter(name__ilike_contains='%').count(), 0)
+
     def test_token_logo_uri(self):
         logo_uri = ''
         token = TokenFactory(logo_uri=logo_uri)
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..price_cache import CachedPrice, PriceCache
+from ..price_oracles import CannotGetTokenPriceFromApi
+
+
+class TestPriceCache(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_or_fetch(self):
+        price_cache = PriceCache()
+        fetch = mock.MagicMock(return_value=2.5)
+
+        self.assertEqual(price_cache.get_or_fetch('binance', 'ETHUSDT', fetch, 60, 300), 2.5)
+        self.assertEqual(price_cache.get_or_fetch('binance', 'ETHUSDT', fetch, 60, 300), 2.5)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(price_cache.get_metrics(), {'misses': 1, 'local_hits': 1})
+
+        # Another worker uses the shared cache
+        other_price_cache = PriceCache()
+        self.assertEqual(other_price_cache.get_or_fetch('binance', 'ETHUSDT', fetch, 60, 300), 2.5)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(other_price_cache.get_metrics(), {'redis_hits': 1})
+
+        # Errors are not cached
+        fetch.side_effect = CannotGetTokenPriceFromApi
+        with self.assertRaises(CannotGetTokenPriceFromApi):
+            price_cache.get_or_fetch('binance', 'BADTICKER', fetch, 60, 300)
+        self.assertIsNone(cache.get(price_cache._get_cache_key('binance', 'BADTICKER')))
+
+    def test_stale_while_revalidate(self):
+        price_cache = PriceCache()
+        cache_key = price_cache._get_cache_key('kraken', 'GNOETH')
+        cache.set(cache_key, tuple(CachedPrice(1.0, 0)))  # Not fresh
+
+        # Other worker is refreshing the price, stale price is returned
+        lock_key = price_cache._get_lock_key('kraken', 'GNOETH')
+        cache.add(lock_key, True)
+        fetch = mock.MagicMock(return_value=2.0)
+        self.assertEqual(price_cache.get_or_fetch('kraken', 'GNOETH', fetch, 60, 300), 1.0)
+        fetch.assert_not_called()
+        cache.delete(lock_key)
+
+        # Stale price is returned if refreshing fails
+        fetch.side_effect = CannotGetTokenPriceFromApi
+        self.assertEqual(price_cache.get_or_fetch('kraken', 'GNOETH', fetch, 60, 300), 1.0)
+        self.assertIsNone(cache.get(lock_key))
+
+        fetch.side_effect = None
+        self.assertEqual(price_cache.get_or_fetch('kraken', 'GNOETH', fetch, 60, 300), 2.0)
+        self.assertTrue(CachedPrice(*cache.get(cache_key)).is_fresh())
+        self.assertEqual(price_cache.get_metrics(), {'stale_hits': 2, 'refreshes': 2})
+
+    def test_publish_metrics(self):
+        price_cache = PriceCache(metrics_publish_interval=0)
+        other_price_cache = PriceCache(metrics_publish_interval=3600)
+        fetch = mock.MagicMock(return_value=2.5)
+        price_cache.get_or_fetch('binance', 'ETHUSDT', fetch, 60, 300)
+        self.assertEqual(price_cache.get_shared_metrics('binance'), {'misses': 1})
+
+        # Metrics are published every `metrics_publish_interval`
+        other_price_cache.get_or_fetch('binance', 'ETHUSDT', fetch, 60, 300)
+        other_price_cache.get_or_fetch('binance', 'ETHUSDT', fetch, 60, 300)
+        self.assertEqual(price_cache.get_shared_metrics('binance'), {'misses': 1})
+        other_price_cache.publish_metrics()
+        self.assertEqual(price_cache.get_shared_metrics('binance'), {'misses': 1, 'redis_hits': 1, 'local_hits': 1})
+        self.assertEqual(price_cache.get_shared_metrics('kraken'), {})
@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import PriceOracle, TokenPrice
+from ..tasks import refresh_token_prices_task
+from .factories import PriceOracleTickerFactory, TokenFactory
+
+
+class TestTasks(TestCase):
+    def test_refresh_token_prices_task(self):
+        cache.clear()
+        binance = PriceOracle.objects.get(name='Binance')
+        kraken = PriceOracle.objects.get(name='Kraken')
+        token = TokenFactory(fixed_eth_conversion=None)
+        PriceOracleTickerFactory(token=token, price_oracle=binance, ticker='GNOETH')
+        PriceOracleTickerFactory(token=token, price_oracle=kraken, ticker='ETHGNO', inverse=True)
+        token_without_prices = TokenFactory(fixed_eth_conversion=None)
+        PriceOracleTickerFactory(token=token_without_prices, price_oracle=binance, ticker='BADTICKER')
+        TokenFactory(fixed_eth_conversion=None, gas=False)
+        TokenFactory(fixed_eth_conversion=1)
+
+        price_oracles = {
+            'Binance': mock.MagicMock(**{'get_prices.return_value': {'GNOETH': 0.02}}),
+            'Kraken': mock.MagicMock(**{'get_prices.return_value': {'ETHGNO': 25.}}),
+        }
+        with mock.patch('safe_relay_service.tokens.models.get_price_oracle',
+                        side_effect=lambda name, **kwargs: price_oracles[name]):
+            self.assertEqual(refresh_token_prices_task(), 1)
+
+        price_oracles['Binance'].get_prices.assert_called_once()
+        self.assertEqual(set(price_oracles['Binance'].get_prices.call_args[0][0]), {'GNOETH', 'BADTICKER'})
+        token_price = TokenPrice.objects.get()
+        self.assertEqual(token_price.token, token)
+        self.assertAlmostEqual(token_price.eth_value, 0.03)
+        self.assertCountEqual(token_price.sources, ['Binance', 'Kraken'])
+
+        # Price oracles are not used if there's a recent price
+        with mock.patch('safe_relay_service.tokens.models.get_price_oracle') as get_price_oracle_mock:
+            self.assertAlmostEqual(token.get_eth_value(), 0.03)
+            cache.clear()
+            self.assertAlmostEqual(token.get_eth_value(), 0.03)
+            get_price_oracle_mock.assert_not_called()
+
+        self.assertIsNone(TokenPrice.objects.get_recent_eth_value(token.address, max_age=-1))
+
+    def test_refresh_token_prices_task_oracle_error(self):
+        cache.clear()
+        token = TokenFactory(fixed_eth_conversion=None)
+        PriceOracleTickerFactory(token=token, price_oracle=PriceOracle.objects.get(name='Binance'), ticker='GNOETH')
+        PriceOracleTickerFactory(token=token, price_oracle=PriceOracle.objects.get(name='Kraken'), ticker='ETHGNO',
+                                 inverse=True)
+
+        # Malformed response from one price oracle doesn't stop the refresh
+        price_oracles = {
+            'Binance': mock.MagicMock(**{'get_prices.side_effect': KeyError('result')}),
+            'Kraken': mock.MagicMock(**{'get_prices.return_value': {'ETHGNO': 25.}}),
+        }
+        with mock.patch('safe_relay_service.tokens.models.get_price_oracle',
+                        side_effect=lambda name, **kwargs: price_oracles[name]):
+            self.assertEqual(refresh_token_prices_task(), 1)
+
+        token_price = TokenPrice.objects.get()
+        self.assertAlmostEqual(token_price.eth_value, 0.04)
+        self.assertEqual(token_price.sources, ['Kraken'])
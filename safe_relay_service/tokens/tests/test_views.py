@@ -0,0 +1,53 @@
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from ..views import TokensView
+from .factories import TokenFactory
+
+
+class TestViews(APITestCase):
+    def test_tokens_view(self):
+        url = reverse('v1:tokens')
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+
+        # Cache is invalidated when tokens change
+        token = TokenFactory(name='Ethereum', symbol='ETH')
+        TokenFactory(name='Gnosis', symbol='GNO')
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.data['count'], 2)
+
+        response = self.client.get(url + '?search=eth', format='json')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['address'], token.address)
+
+        response = self.client.get(url + '?search=etherium', format='json')
+        self.assertEqual(response.data['count'], 1)
+
+        token.delete()
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_tokens_view_cache(self):
+        url = reverse('v1:tokens')
+        TokenFactory.create_batch(3)
+        response = self.client.get(url + '?limit=2', format='json')
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertTrue(response.data['next'].startswith('http://testserver/'))
+
+        # Links are built for every request
+        response = self.client.get(url + '?limit=2', format='json', secure=True)
+        self.assertTrue(response.data['next'].startswith('https://testserver/'))
+
+        # Unknown params don't change the cache key
+        request_factory = APIRequestFactory()
+        view = TokensView()
+        self.assertEqual(view.get_cache_key(Request(request_factory.get(url, {'limit': 2, 'x': 1}))),
+                         view.get_cache_key(Request(request_factory.get(url, {'limit': 2, 'x': 2}))))
+        self.assertNotEqual(view.get_cache_key(Request(request_factory.get(url, {'limit': 2}))),
+                            view.get_cache_key(Request(request_factory.get(url, {'limit': 3}))))
@@ -1,60 +1,134 @@
+import json
 import logging
 import os
-from typing import Any, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional
 
 import requests
 from eth_utils import to_checksum_address
 from lxml import html
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 
 class TokenRepository:
+    def __init__(self, max_workers: int = 10, timeout: int = 10, cache_file: Optional[str] = None):
+        """
+        :param max_workers: Max number of concurrent requests
+        :param timeout: Seconds to wait for every request
+        :param cache_file: JSON file to store `ETag` and `Last-Modified` of the token info retrieved, so it's not
+        downloaded again if it didn't change
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache_file = cache_file
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.http_session.mount('http://', adapter)
+        self.http_session.mount('https://', adapter)
+        self.http_cache_lock = threading.Lock()
+        self.http_cache: Dict[str, Dict[str, Any]] = self.__load_http_cache()
+
+    def __load_http_cache(self) -> Dict[str, Dict[str, Any]]:
+        if self.cache_file and os.path.exists(self.cache_file):
+            with open(self.cache_file) as f:
+                return json.load(f)
+        return {}
+
+    def __store_http_cache(self):
+        if self.cache_file:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+            with open(self.cache_file, 'w') as f:
+                json.dump(self.http_cache, f)
+
+    def __get_json(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Conditional GET, cached JSON is returned if it was not modified
+        :return: JSON of the response, `None` if not found
+        """
+        with self.http_cache_lock:
+            cached = self.http_cache.get(url, {})
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+        response = self.http_session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return cached['data']
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+            with self.http_cache_lock:
+                self.http_cache[url] = {'etag': response.headers.get('ETag'),
+                                        'last_modified': response.headers.get('Last-Modified'),
+                                        'data': data}
+        return data
+
     def __download_file(self, url: str, taget_folder: str, local_filename: str) -> str:
-        if not os.path.exists(taget_folder):
-            os.makedirs(taget_folder)
-        r = requests.get(url, stream=True)
+        """
+        File is only downloaded if it was modified after the local copy
+        """
+        path = os.path.join(taget_folder, local_filename)
+        headers = {}
+        if os.path.exists(path):
+            headers['If-Modified-Since'] = formatdate(os.path.getmtime(path), usegmt=True)
+        r = self.http_session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        if r.status_code == 304:
+            logger.debug("Image not modified for url %s", url)
+            return local_filename
         if r.status_code != 200:
             logger.warning("Image not found for url %s", url)
             return
-        with open(os.path.join(taget_folder, local_filename), 'wb') as f:
+        with open(path, 'wb') as f:
             for chunk in r.iter_content(chunk_size=1024):
                 if chunk:
                     f.write(chunk)
         return local_filename
 
-    def __pull_token_info(self, page_number: int=1) -> List[Any]:
-        tokens = []
-        page = requests.get('https://etherscan.io/tokens?p=' + str(page_number))
+    def __pull_token_addresses(self, page_number: int = 1) -> List[Dict[str, str]]:
+        """
+        :return: List of dictionaries with `address` and etherscan `description` of the tokens of the page
+        """
+        page = self.http_session.get('https://etherscan.io/tokens?p=' + str(page_number), timeout=self.timeout)
         tree = html.fromstring(page.content)
 
+        token_addresses = []
         token_data = tree.xpath('//div[@id="ContentPlaceHolder1_divresult"]/table/tbody/tr')
         for element in token_data:
             link = element.xpath('td[@align="center"]/a/@href')[0]
-            token_address = to_checksum_address(link[7:])
             desc = element.xpath('td/small/font/text()')
-            token_request = requests.get(
-                "https://raw.githubusercontent.com/ethereum-lists/tokens/master/tokens/eth/" + token_address + ".json")
-            if token_request.status_code == 200:
-                data = token_request.json()
-            else:
-                logger.info("Not info for token %s, using fallback source", token_address)
-                data = self.__token_info_fallback(token_address)
-
-            if data:
-                if not data.get('website'):
-                    data['website'] = self.__token_website_fallback(token_address)
-                data.setdefault('description', desc[0] if desc else '')
-                tokens.append(data)
-            else:
-                logger.warning("Token info not found for token %s", token_address)
-
-        return tokens
+            token_addresses.append({
+                'address': to_checksum_address(link[7:]),
+                'description': desc[0] if desc else '',
+            })
+        return token_addresses
+
+    def __pull_token_info(self, token_address: str, description: str) -> Optional[Dict[str, Any]]:
+        data = self.__get_json(
+            "https://raw.githubusercontent.com/ethereum-lists/tokens/master/tokens/eth/" + token_address + ".json")
+        if not data:
+            logger.info("Not info for token %s, using fallback source", token_address)
+            data = self.__token_info_fallback(token_address)
+
+        if data:
+            data = dict(data)  # Don't modify the cached data
+            if not data.get('website'):
+                data['website'] = self.__token_website_fallback(token_address)
+            data.setdefault('description', description)
+        else:
+            logger.warning("Token info not found for token %s", token_address)
+        return data
 
     def __token_website_fallback(self, token_address):
         url = 'https://etherscan.io/token/' + token_address
         logger.debug('Falling back for token with address=%s, url=%s', token_address, url)
-        page = requests.get(url)
+        page = self.http_session.get(url, timeout=self.timeout)
         tree = html.fromstring(page.content)
         website = tree.xpath('//tr[@id="ContentPlaceHolder1_tr_officialsite_1"]/td/a/text()')
         return website[0].strip() if website else ''
@@ -65,8 +139,9 @@ class TokenRepository:
         :param token_address:
         :return:
         """
-        page = requests.get(
-            'https://etherscan.io/readContract?v=0xb9469430eabcbfa77005cd3ad4276ce96bd221e3&a=' + token_address)
+        page = self.http_session.get(
+            'https://etherscan.io/readContract?v=0xb9469430eabcbfa77005cd3ad4276ce96bd221e3&a=' + token_address,
+            timeout=self.timeout)
         tree = html.fromstring(page.content)
         return {
             "address": token_address,
@@ -89,9 +164,17 @@ class TokenRepository:
         return "https://raw.githubusercontent.com/TrustWallet/tokens/master/images/" + token_address.lower() + ".png"
 
     def get_tokens(self, pages: int = 1) -> List[Any]:
-        all_tokens = []
-        for page in range(1, pages + 1):
-            all_tokens.extend(self.__pull_token_info(page))
+        """
+        Pages and tokens info are retrieved concurrently. Tokens keep the order of the etherscan pages
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            token_addresses = [token_address
+                               for page_token_addresses in executor.map(self.__pull_token_addresses,
+                                                                        range(1, pages + 1))
+                               for token_address in page_token_addresses]
+            all_tokens = [token for token in executor.map(lambda token_address: self.__pull_token_info(
+                token_address['address'], token_address['description']), token_addresses) if token]
+        self.__store_http_cache()
 
         tokens = [{
             "address": to_checksum_address(token.get('address')),
@@ -105,17 +188,18 @@ class TokenRepository:
         return tokens
 
     def download_images_for_tokens(self, folder: str, token_addresses: List[str]) -> List[str]:
-        token_uris = []
-        for token_address in token_addresses:
-            token_uri = self.__get_token_image_url(token_address.lower())
-            self.__download_file(token_uri, folder, token_address + ".png")
-            token_uris.append(token_uri)
+        os.makedirs(folder, exist_ok=True)
+        token_uris = [self.__get_token_image_url(token_address.lower()) for token_address in token_addresses]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda args: self.__download_file(args[0], folder, args[1] + ".png"),
+                              zip(token_uris, token_addresses)))
         return token_uris
 
 
 if __name__ == "__main__":
     token_info = TokenRepository()
     token_icons_path = os.path.join("images", "tokens", "mainnet")
-    for token in token_info.get_tokens(pages=3):
+    tokens = token_info.get_tokens(pages=3)
+    for token in tokens:
         print(token)
-        token_info.download_images_for_tokens(token_icons_path, token_addresses=[token['address']])
+    token_info.download_images_for_tokens(token_icons_path, token_addresses=[token['address'] for token in tokens])
@@ -1,3 +1,7 @@
+import uuid
+from urllib.parse import urlencode
+
+from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 
@@ -5,7 +9,7 @@ import django_filters.rest_framework
 from rest_framework import filters
 from rest_framework.generics import ListAPIView, RetrieveAPIView
 
-from .filters import TokenFilter
+from .filters import TokenFilter, TokenSearchFilter
 from .models import Token
 from .serializers import TokenSerializer
 
@@ -22,9 +26,54 @@ class TokenView(RetrieveAPIView):
 
 class TokensView(ListAPIView):
     serializer_class = TokenSerializer
-    filter_backends = (django_filters.rest_framework.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
+    filter_backends = (django_filters.rest_framework.DjangoFilterBackend, TokenSearchFilter, filters.OrderingFilter)
     filterset_class = TokenFilter
-    search_fields = ('name', 'symbol')
-    ordering_fields = '__all__'
+    ordering_fields = ('relevance', 'name', 'address')  # Indexed fields
     ordering = ('relevance', 'name')
     queryset = Token.objects.all()
+    cache_timeout = 60 * 5
+    cache_version_key = 'tokens:version'
+
+    @classmethod
+    def get_cache_version(cls) -> str:
+        version = cache.get(cls.cache_version_key)
+        if version is None:
+            cache.add(cls.cache_version_key, uuid.uuid4().hex, None)
+            version = cache.get(cls.cache_version_key)
+        return version
+
+    @classmethod
+    def invalidate_cache(cls):
+        """
+        Responses cached are not deleted, a new version is used for the cache keys
+        """
+        cache.set(cls.cache_version_key, uuid.uuid4().hex, None)
+
+    def get_cache_key(self, request) -> str:
+        """
+        Only params changing the response are used, so clients cannot create unlimited cache keys
+        """
+        params = {self.paginator.limit_query_param, self.paginator.offset_query_param,
+                  filters.OrderingFilter.ordering_param} | set(TokenFilter.base_filters)
+        return 'tokens:%s:%s' % (self.get_cache_version(),
+                                 urlencode(sorted((key, value) for key, value in request.query_params.items()
+                                                  if key in params)))
+
+    def list(self, request, *args, **kwargs):
+        # Searches are not cached, as there are too many different terms
+        if request.query_params.get(TokenSearchFilter.search_param):
+            return super().list(request, *args, **kwargs)
+
+        # Pagination links depend on the request host, so only the page is cached and links are built every time
+        cache_key = self.get_cache_key(request)
+        cached = cache.get(cache_key)
+        if cached is None:
+            page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+            cached = {'count': self.paginator.count, 'results': self.get_serializer(page, many=True).data}
+            cache.set(cache_key, cached, self.cache_timeout)
+        else:
+            self.paginator.request = request
+            self.paginator.limit = self.paginator.get_limit(request)
+            self.paginator.offset = self.paginator.get_offset(request)
+            self.paginator.count = cached['count']
+        return self.get_paginated_response(cached['results'])
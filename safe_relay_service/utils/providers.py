@@ -0,0 +1,65 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from logging import getLogger
+from typing import Any, Iterable, List, Optional, Type
+
+logger = getLogger(__name__)
+
+
+class LazyProvider(ABC):
+    """
+    Base class for the providers of the service singletons. Service is built on the first call to the provider, so
+    importing the app or starting a worker doesn't connect to the node. Every provider is registered on `providers`,
+    so they can be built in background using `warmup_providers` before the first request arrives.
+    """
+    providers: List[Type['LazyProvider']] = []
+    # Reentrant, as building a service can require other providers (e.g. `GasStationProvider`)
+    _lock = threading.RLock()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        LazyProvider.providers.append(cls)
+
+    def __new__(cls):
+        if cls.__abstractmethods__:
+            raise TypeError("Can't build abstract provider %s" % cls.__name__)
+        if not hasattr(cls, 'instance'):
+            with LazyProvider._lock:
+                if not hasattr(cls, 'instance'):
+                    cls.instance = cls.build()
+        return cls.instance
+
+    @classmethod
+    @abstractmethod
+    def build(cls) -> Any:
+        """
+        :return: Service to use as singleton
+        """
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+def warmup_providers(providers: Optional[Iterable[Type[LazyProvider]]] = None) -> threading.Thread:
+    """
+    Builds the providers in a background thread. Errors are logged, provider will be built again on first use
+    :param providers: Providers to build, every registered provider by default
+    :return: Thread building the providers
+    """
+    providers = list(LazyProvider.providers if providers is None else providers)
+
+    def warmup():
+        for provider in providers:
+            start = time.time()
+            try:
+                provider()
+                logger.info('Provider %s ready in %.3f seconds', provider.__name__, time.time() - start)
+            except Exception:
+                logger.warning('Cannot warm up provider %s', provider.__name__, exc_info=True)
+
+    thread = threading.Thread(target=warmup, name='providers-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -2,6 +2,7 @@ from django.test import TestCase
 
 from faker import Faker
 
+from ..providers import LazyProvider, warmup_providers
 from ..singleton import singleton
 
 faker = Faker()
@@ -22,3 +23,28 @@ class TestSigning(TestCase):
         my_other_class = MyClass(another_name)
 
         self.assertEqual(my_class.name, my_other_class.name)
+
+    def test_lazy_provider(self):
+        class MyProvider(LazyProvider):
+            builds = 0
+
+            @classmethod
+            def build(cls):
+                cls.builds += 1
+                return MyClass(faker.name())
+
+        self.assertIn(MyProvider, LazyProvider.providers)
+        self.assertEqual(MyProvider.builds, 0)
+        self.assertIs(MyProvider(), MyProvider())
+        self.assertEqual(MyProvider.builds, 1)
+        MyProvider.del_singleton()
+        warmup_providers([MyProvider]).join()
+        self.assertEqual(MyProvider.builds, 2)
+        LazyProvider.providers.remove(MyProvider)
+
+        class AbstractProvider(LazyProvider):
+            pass
+
+        with self.assertRaises(TypeError):
+            AbstractProvider()
+        LazyProvider.providers.remove(AbstractProvider)
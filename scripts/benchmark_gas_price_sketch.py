@@ -0,0 +1,59 @@
+"""
+Compare accuracy and CPU time of the gas price percentiles calculated by the Gas Station using NumPy
+(sorting every gas price of the window) and using a `GasPriceSketch` per block.
+
+Usage: python scripts/benchmark_gas_price_sketch.py --blocks 300 --txs-per-block 200
+"""
+import argparse
+import math
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from safe_relay_service.gas_station.sketch import GasPriceSketch  # noqa: E402
+
+PERCENTILES = (30, 50, 75)
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--blocks', help='number of blocks in the window', type=int, default=300)
+parser.add_argument('--txs-per-block', help='number of txs for every block', type=int, default=200)
+parser.add_argument('--repeat', help='number of repetitions for every measure', type=int, default=20)
+args = parser.parse_args()
+
+# Gas prices follow a log-normal distribution around 10 Gwei
+blocks_gas_prices = [np.random.lognormal(mean=math.log(10**10), sigma=0.8,
+                                         size=args.txs_per_block).astype(np.uint64)
+                     for _ in range(args.blocks)]
+blocks_sketches = [GasPriceSketch().add(block_gas_prices) for block_gas_prices in blocks_gas_prices]
+
+
+def numpy_percentiles():
+    gas_prices = np.concatenate(blocks_gas_prices)
+    return [math.ceil(np.percentile(gas_prices, q)) for q in PERCENTILES]
+
+
+def sketch_percentiles():
+    sketch = GasPriceSketch.merge_all(blocks_sketches)
+    return [math.ceil(sketch.percentile(q)) for q in PERCENTILES]
+
+
+def sketch_new_block():
+    # Cost paid for every new block entering the window
+    return GasPriceSketch().add(blocks_gas_prices[0])
+
+
+numpy_time = min(timeit.repeat(numpy_percentiles, number=1, repeat=args.repeat))
+sketch_time = min(timeit.repeat(sketch_percentiles, number=1, repeat=args.repeat))
+sketch_new_block_time = min(timeit.repeat(sketch_new_block, number=1, repeat=args.repeat))
+
+print('Blocks=%d Txs=%d' % (args.blocks, args.blocks * args.txs_per_block))
+print('NumPy percentiles: %.2f ms' % (numpy_time * 1000))
+print('Sketch percentiles: %.2f ms (+%.3f ms to build the sketch of every new block)'
+      % (sketch_time * 1000, sketch_new_block_time * 1000))
+for q, exact, approximated in zip(PERCENTILES, numpy_percentiles(), sketch_percentiles()):
+    print('Percentile %d: numpy=%d sketch=%d relative-error=%.4f%%' % (q, exact, approximated,
+                                                                       abs(approximated - exact) / exact * 100))
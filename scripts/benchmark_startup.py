@@ -0,0 +1,46 @@
+"""
+Measure startup time of the WSGI application and the Celery app, and the time needed to build every registered
+provider (what the first request/task would pay without warmup). Every measure runs in a new Python process.
+
+Usage: DJANGO_SETTINGS_MODULE=config.settings.production python scripts/benchmark_startup.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+STATEMENTS = {
+    'wsgi': 'import config.wsgi',
+    'celery': ('import django; django.setup(); '
+               'from safe_relay_service.taskapp.celery import app; app.loader.import_default_modules()'),
+    'providers': ('import django; django.setup(); '
+                  'from safe_relay_service.utils.providers import warmup_providers; warmup_providers().join()'),
+}
+
+TIMER = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--repeat', help='number of repetitions for every measure', type=int, default=5)
+parser.add_argument('--no-warmup', help='disable warmup of providers on startup', action='store_true')
+args = parser.parse_args()
+
+env = dict(os.environ)
+env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
+if args.no_warmup:
+    env['PROVIDERS_WARMUP'] = 'False'
+
+for name, statement in STATEMENTS.items():
+    times = []
+    for _ in range(args.repeat):
+        output = subprocess.check_output([sys.executable, '-c', TIMER.format(statement=statement)],
+                                         cwd=ROOT_PATH, env=env)
+        times.append(float(output.decode().strip().splitlines()[-1]))
+    print('%-10s min=%.3fs median=%.3fs max=%.3fs' % (name, min(times), statistics.median(times), max(times)))